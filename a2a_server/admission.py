@@ -0,0 +1,196 @@
+import asyncio
+import contextlib
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from agents.extraction import Extraction
+from mcp_server.metrics import REGISTRY, SHED
+
+# Scheduling classes, most urgent first
+PRIORITY_URGENT = 0  # ticket creation flagged high priority
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2  # batch items and multi-customer lookups
+PRIORITY_NAMES = ("urgent", "normal", "bulk")
+
+# Specialist agent -> the route that reaches it from the coordinator
+AGENT_ROUTES = {"records": "records_agent", "assist": "assist_agent"}
+# Agent -> (requests running at once, requests allowed to wait)
+ADMISSION_LIMITS = {
+    "coordinator": (64, 512),
+    "records": (32, 256),
+    "assist": (16, 128),
+}
+# Seconds a request may wait for a slot before it is shed
+QUEUE_TIMEOUT = 5.0
+
+
+class Overloaded(Exception):
+    """Admission refused; the HTTP layer turns this into 429 + Retry-After."""
+
+    def __init__(self, agent: str, reason: str, retry_after: int):
+        super().__init__(f"{agent} overloaded ({reason})")
+        self.agent = agent
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def request_priority(agent: str, ex: Extraction) -> int:
+    """Scheduling class of a task sent to ``agent``, from its text's extraction.
+
+    A specialist classifies the request as its own work whatever the route
+    keywords say; the coordinator classifies it by the route it will take.
+    """
+    target = AGENT_ROUTES.get(agent, ex.route)
+    if target == "assist_agent" and ex.priority == "high":
+        return PRIORITY_URGENT
+    if target == "records_agent" and len(ex.customer_ids) > 1:
+        return PRIORITY_BULK
+    return PRIORITY_NORMAL
+
+
+class AdmissionController:
+    """Concurrency limit for one agent with a bounded, priority-ordered queue.
+
+    Up to ``limit`` requests run at once. Others wait in one FIFO per
+    priority, and a freed slot goes to the oldest waiter of the most urgent
+    class. When ``max_queue`` requests are already waiting, a newcomer evicts
+    the newest waiter of a less urgent class; if there is none it is refused.
+    Waiters still queued after ``timeout`` seconds are refused too, so queueing
+    delay stays bounded. Requests that ask to ``wait`` skip both limits and can
+    only be evicted.
+
+    Each agent has its own controller, so classes only compete for one
+    agent's slots: urgent work for one specialist does not hold back bulk
+    work running on another.
+    """
+
+    def __init__(self, agent: str, limit: int, max_queue: int, timeout: float = QUEUE_TIMEOUT):
+        """Initialize the controller.
+
+        Args:
+            agent: Name used in errors and metrics
+            limit: Requests allowed to run at once
+            max_queue: Requests allowed to wait for a slot
+            timeout: Seconds a request may wait before it is refused
+        """
+        self.agent = agent
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self._queues: List[Deque[asyncio.Future]] = [deque() for _ in PRIORITY_NAMES]
+        # Smoothed seconds a slot is held, for Retry-After
+        self.hold_s = 0.05
+        self.admitted = 0
+        self.shed: Dict[str, int] = {}
+
+    @property
+    def depth(self) -> int:
+        return sum(len(q) for q in self._queues)
+
+    def retry_after(self) -> int:
+        """Whole seconds until the current queue should have drained."""
+        return max(1, math.ceil(self.hold_s * (self.depth + 1) / self.limit))
+
+    def _refuse(self, priority: int, reason: str) -> Overloaded:
+        key = f"{PRIORITY_NAMES[priority]}:{reason}"
+        self.shed[key] = self.shed.get(key, 0) + 1
+        SHED.inc(self.agent, PRIORITY_NAMES[priority], reason)
+        return Overloaded(self.agent, reason, self.retry_after())
+
+    def _evict(self, priority: int) -> bool:
+        """Refuse the newest waiter less urgent than ``priority``, if any."""
+        for p in range(len(self._queues) - 1, priority, -1):
+            if self._queues[p]:
+                self._queues[p].pop().set_exception(self._refuse(p, "evicted"))
+                return True
+        return False
+
+    async def acquire(self, priority: int = PRIORITY_NORMAL, wait: bool = False):
+        """Wait for a slot. Raises ``Overloaded`` when refused.
+
+        With ``wait`` the request queues even when the queue is full and is
+        never timed out; it is refused only when a more urgent newcomer evicts
+        it. Callers must bound how many such waiters they add.
+        """
+        if self.active < self.limit and not self.depth:
+            self.active += 1
+            self.admitted += 1
+            return
+        if not wait and self.depth >= self.max_queue and not self._evict(priority):
+            raise self._refuse(priority, "queue full")
+        fut = asyncio.get_running_loop().create_future()
+        queue = self._queues[priority]
+        queue.append(fut)
+        try:
+            # shield: on timeout fut may already hold a handed-over slot
+            await asyncio.wait_for(asyncio.shield(fut), None if wait else self.timeout)
+        except asyncio.TimeoutError:
+            if not fut.done():
+                queue.remove(fut)
+                fut.cancel()
+                raise self._refuse(priority, "timeout") from None
+            fut.result()  # Handed over as the wait expired, or evicted
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                self.release()  # The slot was handed over; pass it on
+            elif not fut.done():
+                queue.remove(fut)
+                fut.cancel()
+            raise
+
+    def release(self):
+        """Free a slot, handing it straight to the next waiter if there is one."""
+        for queue in self._queues:
+            while queue:
+                fut = queue.popleft()
+                if not fut.done():
+                    self.admitted += 1
+                    fut.set_result(None)
+                    return
+        self.active -= 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL, wait: bool = False):
+        """``async with controller.slot(priority):`` runs the body holding a slot."""
+        await self.acquire(priority, wait)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.hold_s = 0.9 * self.hold_s + 0.1 * (time.perf_counter() - t0)
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": {name: len(q) for name, q in zip(PRIORITY_NAMES, self._queues)},
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "hold_ms": self.hold_s * 1000,
+        }
+
+
+ADMISSION: Dict[str, AdmissionController] = {
+    agent: AdmissionController(agent, limit, max_queue)
+    for agent, (limit, max_queue) in ADMISSION_LIMITS.items()
+}
+
+
+def admission_stats() -> Dict[str, Any]:
+    return {agent: c.stats() for agent, c in ADMISSION.items()}
+
+
+def _collect_admission():
+    yield ("a2a_admission_active", "gauge", "Requests holding an admission slot.",
+           [({"agent": a}, c.active) for a, c in ADMISSION.items()])
+    yield ("a2a_admission_queue_depth", "gauge", "Requests waiting for an admission slot.",
+           [({"agent": a, "priority": name}, len(q))
+            for a, c in ADMISSION.items() for name, q in zip(PRIORITY_NAMES, c._queues)])
+
+
+REGISTRY.add_collector(_collect_admission)
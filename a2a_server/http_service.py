@@ -1,14 +1,119 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import Dict, Any, List
-from agents.coordinator import CoordinatorAgent, CoordinatorCard
-from agents.records import RecordsAgent, RecordsCard
-from agents.assist import AssistAgent, AssistCard
+import asyncio
+import contextlib
+import json
+import logging
+import time
+import hashlib
+import sqlite3
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Any, AsyncIterator, Generic, List, Optional, Tuple, TypeVar, Union
+# Agent graphs (LangGraph, the MCP tools) are imported by AGENTS on first use
+# or during warm-up, not here
+from agents.cards import CoordinatorCard, RecordsCard, AssistCard
+from agents.extraction import Extraction, extract
+from agents.messages import MessageLog
+from agents.sessions import sessions
+from a2a_server.admission import (
+    ADMISSION, PRIORITY_BULK, Overloaded, admission_stats, request_priority
+)
+from a2a_server.startup import AGENTS
+from mcp_server.changefeed import ChangeLogGap
+from mcp_server.metrics import REGISTRY, ROUTES, MetricsMiddleware
+from mcp_server.tracing import TRACES, TracingMiddleware, span
 
-app = FastAPI(title="A2A Multi-Agent Service")
+try:
+    import orjson
+except ImportError:  # Without it the fast path falls back to the standard encoder
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+STREAMING_ENABLED = True
+# Compile every agent in the background at startup; /ready turns 200 when done
+WARM_UP = True
+# Encode task replies straight to JSON bytes (orjson when installed), skipping
+# pydantic validation of replies we build ourselves and FastAPI's
+# response_model re-validation and jsonable_encoder walk. The response_model
+# declarations still define the OpenAPI schema.
+FAST_RESPONSES = True
+# GET /changes: open subscriptions allowed per process, seconds between
+# keep-alives on a quiet stream, and seconds between changelog compactions
+# (0 disables; the window is CHANGELOG_RETENTION in mcp_server/mcp.py)
+MAX_CHANGE_SUBSCRIBERS = 1000
+CHANGE_HEARTBEAT = 15.0
+# Maintenance jobs are off by default: every worker would run its own copy
+# against the same file. Enable them in one process only.
+CHANGELOG_COMPACT_INTERVAL = 0.0
+# Seconds between moves of old resolved tickets to tickets_archive (0 disables;
+# the age is ARCHIVE_AFTER_DAYS in database_setup.py)
+ARCHIVE_INTERVAL = 0.0
+BATCH_CONCURRENCY = 16
+MAX_BATCH_CONCURRENCY = 64
+MAX_BATCH_SIZE = 5000
+
+T = TypeVar("T")
+
+_warm_up_task: Optional[asyncio.Task] = None
+
+def start_warm_up() -> Optional[asyncio.Task]:
+    """Start compiling every agent in the background, once."""
+    global _warm_up_task
+    if WARM_UP and _warm_up_task is None and not AGENTS.ready:
+        _warm_up_task = asyncio.create_task(AGENTS.warm_up())
+    return _warm_up_task
+
+async def run_forever(job: str, interval: float):
+    """Run the ``job`` maintenance tool every ``interval`` seconds.
+
+    Stops for good when the job reports its table missing, e.g. on a
+    database created before the feature.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        from mcp_server import mcp as tools
+        try:
+            result = await getattr(tools, job)()
+        except Exception:
+            # e.g. the database is busy; the next round catches up
+            logger.exception("maintenance job %s failed", job)
+            continue
+        if str(result.get("reason", "")).endswith("missing"):
+            return
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Cards are cheap; serialize them before the first discovery request
+    for name in CARDS:
+        card_body(name)
+    start_warm_up()
+    jobs = [asyncio.create_task(run_forever(job, interval))
+            for job, interval in (("compact_changelog", CHANGELOG_COMPACT_INTERVAL),
+                                  ("archive_tickets", ARCHIVE_INTERVAL))
+            if interval]
+    yield
+    for job in jobs:
+        job.cancel()
+
+app = FastAPI(title="A2A Multi-Agent Service", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
+@app.exception_handler(Overloaded)
+async def overloaded(request: Request, exc: Overloaded):
+    return JSONResponse({"detail": str(exc)}, status_code=429,
+                        headers={"Retry-After": str(exc.retry_after)})
 
 class Task(BaseModel):
     input: str
+    # Continues an AssistUnit negotiation; only the new message is sent
+    session_id: Optional[str] = None
+
+class BatchTask(BaseModel):
+    inputs: List[str] = Field(max_length=MAX_BATCH_SIZE)
+    concurrency: Optional[int] = Field(default=None, ge=1, le=MAX_BATCH_CONCURRENCY)
 
 class RouteReply(BaseModel):
     route: str
@@ -24,59 +129,584 @@ class AssistReply(BaseModel):
     result: Dict[str, Any]
     missing: List[str]
     messages: List[Dict[str, Any]]
+    # Set while the negotiation is still open; send it with the next turn
+    session_id: Optional[str] = None
+    collected: Dict[str, Any] = Field(default_factory=dict)
+
+class SessionReply(BaseModel):
+    session_id: str
+    collected: Dict[str, Any]
+    messages: List[Dict[str, Any]]
+
+class HopTiming(BaseModel):
+    hop: str
+    ms: float
+
+class DispatchReply(BaseModel):
+    route: str
+    messages: List[Dict[str, Any]]
+    reply: Union[RecordsReply, AssistReply]
+    hops: List[HopTiming]
+    total_ms: float
+
+class BatchItem(BaseModel, Generic[T]):
+    index: int
+    ok: bool
+    result: Optional[T] = None
+    error: Optional[str] = None
+
+class BatchReply(BaseModel, Generic[T]):
+    items: List[BatchItem[T]]
+    succeeded: int
+    failed: int
+
+def make_reply(cls, **fields):
+    """Build a reply model; unvalidated on the fast path, where fields are ours."""
+    return cls.model_construct(**fields) if FAST_RESPONSES else cls(**fields)
+
+def _model_fields(obj):
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    return jsonable_encoder(obj)
+
+def respond(result):
+    """The endpoint return value: pre-encoded JSON on the fast path, else the
+    model for FastAPI to validate and encode."""
+    if not FAST_RESPONSES:
+        return result
+    if orjson is not None:
+        body = orjson.dumps(result, default=_model_fields, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        body = json.dumps(result, default=_model_fields, ensure_ascii=False, allow_nan=False,
+                          separators=(",", ":")).encode("utf-8")
+    return Response(body, media_type="application/json")
 
 def dump_card(card):
     if hasattr(card, "model_dump"): return card.model_dump()
     if hasattr(card, "dict"): return card.dict()
     return card.__dict__
 
+def streaming_card(card):
+    """The card as served: advertises streaming while the stream endpoints are on."""
+    if not STREAMING_ENABLED:
+        return card
+    caps = card.capabilities.model_copy(update={"streaming": True})
+    return card.model_copy(update={"capabilities": caps})
+
+# Card name -> (card, whether it advertises the stream endpoints)
+CARDS = {
+    "coordinator": (CoordinatorCard, False),
+    "records": (RecordsCard, True),
+    "assist": (AssistCard, True),
+}
+# (card name, STREAMING_ENABLED) -> (JSON body, ETag), serialized once
+_card_bodies: Dict[Tuple[str, bool], Tuple[bytes, str]] = {}
+
+def card_body(name: str) -> Tuple[bytes, str]:
+    """The card's JSON bytes as served, and their ETag."""
+    key = (name, STREAMING_ENABLED)
+    cached = _card_bodies.get(key)
+    if cached is None:
+        card, streams = CARDS[name]
+        data = dump_card(streaming_card(card) if streams else card)
+        # Same encoding FastAPI's JSONResponse used for the returned dict
+        body = json.dumps(jsonable_encoder(data), ensure_ascii=False, allow_nan=False,
+                          indent=None, separators=(",", ":")).encode("utf-8")
+        cached = _card_bodies[key] = (body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+    return cached
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any((t[2:] if t.startswith("W/") else t) == etag for t in tags)
+
+def card_response(name: str, request: Request) -> Response:
+    """The pre-serialized card, or 304 when the client already has it."""
+    body, etag = card_body(name)
+    # no-cache: clients may keep the card but revalidate, which costs a 304
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+# ------ Agent Runners ------
+async def run_coordinator(text: str, ex: Optional[Extraction] = None) -> RouteReply:
+    agent = await AGENTS.get("coordinator")
+    from agents.coordinator import CoordinatorContext
+    with span("ainvoke", "langgraph", agent="coordinator"):
+        state = await agent.ainvoke({
+            "transcript": [{"role": "user", "content": text}],
+            "dispatch_target": None
+        }, context=CoordinatorContext(extraction=ex))
+    return make_reply(RouteReply, route=state["dispatch_target"],
+                      messages=state["transcript"].to_list())
+
+async def run_records(text: str, ex: Optional[Extraction] = None) -> RecordsReply:
+    agent = await AGENTS.get("records")
+    from agents.records import RecordsContext
+    with span("ainvoke", "langgraph", agent="records"):
+        st = await agent.ainvoke({
+            "dialog": [{"role": "user", "content": text}],
+            "invoked_tool": None,
+            "payload": None
+        }, context=RecordsContext(extraction=ex))
+    return make_reply(
+        RecordsReply,
+        tool=st.get("invoked_tool") or "",
+        result=st.get("payload") or {},
+        messages=st["dialog"].to_list()
+    )
+
+def _assist_state(text: str, collected: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "thread": [{"role": "user", "content": text}],
+        "last_step": None,
+        "ticket_data": None,
+        "missing": None,
+        "collected": collected
+    }
+
+def _session_lock(session_id: Optional[str]):
+    return sessions.lock(session_id) if session_id else contextlib.nullcontext()
+
+async def _resume(session_id: Optional[str]):
+    """The session to continue and its collected fields.
+
+    An id the server does not know (never issued, ended or expired) is not
+    adopted: the turn starts without one and a fresh server-side id is
+    issued if the negotiation stays open, so clients cannot pick session ids.
+    """
+    if not session_id:
+        return None, None
+    collected = await sessions.load(session_id)
+    return (session_id if collected is not None else None), collected
+
+async def _save_turn(session_id: Optional[str], st: Dict[str, Any]) -> Optional[str]:
+    """Persist a negotiation turn; returns the session id while fields are missing."""
+    if st.get("missing"):
+        session_id = session_id or sessions.new_id()
+        await sessions.append(session_id, st.get("collected") or {}, st["thread"])
+        return session_id
+    if session_id:
+        await sessions.end(session_id)
+    return None
+
+async def run_assist(text: str, session_id: Optional[str] = None,
+                     ex: Optional[Extraction] = None) -> AssistReply:
+    agent = await AGENTS.get("assist")
+    from agents.assist import AssistContext
+    async with _session_lock(session_id):
+        session_id, collected = await _resume(session_id)
+        with span("ainvoke", "langgraph", agent="assist"):
+            st = await agent.ainvoke(_assist_state(text, collected),
+                                     context=AssistContext(extraction=ex))
+        open_id = await _save_turn(session_id, st)
+    return make_reply(
+        AssistReply,
+        last_step=st.get("last_step") or "",
+        result=st.get("ticket_data") or {},
+        missing=st.get("missing") or [],
+        messages=st["thread"].to_list(),
+        session_id=open_id,
+        collected=st.get("collected") or {}
+    )
+
+async def run_dispatch(text: str, session_id: Optional[str] = None) -> DispatchReply:
+    """Route with the coordinator, then run the chosen specialist in-process.
+
+    A follow-up carrying the id of an open negotiation goes back to AssistUnit
+    even when the message alone would not route there. Each hop is admitted
+    by its own agent's controller. The message is extracted once, for
+    admission and for every hop.
+    """
+    ex = extract(text)
+    t0 = time.perf_counter()
+    async with ADMISSION["coordinator"].slot(request_priority("coordinator", ex)):
+        routed = await run_coordinator(text, ex)
+    if (session_id and routed.route != "assist_agent"
+            and await sessions.load(session_id) is not None):
+        routed.route = "assist_agent"
+        ROUTES.inc("assist_agent", "session")
+        routed.messages.append({"role": "system", "content": "route=assist_agent (session)"})
+    t1 = time.perf_counter()
+    if routed.route == "assist_agent":
+        async with ADMISSION["assist"].slot(request_priority("assist", ex)):
+            reply = await run_assist(text, session_id, ex)
+    else:
+        async with ADMISSION["records"].slot(request_priority("records", ex)):
+            reply = await run_records(text, ex)
+    t2 = time.perf_counter()
+    return make_reply(
+        DispatchReply,
+        route=routed.route,
+        messages=routed.messages,
+        reply=reply,
+        hops=[
+            make_reply(HopTiming, hop="coordinator", ms=(t1 - t0) * 1000),
+            make_reply(HopTiming, hop=routed.route, ms=(t2 - t1) * 1000),
+        ],
+        total_ms=(t2 - t0) * 1000
+    )
+
+async def run_batch(runner, batch: BatchTask, agent: str) -> BatchReply:
+    """Run ``runner`` over every input with bounded concurrency, in input order.
+
+    Every item is admitted by ``agent``'s controller at bulk priority, so
+    interactive requests overtake batches. Items wait however full the queue
+    is, since a batch has at most its concurrency waiting at once; an item
+    fails with ``Overloaded`` only when a more urgent request evicts it.
+    """
+    sem = asyncio.Semaphore(batch.concurrency or BATCH_CONCURRENCY)
+    gate = ADMISSION[agent]
+
+    async def one(i: int, text: str) -> BatchItem:
+        async with sem:
+            try:
+                async with gate.slot(PRIORITY_BULK, wait=True):
+                    result = await runner(text)
+                return make_reply(BatchItem, index=i, ok=True, result=result)
+            except Exception as e:
+                return make_reply(BatchItem, index=i, ok=False, error=f"{type(e).__name__}: {e}")
+
+    items = await asyncio.gather(*(one(i, x) for i, x in enumerate(batch.inputs)))
+    ok = sum(1 for it in items if it.ok)
+    return make_reply(BatchReply, items=items, succeeded=ok, failed=len(items) - ok)
+
+# ------ Streaming Runners ------
+async def _progress(agent, state: Dict[str, Any], log_key: str, final: Dict[str, Any],
+                    context=None) -> AsyncIterator[Dict[str, Any]]:
+    """Yield one progress event per node update, merging updates into ``final``."""
+    final.update(state)
+    final[log_key] = MessageLog(state[log_key])
+    async for update in agent.astream(state, context=context, stream_mode="updates"):
+        for node, delta in update.items():
+            delta = dict(delta or {})
+            log = delta.pop(log_key, None) or []
+            final[log_key].extend(log)
+            final.update(delta)
+            yield {"event": "progress", "node": node,
+                   "message": log[-1]["content"] if log else None}
+
+async def stream_records(text: str, ex: Optional[Extraction] = None) -> AsyncIterator[Dict[str, Any]]:
+    agent = await AGENTS.get("records")
+    if ex is None:
+        ex = extract(text)
+    from agents.records import RecordsContext
+    from mcp_server.client import LocalTools, tools
+    # Ticket rows are streamed straight from the database when the tools run
+    # in-process; a remote tool server returns the history in one reply
+    local = isinstance(tools(), LocalTools)
+    final: Dict[str, Any] = {}
+    state = {"dialog": [{"role": "user", "content": text}], "invoked_tool": None, "payload": None}
+    async for ev in _progress(agent, state, "dialog", final,
+                              context=RecordsContext(stream_history=local, extraction=ex)):
+        yield ev
+    tool = final.get("invoked_tool") or ""
+    payload = final.get("payload") or {}
+    tickets = None
+    if tool == "get_customer_history" and "tickets" in payload:
+        tickets = payload["tickets"]
+        payload = {k: v for k, v in payload.items() if k != "tickets"}
+    yield {"event": "result", "tool": tool, "result": payload}
+    count = archived = 0
+    if tool == "get_customer_history" and payload.get("found"):
+        if tickets is None:
+            from mcp_server.mcp import iter_customer_tickets
+            cid = payload["customer"]["id"]
+            async with contextlib.aclosing(iter_customer_tickets(cid)) as rows:
+                async for ticket in rows:
+                    count += 1
+                    yield {"event": "ticket", "ticket": ticket}
+            # Archived tickets follow the live ones, flagged so clients can tell
+            if ex.wants_archived:
+                try:
+                    async with contextlib.aclosing(iter_customer_tickets(cid, archived=True)) as rows:
+                        async for ticket in rows:
+                            archived += 1
+                            yield {"event": "ticket", "ticket": ticket, "archived": True}
+                except sqlite3.OperationalError as e:
+                    if "no such table" not in str(e):
+                        raise
+        else:
+            for ticket in tickets:
+                count += 1
+                yield {"event": "ticket", "ticket": ticket}
+    yield {"event": "done", "tickets": count, "archived": archived}
+
+async def stream_assist(text: str, session_id: Optional[str] = None,
+                        ex: Optional[Extraction] = None) -> AsyncIterator[Dict[str, Any]]:
+    agent = await AGENTS.get("assist")
+    from agents.assist import AssistContext
+    final: Dict[str, Any] = {}
+    async with _session_lock(session_id):
+        session_id, collected = await _resume(session_id)
+        async for ev in _progress(agent, _assist_state(text, collected), "thread", final,
+                                  context=AssistContext(extraction=ex)):
+            yield ev
+        open_id = await _save_turn(session_id, final)
+    yield {"event": "result", "last_step": final.get("last_step") or "",
+           "result": final.get("ticket_data") or {}, "missing": final.get("missing") or [],
+           "session_id": open_id, "collected": final.get("collected") or {}}
+    yield {"event": "done"}
+
+def _sse(ev: Dict[str, Any]) -> str:
+    return f"event: {ev['event']}\ndata: {json.dumps(ev, default=str)}\n\n"
+
+def _ndjson(ev: Dict[str, Any]) -> str:
+    return json.dumps(ev, default=str) + "\n"
+
+async def stream_response(request: Request, events: AsyncIterator[Dict[str, Any]],
+                          agent: str, priority: int) -> StreamingResponse:
+    """SSE when the client accepts text/event-stream, NDJSON otherwise.
+
+    The admission slot is taken before responding, so an overloaded agent
+    answers 429 rather than an error event, and held until the stream ends.
+    """
+    if not STREAMING_ENABLED:
+        raise HTTPException(status_code=404, detail="streaming disabled")
+    gate = ADMISSION[agent]
+    await gate.acquire(priority)
+    if "text/event-stream" in request.headers.get("accept", ""):
+        media_type, encode = "text/event-stream", _sse
+    else:
+        media_type, encode = "application/x-ndjson", _ndjson
+
+    async def body():
+        # A client that goes away closes the events, and any database stream, at once
+        async with contextlib.aclosing(events):
+            try:
+                async for ev in events:
+                    yield encode(ev)
+            except Exception as e:
+                yield encode({"event": "error", "error": f"{type(e).__name__}: {e}"})
+
+    return AdmittedStream(body(), gate, media_type=media_type)
+
+class AdmittedStream(StreamingResponse):
+    """Streaming response that frees its admission slot however the stream
+    ends: finished, failed or abandoned by a disconnecting client."""
+
+    def __init__(self, content, gate, **kwargs):
+        super().__init__(content, **kwargs)
+        self.gate = gate
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.gate.release()
+            # Starlette leaves an abandoned body to the garbage collector; close
+            # it now so a database stream behind it frees its slot right away
+            await self.body_iterator.aclose()
+
+class ChangeStream(StreamingResponse):
+    """Streaming response that ends its change subscription however the
+    stream ends, like ``AdmittedStream`` does for admission slots."""
+
+    def __init__(self, content, subscription, **kwargs):
+        super().__init__(content, **kwargs)
+        self.subscription = subscription
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.subscription.close()
+
+def _sse_change(ev: Dict[str, Any]) -> str:
+    # The seq doubles as the SSE event id, so EventSource resumes by itself
+    return f"id: {ev['seq']}\n" + _sse(ev)
+
+# ------ Metrics ------
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text exposition of every HTTP, agent, MCP tool and SQL metric."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+# ------ Traces ------
+@app.get("/traces")
+def list_traces(limit: int = 50):
+    """Recent traced requests, newest first. Trace with the ``X-Trace: 1`` header."""
+    return {"traces": [t.summary() for t in TRACES.recent(limit)]}
+
+@app.get("/traces/{trace_id}")
+def get_trace(trace_id: str):
+    """One trace as Chrome/Perfetto trace JSON (load it in ui.perfetto.dev)."""
+    trace = TRACES.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="trace not found or evicted")
+    return trace.to_chrome()
+
+# ------ Readiness ------
+@app.get("/ready")
+async def ready():
+    """200 once every agent is compiled, 503 (with progress) while warming up.
+
+    With ``WARM_UP`` off agents compile on first use, so the service is
+    always ready.
+    """
+    start_warm_up()
+    status = AGENTS.status()
+    ok = status["ready"] or (not WARM_UP and not status["errors"])
+    return JSONResponse(status, status_code=200 if ok else 503)
+
+@app.get("/admission")
+def admission():
+    """Per-agent slots in use, queue depth by priority, admitted and shed counts."""
+    return admission_stats()
+
+# ------ Change Stream ------
+@app.get("/changes")
+async def change_stream(request: Request, since: Optional[int] = None,
+                        entity: Optional[str] = None, customer_id: Optional[int] = None):
+    """Ticket and customer changes as they commit: SSE or NDJSON, as the task streams.
+
+    Resume with ``since`` (or the SSE ``Last-Event-ID`` header) set to the
+    last ``seq`` received; with neither, the stream starts at the newest
+    change. ``entity`` (ticket/customer) and ``customer_id`` filter events.
+    410 when the changelog no longer reaches back to ``since``.
+    """
+    from mcp_server import mcp as tools
+    if not STREAMING_ENABLED:
+        raise HTTPException(status_code=404, detail="streaming disabled")
+    last_id = request.headers.get("last-event-id", "")
+    if since is None and last_id.isdigit():
+        since = int(last_id)
+    if tools.changes.subscribers >= MAX_CHANGE_SUBSCRIBERS:
+        raise Overloaded("changes", "subscribers", int(CHANGE_HEARTBEAT))
+    try:
+        subscription = await tools.changes.subscribe(since, heartbeat=CHANGE_HEARTBEAT)
+    except ChangeLogGap as e:
+        return JSONResponse({"detail": str(e), "first_seq": e.first, "last_seq": e.last},
+                            status_code=410)
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            raise
+        raise HTTPException(status_code=503, detail="changelog missing; run database_setup")
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def body():
+        start = {"event": "subscribed", "seq": subscription.cursor}
+        yield _sse_change(start) if sse else _ndjson(start)
+        try:
+            async for ev in subscription:
+                if ev is None:
+                    yield ": keepalive\n\n" if sse else _ndjson({"event": "heartbeat"})
+                elif ((entity is None or ev["entity"] == entity)
+                      and (customer_id is None or ev["customer_id"] == customer_id)):
+                    yield _sse_change(ev) if sse else _ndjson(ev)
+        except Exception as e:
+            err = {"event": "error", "error": f"{type(e).__name__}: {e}"}
+            yield _sse(err) if sse else _ndjson(err)
+
+    return ChangeStream(body(), subscription,
+                        media_type="text/event-stream" if sse else "application/x-ndjson",
+                        headers={"Cache-Control": "no-cache"})
+
 # ------ AgentCard Endpoints ------
 @app.get("/a2a/coordinator/.well-known/agent-card.json")
-def card_coord(): return dump_card(CoordinatorCard)
+async def card_coord(request: Request): return card_response("coordinator", request)
 
 @app.get("/a2a/records/.well-known/agent-card.json")
-def card_records(): return dump_card(RecordsCard)
+async def card_records(request: Request): return card_response("records", request)
 
 @app.get("/a2a/assist/.well-known/agent-card.json")
-def card_assist(): return dump_card(AssistCard)
+async def card_assist(request: Request): return card_response("assist", request)
 
 # ------ Task Endpoints ------
 @app.post("/a2a/coordinator/tasks", response_model=RouteReply)
 async def tasks_coord(task: Task):
-    state = await CoordinatorAgent.ainvoke({
-        "transcript": [{"role": "user", "content": task.input}],
-        "dispatch_target": None
-    })
-    return RouteReply(route=state["dispatch_target"], messages=state["transcript"])
+    ex = extract(task.input)
+    async with ADMISSION["coordinator"].slot(request_priority("coordinator", ex)):
+        return respond(await run_coordinator(task.input, ex))
+
+@app.post("/a2a/coordinator/tasks:dispatch", response_model=DispatchReply)
+async def tasks_coord_dispatch(task: Task):
+    return respond(await run_dispatch(task.input, task.session_id))
 
 @app.post("/a2a/records/tasks", response_model=RecordsReply)
 async def tasks_records(task: Task):
-    st = await RecordsAgent.ainvoke({
-        "dialog": [{"role": "user", "content": task.input}],
-        "invoked_tool": None,
-        "payload": None
-    })
-    return RecordsReply(
-        tool=st.get("invoked_tool") or "",
-        result=st.get("payload") or {},
-        messages=st["dialog"]
-    )
+    ex = extract(task.input)
+    async with ADMISSION["records"].slot(request_priority("records", ex)):
+        return respond(await run_records(task.input, ex))
 
 @app.post("/a2a/assist/tasks", response_model=AssistReply)
 async def tasks_assist(task: Task):
-    st = await AssistAgent.ainvoke({
-        "thread": [{"role": "user", "content": task.input}],
-        "last_step": None,
-        "ticket_data": None,
-        "missing": None
-    })
-    return AssistReply(
-        last_step=st.get("last_step") or "",
-        result=st.get("ticket_data") or {},
-        missing=st.get("missing") or [],
-        messages=st["thread"]
-    )
+    ex = extract(task.input)
+    async with ADMISSION["assist"].slot(request_priority("assist", ex)):
+        return respond(await run_assist(task.input, task.session_id, ex))
 
-if __name__ == "__main__":
+@app.get("/a2a/assist/sessions/{session_id}", response_model=SessionReply)
+async def assist_session(session_id: str):
+    collected = await sessions.load(session_id)
+    if collected is None:
+        raise HTTPException(status_code=404, detail="session not found or expired")
+    return respond(make_reply(SessionReply, session_id=session_id, collected=collected,
+                              messages=await sessions.thread(session_id)))
+
+# ------ Streaming Task Endpoints ------
+@app.post("/a2a/records/tasks:stream")
+async def tasks_records_stream(task: Task, request: Request):
+    ex = extract(task.input)
+    return await stream_response(request, stream_records(task.input, ex), "records",
+                                 request_priority("records", ex))
+
+@app.post("/a2a/assist/tasks:stream")
+async def tasks_assist_stream(task: Task, request: Request):
+    ex = extract(task.input)
+    return await stream_response(request, stream_assist(task.input, task.session_id, ex),
+                                 "assist", request_priority("assist", ex))
+
+# ------ Batch Task Endpoints ------
+@app.post("/a2a/coordinator/tasks:batch", response_model=BatchReply[RouteReply])
+async def tasks_coord_batch(batch: BatchTask):
+    return respond(await run_batch(run_coordinator, batch, "coordinator"))
+
+@app.post("/a2a/records/tasks:batch", response_model=BatchReply[RecordsReply])
+async def tasks_records_batch(batch: BatchTask):
+    return respond(await run_batch(run_records, batch, "records"))
+
+@app.post("/a2a/assist/tasks:batch", response_model=BatchReply[AssistReply])
+async def tasks_assist_batch(batch: BatchTask):
+    return respond(await run_batch(run_assist, batch, "assist"))
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 1, single_writer: bool = False):
+    """Run the service, optionally as several workers sharing one writer process.
+
+    In single-writer mode every worker reads the database directly and
+    forwards the write tools over a Unix socket to one writer
+    process, so workers never contend for the SQLite write lock.
+    """
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from mcp_server import mcp as tools
+    from mcp_server.writer_service import WRITER_SOCKET, WRITER_SOCKET_ENV, spawn_writer
+
+    writer_proc = None
+    if single_writer:
+        socket_path = os.path.abspath(WRITER_SOCKET)
+        writer_proc = spawn_writer(os.path.abspath(tools.DB_PATH), socket_path)
+        # Worker processes import mcp_server.mcp afresh and pick this up
+        os.environ[WRITER_SOCKET_ENV] = socket_path
+        tools.enable_remote_writes(socket_path)
+    try:
+        if workers > 1:
+            uvicorn.run("a2a_server.http_service:app", host=host, port=port, workers=workers)
+        else:
+            uvicorn.run(app, host=host, port=port)
+    finally:
+        if writer_proc is not None:
+            writer_proc.terminate()
+            writer_proc.wait()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="A2A multi-agent HTTP service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--single-writer", action="store_true",
+                        help="forward all writes to one writer process")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.single_writer)
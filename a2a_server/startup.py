@@ -0,0 +1,90 @@
+import asyncio
+import importlib
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# Agent name -> (module, compiled graph attribute). Importing the module
+# imports LangGraph and compiles the graph.
+AGENT_MODULES: Dict[str, Tuple[str, str]] = {
+    "coordinator": ("agents.coordinator", "CoordinatorAgent"),
+    "records": ("agents.records", "RecordsAgent"),
+    "assist": ("agents.assist", "AssistAgent"),
+}
+
+
+class AgentLoader:
+    """Compiles agent graphs on first use or during a background warm-up.
+
+    Loads run in a worker thread so the event loop keeps serving agent cards,
+    /metrics and /ready meanwhile. They are serialized by one lock: compiling
+    is CPU-bound Python, so loading graphs in parallel threads would not
+    finish sooner under the GIL, and concurrent first imports of shared
+    packages risk import-lock deadlocks.
+    """
+
+    def __init__(self, modules: Dict[str, Tuple[str, str]] = AGENT_MODULES):
+        self.modules = modules
+        self._graphs: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # Seconds each agent took to import and compile, in load order
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.warm_up_started: Optional[float] = None
+        self.warm_up_s: Optional[float] = None
+
+    def load(self, name: str) -> Any:
+        """The compiled graph for ``name``, importing it now if needed. Blocking."""
+        graph = self._graphs.get(name)
+        if graph is not None:
+            return graph
+        module, attr = self.modules[name]
+        with self._lock:
+            graph = self._graphs.get(name)
+            if graph is None:
+                t0 = time.perf_counter()
+                try:
+                    graph = getattr(importlib.import_module(module), attr)
+                except Exception as e:
+                    self.errors[name] = f"{type(e).__name__}: {e}"
+                    raise
+                self.timings[name] = time.perf_counter() - t0
+                self.errors.pop(name, None)
+                self._graphs[name] = graph
+        return graph
+
+    async def get(self, name: str) -> Any:
+        """The compiled graph for ``name``, loading it off the event loop if needed."""
+        graph = self._graphs.get(name)
+        if graph is None:
+            graph = await asyncio.to_thread(self.load, name)
+        return graph
+
+    def load_all(self):
+        for name in self.modules:
+            try:
+                self.load(name)
+            except Exception:
+                pass  # Recorded in errors; /ready keeps reporting not ready
+
+    async def warm_up(self):
+        """Load every agent in a worker thread; requests are served meanwhile."""
+        self.warm_up_started = time.perf_counter()
+        await asyncio.to_thread(self.load_all)
+        self.warm_up_s = time.perf_counter() - self.warm_up_started
+
+    @property
+    def ready(self) -> bool:
+        return len(self._graphs) == len(self.modules)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "agents": {name: name in self._graphs for name in self.modules},
+            "load_s": dict(self.timings),
+            "warm_up_s": self.warm_up_s,
+            "errors": dict(self.errors),
+        }
+
+
+AGENTS = AgentLoader()
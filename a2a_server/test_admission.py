@@ -0,0 +1,75 @@
+import asyncio
+
+from a2a_server import http_service
+from a2a_server.admission import (
+    PRIORITY_BULK, PRIORITY_NORMAL, PRIORITY_URGENT, AdmissionController, request_priority,
+)
+from agents import extraction
+from agents.extraction import extract
+
+URGENT_TICKET = "customer id 2 cannot log in, high priority"
+
+
+def test_specialist_endpoint_decides_the_class():
+    ex = extract(URGENT_TICKET)
+    assert ex.route == "records_agent"
+    assert request_priority("assist", ex) == PRIORITY_URGENT
+    assert request_priority("coordinator", ex) == PRIORITY_NORMAL
+    assert request_priority("records", ex) == PRIORITY_NORMAL
+
+
+def test_bulk_is_a_records_class():
+    ex = extract("high priority ticket for customers 1, 2 and 3 about billing")
+    assert request_priority("records", ex) == PRIORITY_BULK
+    assert request_priority("assist", ex) == PRIORITY_URGENT
+
+
+def test_dispatch_extracts_the_message_once(db, monkeypatch):
+    calls = []
+    original = extraction.EXTRACTOR.extract
+
+    def counting(text):
+        calls.append(text)
+        return original(text)
+
+    monkeypatch.setattr(extraction.EXTRACTOR, "extract", counting)
+    reply = asyncio.run(http_service.run_dispatch("Show customer id 1 history"))
+    assert reply.reply.tool == "get_customer_history"
+    assert len(calls) == 1
+
+
+def test_concurrent_batches_wait_instead_of_shedding(monkeypatch):
+    # Far more batch items waiting than max_queue, and longer than the timeout
+    gate = AdmissionController("assist", limit=2, max_queue=4, timeout=0.02)
+    monkeypatch.setitem(http_service.ADMISSION, "assist", gate)
+
+    async def runner(text):
+        await asyncio.sleep(0.002)
+        return text
+
+    async def main():
+        batches = [http_service.BatchTask(inputs=[f"{b}:{i}" for i in range(10)], concurrency=4)
+                   for b in range(8)]
+        return await asyncio.gather(*(http_service.run_batch(runner, b, "assist") for b in batches))
+
+    replies = asyncio.run(main())
+    assert [r.succeeded for r in replies] == [10] * 8
+    assert [it.result for it in replies[3].items] == [f"3:{i}" for i in range(10)]
+    assert gate.shed == {} and gate.active == 0 and gate.depth == 0
+
+
+def test_waiting_batch_items_can_still_be_evicted():
+    async def main():
+        gate = AdmissionController("assist", limit=1, max_queue=1)
+        await gate.acquire()
+        bulk = [asyncio.ensure_future(gate.acquire(PRIORITY_BULK, wait=True)) for _ in range(3)]
+        await asyncio.sleep(0)
+        urgent = asyncio.ensure_future(gate.acquire(PRIORITY_URGENT))
+        await asyncio.sleep(0)
+        gate.release()
+        await urgent
+        return gate, [b for b in bulk if b.done()], bulk
+
+    gate, done, bulk = asyncio.run(main())
+    assert gate.shed == {"bulk:evicted": 1}
+    assert done == [bulk[2]]
@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from a2a_server import http_service
+
+CARD = "/a2a/records/.well-known/agent-card.json"
+
+
+@pytest.fixture
+def client():
+    # No lifespan: serving a card must not need the agents or the database
+    return TestClient(http_service.app)
+
+
+def test_card_is_served_with_an_etag(client):
+    r = client.get(CARD)
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == "no-cache"
+    assert r.headers["etag"].startswith('"')
+    assert r.json()["name"]
+
+
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", '"stale", {etag}', "*"])
+def test_matching_etag_is_304(client, if_none_match):
+    etag = client.get(CARD).headers["etag"]
+    r = client.get(CARD, headers={"If-None-Match": if_none_match.format(etag=etag)})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+
+def test_stale_etag_gets_the_card(client):
+    r = client.get(CARD, headers={"If-None-Match": '"stale"'})
+    assert r.status_code == 200 and r.json()["name"]
+
+
+def test_streaming_flag_changes_the_etag(client, monkeypatch):
+    etag = client.get(CARD).headers["etag"]
+    monkeypatch.setattr(http_service, "STREAMING_ENABLED", not http_service.STREAMING_ENABLED)
+    r = client.get(CARD, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
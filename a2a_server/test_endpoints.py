@@ -83,6 +83,19 @@ def run_http_tests():
     print("Messages:", len(body.get("messages", [])))
     print()
 
+    # --------------------------------------------------------------
+    # 7. CoordinatorUnit end-to-end dispatch
+    # --------------------------------------------------------------
+    print("▶ Test 7: CoordinatorUnit /tasks:dispatch (in-process hop)")
+    payload = {"input": "Show customer id 1 history"}
+    r = client.post("/a2a/coordinator/tasks:dispatch", json=payload)
+    print("Status:", r.status_code)
+    body = r.json()
+    print("Route:", body.get("route"))
+    print("Invoked tool:", (body.get("reply") or {}).get("tool"))
+    print("Hops:", ", ".join(f"{h['hop']}={h['ms']:.2f}ms" for h in body.get("hops", [])))
+    print()
+
     print("==================== END OF TESTS ====================\n")
 
 
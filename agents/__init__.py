@@ -1,4 +1,19 @@
-# Export agent modules for easy imports
-from .coordinator import CoordinatorAgent, CoordinatorCard
-from .records import RecordsAgent, RecordsCard
-from .assist import AssistAgent, AssistCard
+# Export agent modules for easy imports. Resolved on first access so that
+# importing a light submodule (cards, messages, sessions) does not import
+# LangGraph and compile every graph.
+import importlib
+
+_EXPORTS = {
+    "CoordinatorAgent": "coordinator", "CoordinatorCard": "cards",
+    "RecordsAgent": "records", "RecordsCard": "cards",
+    "AssistAgent": "assist", "AssistCard": "cards",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f"{__name__}.{module}"), name)
@@ -1,38 +1,39 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, List, Optional
 from langgraph.graph import StateGraph
 from langgraph.runtime import Runtime
-import re
-from a2a.types import AgentCard, AgentCapabilities, AgentSkill, TransportProtocol
-from mcp_server.mcp_core import create_ticket
+from agents.cards import AssistCard
+from agents.extraction import Extraction, extract
+from agents.messages import MessageLog, append_messages
+from mcp_server.metrics import ERRORS, instrument_node
+from mcp_server.client import call_tool
 
 @dataclass
 class AssistState:
-    thread: List[Dict[str, Any]]
+    thread: Annotated[MessageLog, append_messages]
     last_step: Optional[str] = None
     ticket_data: Optional[Dict[str, Any]] = None
     missing: Optional[List[str]] = None
+    # Ticket fields gathered over earlier turns of a negotiation session
+    collected: Optional[Dict[str, Any]] = None
 
-def extract_id(txt):
-    m = re.search(r"customer\s+id\s+(\d+)", txt.lower())
-    return int(m.group(1)) if m else None
-
-def extract_priority(txt):
-    txt = txt.lower()
-    for p in ["low", "medium", "high"]:
-        if p in txt:
-            return p
-    return None
-
-def extract_issue(txt):
-    m = re.search(r"(?:about|regarding)\s+(.+)", txt, flags=re.I)
-    return m.group(1) if m else None
+@dataclass
+class AssistContext:
+    # The caller's extraction of the message, so the node does not repeat it
+    extraction: Optional[Extraction] = None
 
-async def assist_node(state: AssistState, rt: Runtime):
-    txt = state.thread[-1]["content"]
-    cid = extract_id(txt)
-    priority = extract_priority(txt)
-    issue = extract_issue(txt)
+@instrument_node("assist")
+async def assist_node(state: AssistState, runtime: Runtime):
+    ex = runtime.context.extraction if runtime.context is not None else None
+    if ex is None:
+        ex = extract(state.thread[-1]["content"])
+    collected = dict(state.collected or {})
+    if ex.customer_id is not None: collected["customer_id"] = ex.customer_id
+    if ex.issue is not None: collected["issue"] = ex.issue
+    if ex.priority is not None: collected["priority"] = ex.priority
+    cid = collected.get("customer_id")
+    priority = collected.get("priority")
+    issue = collected.get("issue")
 
     missing = []
     if cid is None: missing.append("customer_id")
@@ -40,37 +41,25 @@ async def assist_node(state: AssistState, rt: Runtime):
     if priority is None: missing.append("priority")
 
     if missing:
+        for m in missing:
+            ERRORS.inc("assist", f"missing {m}")
         msg = "Need more info:\n" + "\n".join(f"- {m}" for m in missing)
         return {
-            "thread": state.thread + [{"role": "agent", "content": msg}],
-            "missing": missing
+            "thread": [{"role": "agent", "content": msg}],
+            "missing": missing,
+            "collected": collected
         }
 
-    result = await create_ticket(None, cid, issue, priority)
+    result = await call_tool("create_ticket", customer_id=cid, issue=issue, priority=priority)
     return {
-        "thread": state.thread + [{"role": "agent", "content": "Ticket created."}],
+        "thread": [{"role": "agent", "content": "Ticket created."}],
         "last_step": "create_ticket",
         "ticket_data": result,
-        "missing": []
+        "missing": [],
+        "collected": {}
     }
 
-gb = StateGraph(AssistState)
+gb = StateGraph(AssistState, context_schema=AssistContext)
 gb.add_node("assist", assist_node)
 gb.add_edge("__start__", "assist")
 AssistAgent = gb.compile()
-
-AssistCard = AgentCard(
-    name="AssistUnit",
-    url="http://localhost:10012",
-    description="Creates tickets & handles negotiation of missing fields.",
-    version="1.0",
-    capabilities=AgentCapabilities(streaming=False),
-    default_input_modes=["text/plain"],
-    default_output_modes=["text/plain"],
-    preferred_transport=TransportProtocol.jsonrpc,
-    skills=[AgentSkill(
-        id="ticket",
-        name="Create Ticket",
-        description="Open support tickets via MCP."
-    )]
-)
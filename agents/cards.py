@@ -0,0 +1,65 @@
+from a2a.types import AgentCard, AgentCapabilities, AgentSkill, TransportProtocol
+
+# Cards live apart from the graphs so agent discovery can be served without
+# importing LangGraph or compiling any agent.
+
+CoordinatorCard = AgentCard(
+    name="CoordinatorUnit",
+    url="http://localhost:10010",
+    description="Routes customer queries to Records or Assist.",
+    version="1.0",
+    capabilities=AgentCapabilities(streaming=False),
+    default_input_modes=["text/plain"],
+    default_output_modes=["text/plain"],
+    preferred_transport=TransportProtocol.jsonrpc,
+    skills=[AgentSkill(
+        id="route",
+        name="Route Task",
+        description="Select appropriate specialist agent.",
+        tags=["routing"]
+    )]
+)
+
+RecordsCard = AgentCard(
+    name="RecordsUnit",
+    url="http://localhost:10011",
+    description="Fetches customer profiles and history via MCP.",
+    version="1.0",
+    capabilities=AgentCapabilities(streaming=False),
+    default_input_modes=["text/plain"],
+    default_output_modes=["text/plain"],
+    preferred_transport=TransportProtocol.jsonrpc,
+    skills=[AgentSkill(
+        id="lookup",
+        name="Lookup Customer",
+        description="Retrieve customer data via MCP.",
+        tags=["records"]
+    ), AgentSkill(
+        id="batch_lookup",
+        name="Batch Lookup",
+        description="Retrieve several customers or histories in one call, e.g. 'history for customer ids 1, 2 and 3'.",
+        tags=["records", "batch"]
+    ), AgentSkill(
+        id="search_tickets",
+        name="Search Tickets",
+        description="Full-text search over ticket issues, e.g. 'find open tickets about payment timeout'.",
+        tags=["records", "search"]
+    )]
+)
+
+AssistCard = AgentCard(
+    name="AssistUnit",
+    url="http://localhost:10012",
+    description="Creates tickets & handles negotiation of missing fields.",
+    version="1.0",
+    capabilities=AgentCapabilities(streaming=False),
+    default_input_modes=["text/plain"],
+    default_output_modes=["text/plain"],
+    preferred_transport=TransportProtocol.jsonrpc,
+    skills=[AgentSkill(
+        id="ticket",
+        name="Create Ticket",
+        description="Open support tickets via MCP.",
+        tags=["tickets"]
+    )]
+)
@@ -1,46 +1,44 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Annotated
 from langgraph.graph import StateGraph
 from langgraph.runtime import Runtime
-from a2a.types import AgentCard, AgentCapabilities, AgentSkill, TransportProtocol
+from agents import extraction
+from agents.cards import CoordinatorCard
+from agents.extraction import Extraction, extract
+from agents.messages import MessageLog, append_messages
+from mcp_server.metrics import ROUTES, instrument_node
 
 @dataclass
 class CoordinatorState:
-    transcript: List[Dict[str, Any]]
+    transcript: Annotated[MessageLog, append_messages]
     dispatch_target: str | None = None
 
-async def coordinator_node(state: CoordinatorState, rt: Runtime):
-    msg = state.transcript[-1]["content"].lower()
-    if any(x in msg for x in ["ticket", "support", "issue"]):
-        target = "assist_agent"
+@dataclass
+class CoordinatorContext:
+    # The caller's extraction of the message, so the node does not repeat it
+    extraction: Extraction | None = None
+
+@instrument_node("coord")
+async def coordinator_node(state: CoordinatorState, runtime: Runtime):
+    ex = runtime.context.extraction if runtime.context is not None else None
+    if ex is None:
+        ex = extract(state.transcript[-1]["content"])
+    target = ex.route
+    if ex.search:
+        ROUTES.inc(target, "search")
+    elif target == extraction.EXTRACTOR.default_route:
+        ROUTES.inc(target, "default")
     else:
-        target = "records_agent"
+        ROUTES.inc(target, "keyword")
 
     return {
-        "transcript": state.transcript + [
+        "transcript": [
             {"role": "system", "content": f"route={target}"}
         ],
         "dispatch_target": target
     }
 
-graph_builder = StateGraph(CoordinatorState)
+graph_builder = StateGraph(CoordinatorState, context_schema=CoordinatorContext)
 graph_builder.add_node("coord", coordinator_node)
 graph_builder.add_edge("__start__", "coord")
 CoordinatorAgent = graph_builder.compile()
-
-CoordinatorCard = AgentCard(
-    name="CoordinatorUnit",
-    url="http://localhost:10010",
-    description="Routes customer queries to Records or Assist.",
-    version="1.0",
-    capabilities=AgentCapabilities(streaming=False),
-    default_input_modes=["text/plain"],
-    default_output_modes=["text/plain"],
-    preferred_transport=TransportProtocol.jsonrpc,
-    skills=[AgentSkill(
-        id="route",
-        name="Route Task",
-        description="Select appropriate specialist agent.",
-        tags=["routing"]
-    )]
-)
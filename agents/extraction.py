@@ -0,0 +1,254 @@
+import re
+import string
+from typing import Dict, List, Optional, Sequence
+
+from mcp_server.tracing import current, span
+
+# Route -> keywords that select it; earlier routes win when several match.
+ROUTES: Dict[str, Sequence[str]] = {
+    "assist_agent": ("ticket", "support", "issue"),
+}
+DEFAULT_ROUTE = "records_agent"
+# Precedence when a message names more than one priority
+PRIORITIES = ("low", "medium", "high")
+ISSUE_MARKERS = ("about", "regarding", "mentioning")
+# A message that opens with one of these ("find tickets about ...") is a
+# ticket search and goes to SEARCH_ROUTE whatever route keywords follow
+SEARCH_WORDS = ("find", "search")
+SEARCH_ROUTE = "records_agent"
+# Ticket status filters recognised for searches
+STATUSES = ("open", "resolved")
+# Ask for archived tickets in a history ("full history of customer id 4")
+ARCHIVE_WORDS = ("archive", "archived", "full")
+
+# Words that tie a slot phrase to the searched text ("login for customer id 1")
+SLOT_LINKS = ("for", "with", "from", "of", "on", "by", "at", "in", "and")
+
+# Token kinds
+(_ROUTE, _PRIORITY, _ISSUE, _HISTORY, _CUSTOMER, _ID, _JOIN, _SEARCH, _STATUS, _ARCHIVE,
+ _PRIORITY_WORD, _STATUS_WORD) = range(12)
+
+# ASCII punctuation becomes whitespace so "4,5,6" and "history?" split cleanly.
+# Tokenizing the UTF-8 bytes keeps lower/translate/split entirely in C.
+_PUNCT = string.punctuation.replace("&", "").encode()
+_SPLIT = bytes.maketrans(_PUNCT, b" " * len(_PUNCT))
+_ISSUE_TEXT = re.compile(r"(?:%s)\s+(.+)" % "|".join(ISSUE_MARKERS), re.IGNORECASE)
+
+
+def _either(words: Sequence[str]) -> str:
+    return "|".join(re.escape(w) for w in words)
+
+
+class Extraction:
+    """Everything the agents need from one message."""
+
+    __slots__ = ("route", "customer_ids", "priority", "issue", "wants_history",
+                 "search", "status", "wants_archived")
+
+    def __init__(self, route: str, customer_ids: List[int], priority: Optional[str],
+                 issue: Optional[str], wants_history: bool, search: bool = False,
+                 status: Optional[str] = None, wants_archived: bool = False):
+        self.route = route
+        self.customer_ids = customer_ids
+        self.priority = priority
+        self.issue = issue
+        self.wants_history = wants_history
+        self.search = search
+        self.status = status
+        self.wants_archived = wants_archived
+
+    @property
+    def customer_id(self) -> Optional[int]:
+        return self.customer_ids[0] if self.customer_ids else None
+
+    def __repr__(self):
+        return (f"Extraction(route={self.route!r}, customer_ids={self.customer_ids!r}, "
+                f"priority={self.priority!r}, issue={self.issue!r}, "
+                f"wants_history={self.wants_history!r}, search={self.search!r}, "
+                f"status={self.status!r}, wants_archived={self.wants_archived!r})")
+
+
+class Extractor:
+    """Single-pass intent and slot extractor.
+
+    The keyword tables are compiled once into a token -> (kind, value) map.
+    ``extract`` lowercases and tokenizes the message in one C-level pass and
+    walks the tokens once, filling route, customer id(s), priority, issue text
+    and history intent together. Customer ids are read by a small state
+    machine: ``customer(s) [id(s)] N [, N | and N ...]``; a single id needs the
+    ``id`` keyword, a list of two or more does not. Only when an issue marker
+    was seen is the original-case issue text cut out with one compiled search.
+    A search word before any route keyword or issue marker makes the message a
+    ticket search. Its status/priority filters are read before the marker, or
+    after it only from an explicit phrase ("high priority", "status open"), so
+    a bare word of the searched text is never taken for a filter. The phrases
+    that filled a slot, customer ids included, are cut from the searched text.
+    """
+
+    def __init__(self, routes: Dict[str, Sequence[str]] = None,
+                 default_route: str = DEFAULT_ROUTE,
+                 priorities: Sequence[str] = PRIORITIES):
+        """Compile the keyword table.
+
+        Args:
+            routes: Route name -> keywords, in precedence order
+            default_route: Route used when no keyword matches
+            priorities: Accepted priority words, in precedence order
+        """
+        self.routes = dict(ROUTES if routes is None else routes)
+        self.default_route = default_route
+        self.priorities = tuple(priorities)
+        self._route_names = list(self.routes)
+
+        table = {}
+        # Later entries win, so register from lowest to highest precedence.
+        for rank in reversed(range(len(self._route_names))):
+            for word in self.routes[self._route_names[rank]]:
+                word = word.lower()
+                # Routing keywords also match their plural ("tickets", "issues")
+                table[word.encode()] = table[(word + "s").encode()] = (_ROUTE, rank)
+        for rank, p in enumerate(self.priorities):
+            table[p.lower().encode()] = (_PRIORITY, rank)
+        for marker in ISSUE_MARKERS:
+            table[marker.encode()] = (_ISSUE, None)
+        table[b"history"] = (_HISTORY, None)
+        table[b"customer"] = table[b"customers"] = (_CUSTOMER, None)
+        table[b"id"] = table[b"ids"] = (_ID, None)
+        table[b"and"] = table[b"&"] = (_JOIN, None)
+        for word in SEARCH_WORDS:
+            table[word.encode()] = (_SEARCH, None)
+        for s in STATUSES:
+            table[s.encode()] = (_STATUS, s)
+        for word in ARCHIVE_WORDS:
+            table[word.encode()] = (_ARCHIVE, None)
+        table[b"priority"] = (_PRIORITY_WORD, None)
+        table[b"status"] = (_STATUS_WORD, None)
+        self._table = table
+
+        # The same phrases as slot spans of the original text. Customer ids
+        # follow the state machine: one id needs "id", a list does not.
+        sep = r"(?:\s*(?:,|&|\band\b)\s*|\s+)"
+        spans = [
+            rf"customers?\s+(?:ids?\s+\d+(?:{sep}\d+)*|\d+(?:{sep}\d+)+)",
+            rf"(?:{_either(self.priorities)})\s+priority|priority\s+(?:{_either(self.priorities)})",
+            rf"(?:{_either(STATUSES)})\s+status|status\s+(?:{_either(STATUSES)})",
+        ]
+        self._slot_spans = re.compile(
+            rf"(?:\b(?:{_either(SLOT_LINKS)})\s+)?\b(?:{'|'.join(spans)})\b", re.IGNORECASE)
+
+    def extract(self, text: str) -> Extraction:
+        get = self._table.get
+        ids: List[int] = []
+        run: List[int] = []
+        n_priorities = priority_rank = len(self.priorities)
+        n_routes = route_rank = len(self._route_names)
+        issue_seen = False
+        history = False
+        archived = False
+        search = False
+        status = None
+        # id state: 0 idle, 1 after "customer", 2 after "id", 3 reading numbers
+        state = 0
+        id_kw = False
+        last = None
+
+        for tok in text.lower().encode().translate(_SPLIT).split():
+            hit = get(tok)
+            if hit is None:
+                last = None
+                if not state:
+                    continue  # Most words: no slot, no id run to end
+                if tok.isdigit():
+                    run.append(int(tok))
+                    state = 3
+                    continue
+                kind = None
+            else:
+                kind = hit[0]
+            # The previous word, when it makes this one half of a slot phrase
+            before, last = last, hit
+            if state == 3:
+                if kind == _JOIN:
+                    continue
+                # A number run just ended; a list wins over an earlier single id
+                if len(run) > 1 and len(ids) < 2:
+                    ids = run
+                elif id_kw and not ids:
+                    ids = run[:1]
+            prev, state = state, 0
+            if kind is None:
+                continue
+            if kind == _CUSTOMER:
+                state, id_kw, run = 1, False, []
+            elif kind == _ROUTE:
+                if hit[1] < route_rank:
+                    route_rank = hit[1]
+            elif kind == _PRIORITY:
+                if hit[1] < priority_rank and (not (search and issue_seen)
+                                               or before is not None and before[0] == _PRIORITY_WORD):
+                    priority_rank = hit[1]
+            elif kind == _PRIORITY_WORD:
+                if (search and issue_seen and before is not None and before[0] == _PRIORITY
+                        and before[1] < priority_rank):
+                    priority_rank = before[1]
+            elif kind == _ID:
+                if prev == 1:
+                    state, id_kw = 2, True
+            elif kind == _ISSUE:
+                issue_seen = True
+            elif kind == _HISTORY:
+                history = True
+            elif kind == _SEARCH:
+                if route_rank == n_routes and not issue_seen:
+                    search = True
+            elif kind == _STATUS:
+                if status is None and (not issue_seen or (search and before is not None
+                                                          and before[0] == _STATUS_WORD)):
+                    status = hit[1]
+            elif kind == _STATUS_WORD:
+                if (search and issue_seen and status is None and before is not None
+                        and before[0] == _STATUS):
+                    status = before[1]
+            elif kind == _ARCHIVE:
+                if not issue_seen:
+                    archived = True
+        if state == 3:
+            if len(run) > 1 and len(ids) < 2:
+                ids = run
+            elif id_kw and not ids:
+                ids = run[:1]
+
+        issue = None
+        if issue_seen:
+            m = _ISSUE_TEXT.search(text)
+            issue = m.group(1) if m else None
+            if search and issue:
+                issue = " ".join(self._slot_spans.sub(" ", issue).split()).strip(" ,;:.-") or None
+        if search:
+            route = SEARCH_ROUTE
+        elif route_rank < n_routes:
+            route = self._route_names[route_rank]
+        else:
+            route = self.default_route
+        priority = self.priorities[priority_rank] if priority_rank < n_priorities else None
+        return Extraction(route, ids, priority, issue, history, search, status, archived)
+
+
+EXTRACTOR = Extractor()
+
+
+def extract(text: str) -> Extraction:
+    """Extract with the default keyword tables."""
+    if current() is None:
+        # Hot path: building an unused span would cost as much as a short message
+        return EXTRACTOR.extract(text)
+    with span("extract", "agent"):
+        return EXTRACTOR.extract(text)
+
+
+def configure(routes: Dict[str, Sequence[str]] = None, default_route: str = DEFAULT_ROUTE,
+              priorities: Sequence[str] = PRIORITIES) -> Extractor:
+    """Replace the default extractor used by every agent."""
+    global EXTRACTOR
+    EXTRACTOR = Extractor(routes, default_route, priorities)
+    return EXTRACTOR
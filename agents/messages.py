@@ -0,0 +1,150 @@
+import sys
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+
+class Message:
+    """One transcript entry. Role strings are interned and shared."""
+
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = sys.intern(role)
+        self.content = content
+
+    # Read access like the dicts the nodes used to pass around
+    def __getitem__(self, key: str) -> str:
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"role": self.role, "content": self.content}
+
+    def __eq__(self, other):
+        if isinstance(other, Message):
+            return self.role == other.role and self.content == other.content
+        if isinstance(other, dict):
+            return other == self.to_dict()
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Message(role={self.role!r}, content={self.content!r})"
+
+
+MessageLike = Union[Message, Dict[str, Any]]
+
+
+def as_message(m: MessageLike) -> Message:
+    return m if isinstance(m, Message) else Message(m["role"], m["content"])
+
+
+# Messages an agent state's log keeps; older ones are dropped and counted
+TRANSCRIPT_WINDOW = 256
+
+
+class MessageLog:
+    """Append-only message log for agent state.
+
+    Appends never copy earlier messages. ``copy`` is O(1): copies share the
+    message list, and a log only appends in place while it is at the list's
+    end, so appends to one copy are never seen by another. With ``maxlen``
+    set only the newest ``maxlen`` messages are kept and ``dropped`` counts
+    the rest.
+    """
+
+    __slots__ = ("_items", "_start", "_end", "maxlen", "dropped")
+
+    def __init__(self, messages: Iterable[MessageLike] = (), maxlen: Optional[int] = None):
+        self.maxlen = maxlen
+        self._items: List[Message] = []
+        # This log is _items[_start:_end]
+        self._start = self._end = 0
+        self.dropped = 0
+        self.extend(messages)
+
+    def copy(self) -> "MessageLog":
+        log = MessageLog.__new__(MessageLog)
+        log._items, log._start, log._end = self._items, self._start, self._end
+        log.maxlen, log.dropped = self.maxlen, self.dropped
+        return log
+
+    def _rebase(self):
+        """Move the window to a list of its own, dropping shared or dead slots."""
+        self._items = self._items[self._start:self._end]
+        self._start, self._end = 0, len(self._items)
+
+    def append(self, message: MessageLike):
+        if self._end != len(self._items):
+            # A copy has appended past our end; continue on our own list
+            self._rebase()
+        self._items.append(as_message(message))
+        self._end += 1
+        if self.maxlen and self._end - self._start > self.maxlen:
+            self._start += 1
+            self.dropped += 1
+            if self._start >= self.maxlen:
+                self._rebase()  # Amortized: one window copy per maxlen drops
+
+    def extend(self, messages: Iterable[MessageLike]):
+        for m in messages:
+            self.append(m)
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __iter__(self) -> Iterator[Message]:
+        return islice(self._items, self._start, self._end)
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Message, List[Message]]:
+        if isinstance(i, slice):
+            return self._items[self._start:self._end][i]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("MessageLog index out of range")
+        return self._items[self._start + i]
+
+    def to_list(self) -> List[Dict[str, str]]:
+        """The log as the list of role/content dicts the HTTP replies carry."""
+        return [m.to_dict() for m in self]
+
+    def memory_bytes(self) -> int:
+        """Approximate bytes held: container, records and message text."""
+        size = sys.getsizeof(self._items)
+        for m in self:
+            size += sys.getsizeof(m) + sys.getsizeof(m.content)
+        return size
+
+    def __repr__(self):
+        return f"MessageLog(len={len(self)}, maxlen={self.maxlen}, dropped={self.dropped})"
+
+
+def log_reducer(maxlen: Optional[int] = None):
+    """LangGraph reducer that appends node updates to a (bounded) MessageLog.
+
+    Pure: ``left`` is left as it was, so checkpointed or branched states that
+    hold it never see the update. The result is an O(1) copy that shares
+    ``left``'s messages.
+    """
+
+    def reduce(left: Optional[MessageLog], right: Iterable[MessageLike]) -> MessageLog:
+        if left is None or (not left and left.maxlen != maxlen):
+            log = MessageLog(maxlen=maxlen)
+        else:
+            log = left.copy()
+        log.extend(right)
+        return log
+
+    return reduce
+
+
+append_messages = log_reducer(TRANSCRIPT_WINDOW)
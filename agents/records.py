@@ -1,63 +1,94 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Annotated, Any, Dict, Optional
 from langgraph.graph import StateGraph
 from langgraph.runtime import Runtime
-import re
-from a2a.types import AgentCard, AgentCapabilities, AgentSkill, TransportProtocol
-from mcp_server.mcp_core import get_customer, get_customer_history
+from agents.cards import RecordsCard
+from agents.extraction import Extraction, extract
+from agents.messages import MessageLog, append_messages
+from mcp_server.metrics import ERRORS, instrument_node
+from mcp_server.client import call_tool
 
 @dataclass
 class RecordsState:
-    dialog: List[Dict[str, Any]]
+    dialog: Annotated[MessageLog, append_messages]
     invoked_tool: Optional[str] = None
     payload: Optional[Dict[str, Any]] = None
 
-def extract_id(text):
-    m = re.search(r"customer\s+id\s+(\d+)", text.lower())
-    if m:
-        return int(m.group(1))
-    return None
+@dataclass
+class RecordsContext:
+    # Caller streams ticket rows itself; the node only resolves the customer.
+    stream_history: bool = False
+    # The caller's extraction of the message, so the node does not repeat it
+    extraction: Optional[Extraction] = None
+
+@instrument_node("records")
+async def records_node(state: RecordsState, runtime: Runtime):
+    ex = runtime.context.extraction if runtime.context is not None else None
+    if ex is None:
+        ex = extract(state.dialog[-1]["content"])
+    ids = ex.customer_ids
+    if ex.search:
+        if not ex.issue:
+            ERRORS.inc("records", "missing search terms")
+            return {
+                "dialog": [{"role": "agent", "content": "Missing search terms."}]
+            }
+        result = await call_tool("search_tickets", query=ex.issue, status=ex.status,
+                                 priority=ex.priority, customer_id=ex.customer_id)
+        return {
+            "dialog": [{"role": "agent", "content": f"Found {len(result['tickets'])} tickets"}],
+            "invoked_tool": "search_tickets",
+            "payload": result
+        }
 
-async def records_node(state: RecordsState, rt: Runtime):
-    last = state.dialog[-1]["content"]
-    cid = extract_id(last)
-    if cid is None:
+    if not ids:
+        ERRORS.inc("records", "missing customer id")
         return {
-            "dialog": state.dialog + [{"role": "agent", "content": "Missing customer id."}]
+            "dialog": [{"role": "agent", "content": "Missing customer id."}]
         }
 
-    if "history" in last.lower():
-        result = await get_customer_history(None, cid)
+    history = ex.wants_history
+    if len(ids) > 1:
+        if history:
+            result = await call_tool("get_customer_histories", customer_ids=ids)
+            return {
+                "dialog": [{"role": "agent", "content": "Histories retrieved"}],
+                "invoked_tool": "get_customer_histories",
+                "payload": result
+            }
+        result = await call_tool("get_customers", customer_ids=ids)
         return {
-            "dialog": state.dialog + [{"role": "agent", "content": "History retrieved"}],
+            "dialog": [{"role": "agent", "content": "Profiles retrieved"}],
+            "invoked_tool": "get_customers",
+            "payload": result
+        }
+
+    cid = ids[0]
+    if history and runtime.context is not None and runtime.context.stream_history:
+        result = await call_tool("get_customer", customer_id=cid)
+        return {
+            "dialog": [{"role": "agent", "content": "History streaming"}],
             "invoked_tool": "get_customer_history",
             "payload": result
         }
 
-    result = await get_customer(None, cid)
+    if history:
+        result = await call_tool("get_customer_history", customer_id=cid,
+                                 include_archived=ex.wants_archived)
+        return {
+            "dialog": [{"role": "agent", "content": "History retrieved"}],
+            "invoked_tool": "get_customer_history",
+            "payload": result
+        }
+
+    result = await call_tool("get_customer", customer_id=cid)
     return {
-        "dialog": state.dialog + [{"role": "agent", "content": "Profile retrieved"}],
+        "dialog": [{"role": "agent", "content": "Profile retrieved"}],
         "invoked_tool": "get_customer",
         "payload": result
     }
 
-gb = StateGraph(RecordsState)
+gb = StateGraph(RecordsState, context_schema=RecordsContext)
 gb.add_node("records", records_node)
 gb.add_edge("__start__", "records")
 RecordsAgent = gb.compile()
-
-RecordsCard = AgentCard(
-    name="RecordsUnit",
-    url="http://localhost:10011",
-    description="Fetches customer profiles and history via MCP.",
-    version="1.0",
-    capabilities=AgentCapabilities(streaming=False),
-    default_input_modes=["text/plain"],
-    default_output_modes=["text/plain"],
-    preferred_transport=TransportProtocol.jsonrpc,
-    skills=[AgentSkill(
-        id="lookup",
-        name="Lookup Customer",
-        description="Retrieve customer data via MCP."
-    )]
-)
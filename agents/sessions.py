@@ -0,0 +1,139 @@
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from mcp_server.pool import ConnectionPool
+
+SESSIONS_DB_PATH = "sessions.db"
+SESSION_IDLE_TTL = 1800.0
+SWEEP_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    collected TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions(updated_at);
+CREATE TABLE IF NOT EXISTS session_messages (
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SessionStore:
+    """SQLite-backed conversation sessions for AssistAgent negotiation.
+
+    A session keeps the ticket fields collected so far and the message thread.
+    Messages are appended as rows, so a turn costs the same however long the
+    conversation is, and clients only ever send the new message. Sessions idle
+    for longer than ``idle_ttl`` are swept on access.
+    """
+
+    def __init__(self, db_path: str = SESSIONS_DB_PATH, idle_ttl: float = SESSION_IDLE_TTL,
+                 sweep_interval: float = SWEEP_INTERVAL, pool_size: int = 4):
+        """Initialize the store. The schema is created on first use.
+
+        Args:
+            db_path: Path to the sessions SQLite file
+            idle_ttl: Seconds without a turn before a session is evicted
+            sweep_interval: Minimum seconds between eviction sweeps
+            pool_size: Connections used for session reads/writes
+        """
+        self.pool = ConnectionPool(db_path, size=pool_size)
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self._ready = False
+        self._last_sweep = 0.0
+        # Striped locks serialize turns of one session without a lock per id
+        self._locks = [asyncio.Lock() for _ in range(64)]
+        self.evicted = 0
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        return self._locks[hash(session_id) % len(self._locks)]
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    async def _prepare(self):
+        if not self._ready:
+            await self.pool.run(lambda c: c.executescript(_SCHEMA))
+            self._ready = True
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            await self.evict_idle()
+
+    async def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Collected fields of a live session, or None if unknown or expired."""
+        await self._prepare()
+
+        def q(c: sqlite3.Connection):
+            row = c.execute("SELECT collected, updated_at FROM sessions WHERE id=?",
+                            (session_id,)).fetchone()
+            if row is None:
+                return None
+            if row["updated_at"] < time.time() - self.idle_ttl:
+                c.execute("DELETE FROM sessions WHERE id=?", (session_id,))
+                return None
+            return json.loads(row["collected"])
+
+        return await self.pool.run(q)
+
+    async def append(self, session_id: str, collected: Dict[str, Any],
+                     messages: List[Dict[str, Any]]):
+        """Store the collected fields and append this turn's messages."""
+        await self._prepare()
+
+        def q(c: sqlite3.Connection):
+            c.execute(
+                "INSERT INTO sessions (id, collected, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET collected=excluded.collected, "
+                "updated_at=excluded.updated_at",
+                (session_id, json.dumps(collected), time.time())
+            )
+            seq = c.execute("SELECT COALESCE(MAX(seq), 0) FROM session_messages "
+                            "WHERE session_id=?", (session_id,)).fetchone()[0]
+            c.executemany(
+                "INSERT INTO session_messages (session_id, seq, role, content) "
+                "VALUES (?, ?, ?, ?)",
+                [(session_id, seq + i, m["role"], m["content"])
+                 for i, m in enumerate(messages, 1)]
+            )
+
+        await self.pool.run(q)
+
+    async def thread(self, session_id: str) -> List[Dict[str, Any]]:
+        await self._prepare()
+
+        def q(c: sqlite3.Connection):
+            rows = c.execute("SELECT role, content FROM session_messages "
+                             "WHERE session_id=? ORDER BY seq", (session_id,))
+            return [{"role": r["role"], "content": r["content"]} for r in rows]
+
+        return await self.pool.run(q)
+
+    async def end(self, session_id: str):
+        await self.pool.run(lambda c: c.execute("DELETE FROM sessions WHERE id=?", (session_id,)))
+
+    async def evict_idle(self) -> int:
+        cutoff = time.time() - self.idle_ttl
+        n = await self.pool.run(
+            lambda c: c.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+        )
+        self.evicted += n
+        return n
+
+    def close(self):
+        self.pool.close()
+
+
+sessions = SessionStore()
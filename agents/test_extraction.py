@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+
+from agents.extraction import extract
+
+BOTH_ORDERS = [
+    "find tickets about login for customer id 1",
+    "find tickets for customer id 1 about login",
+]
+
+
+@pytest.mark.parametrize("text", BOTH_ORDERS)
+def test_customer_phrase_is_not_search_text(text):
+    ex = extract(text)
+    assert ex.search
+    assert ex.issue == "login"
+    assert ex.customer_ids == [1]
+
+
+def test_filter_phrases_after_the_marker_are_cut():
+    ex = extract("search tickets about vpn with high priority, status open for customer ids 1, 2 and 3")
+    assert ex.issue == "vpn"
+    assert (ex.priority, ex.status, ex.customer_ids) == ("high", "open", [1, 2, 3])
+
+
+def test_bare_filter_words_stay_search_text():
+    ex = extract("find tickets about high cpu on the open port")
+    assert ex.issue == "high cpu on the open port"
+    assert ex.priority is None and ex.status is None
+
+
+@pytest.mark.parametrize("text", BOTH_ORDERS)
+def test_search_finds_the_same_tickets_in_either_order(db, text):
+    from agents.records import RecordsAgent
+
+    state = asyncio.run(RecordsAgent.ainvoke({"dialog": [{"role": "user", "content": text}]}))
+    assert state["invoked_tool"] == "search_tickets"
+    tickets = state["payload"]["tickets"]
+    assert [t["id"] for t in tickets] == [1]
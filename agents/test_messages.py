@@ -0,0 +1,32 @@
+from agents.messages import TRANSCRIPT_WINDOW, MessageLog, append_messages, log_reducer
+
+
+def _msg(i):
+    return {"role": "user", "content": f"m{i}"}
+
+
+def test_reducer_leaves_its_input_unchanged():
+    base = append_messages(None, [_msg(0)])
+    a = append_messages(base, [_msg(1)])
+    b = append_messages(base, [_msg(2)])
+    a2 = append_messages(a, [_msg(3)])
+    assert base.to_list() == [_msg(0)]
+    assert a.to_list() == [_msg(0), _msg(1)]
+    assert b.to_list() == [_msg(0), _msg(2)]
+    assert a2.to_list() == [_msg(0), _msg(1), _msg(3)]
+
+
+def test_bounded_window_counts_dropped_messages():
+    reduce = log_reducer(maxlen=3)
+    log = reduce(MessageLog(), [_msg(i) for i in range(5)])
+    branch = reduce(log, [_msg(i) for i in range(5, 12)])
+    assert [m["content"] for m in log] == ["m2", "m3", "m4"]
+    assert (log.dropped, log[-1]["content"]) == (2, "m4")
+    assert [m["content"] for m in branch] == ["m9", "m10", "m11"]
+    assert branch.dropped == 9
+
+
+def test_agent_states_use_the_transcript_window():
+    log = append_messages(MessageLog(), [_msg(i) for i in range(TRANSCRIPT_WINDOW + 1)])
+    assert len(log) == TRANSCRIPT_WINDOW
+    assert log.dropped == 1
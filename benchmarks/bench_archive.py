@@ -0,0 +1,97 @@
+"""Hot-table cost before and after moving old resolved tickets to the archive.
+
+``hot`` is the tickets table as generated: every ticket ever filed. ``split``
+is the same database after ``archive_tickets``, with old resolved tickets in
+tickets_archive. Reported: uncached ``get_customer_history`` latency for the
+customers with the most tickets, the cost of listing open tickets, and the
+size of the tickets table and its indexes (what the page cache has to hold).
+
+    python -m benchmarks.bench_archive --tickets 200000 --days 90
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from benchmarks.common import make_database, populate, remove_database, summarize
+from mcp_server import mcp as tools
+
+
+def _hot_size(c: sqlite3.Connection) -> int:
+    """Bytes used by the tickets table and its indexes."""
+    try:
+        return c.execute(
+            "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = 'tickets' OR name IN "
+            "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tickets')"
+        ).fetchone()[0]
+    except sqlite3.OperationalError:  # built without SQLITE_ENABLE_DBSTAT_VTAB
+        page_size = c.execute("PRAGMA page_size").fetchone()[0]
+        return c.execute("PRAGMA page_count").fetchone()[0] * page_size
+
+
+def _time(fn, *args, repeat):
+    latencies = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        tools.pool.call(fn, *args)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def _list_open(c: sqlite3.Connection):
+    return c.execute("SELECT * FROM tickets WHERE status = 'open' ORDER BY created_at DESC").fetchall()
+
+
+def measure(heavy, repeat):
+    history = [s for cid in heavy for s in _time(tools._get_customer_history, cid, repeat=repeat)]
+    return {
+        "history": summarize(history),
+        "open": summarize(_time(_list_open, repeat=repeat)),
+        "size": tools.pool.call(_hot_size),
+        "hot": tools.pool.call(lambda c: c.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tickets", type=int, default=200000)
+    ap.add_argument("--customers", type=int, default=5000)
+    ap.add_argument("--days", type=float, default=tools.ARCHIVE_AFTER_DAYS)
+    ap.add_argument("--heavy", type=int, default=20, help="customers with the most tickets to time")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--until", type=datetime.fromisoformat, default=None,
+                   help="newest generated timestamp (default: start of today)")
+    args = ap.parse_args()
+
+    db_path = make_database()
+    populate(db_path, args.customers, args.tickets, args.seed, args.until)
+    tools.use_database(db_path)
+    print("\n==================== TICKET ARCHIVE BENCHMARK ====================\n")
+    print(f"cpus={os.cpu_count()} tickets={args.tickets} days={args.days:g}\n")
+    try:
+        heavy = tools.pool.call(lambda c: [r[0] for r in c.execute(
+            "SELECT customer_id FROM tickets GROUP BY customer_id ORDER BY COUNT(*) DESC LIMIT ?",
+            (args.heavy,))])
+        results = {"hot": measure(heavy, args.repeat)}
+        t0 = time.perf_counter()
+        moved = asyncio.run(tools.archive_tickets(args.days))["archived"]
+        took = time.perf_counter() - t0
+        tools.pool.call(lambda c: c.execute("VACUUM"))
+        results["split"] = measure(heavy, args.repeat)
+        print(f"archived {moved} tickets in {took:.2f}s\n")
+        print(f"{'mode':<6} {'hot rows':>9} {'hot MB':>7} {'history p50':>12} {'history p99':>12} "
+              f"{'open p50':>9}")
+        for mode, r in results.items():
+            print(f"{mode:<6} {r['hot']:>9} {r['size'] / 2**20:>7.1f} {r['history']['p50_ms']:>12.3f} "
+                  f"{r['history']['p99_ms']:>12.3f} {r['open']['p50_ms']:>9.3f}")
+    finally:
+        tools.pool.close()
+        remove_database(db_path)
+
+
+if __name__ == "__main__":
+    main()
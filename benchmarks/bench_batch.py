@@ -0,0 +1,67 @@
+"""Throughput of the tasks:batch endpoints against sequential single calls.
+
+Both modes go through the ASGI app in-process (no sockets), so the numbers
+isolate per-request overhead and agent execution from network latency.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from benchmarks.common import make_database, remove_database
+from mcp_server import mcp as tools
+from a2a_server.http_service import app
+
+WORKLOADS = {
+    "coordinator": lambda i: f"Open a support ticket for customer id {i % 15 + 1}",
+    "records": lambda i: f"Show customer id {i % 15 + 1} history",
+    "assist": lambda i: f"Create a low priority ticket for customer id {i % 15 + 1} about item {i}",
+}
+
+
+async def _sequential(client, agent, inputs):
+    t0 = time.perf_counter()
+    for text in inputs:
+        r = await client.post(f"/a2a/{agent}/tasks", json={"input": text})
+        r.raise_for_status()
+    return time.perf_counter() - t0
+
+
+async def _batched(client, agent, inputs, concurrency):
+    t0 = time.perf_counter()
+    r = await client.post(f"/a2a/{agent}/tasks:batch",
+                          json={"inputs": inputs, "concurrency": concurrency})
+    r.raise_for_status()
+    assert r.json()["failed"] == 0
+    return time.perf_counter() - t0
+
+
+async def main(items, concurrency):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    db_path = make_database()
+    tools.use_database(db_path)
+    transport = httpx.ASGITransport(app=app)
+
+    print("\n==================== tasks:batch THROUGHPUT BENCHMARK ====================\n")
+    print(f"items={items} concurrency={concurrency}\n")
+    print(f"{'agent':<12} {'sequential':>14} {'batch':>14} {'speedup':>9}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for agent, make in WORKLOADS.items():
+            inputs = [make(i) for i in range(items)]
+            seq = await _sequential(client, agent, inputs)
+            bat = await _batched(client, agent, inputs, concurrency)
+            print(f"{agent:<12} {items / seq:>10.0f} it/s {items / bat:>10.0f} it/s {seq / bat:>8.1f}x")
+
+    tools.pool.close()
+    remove_database(db_path)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--items", type=int, default=1000)
+    ap.add_argument("--concurrency", type=int, default=16)
+    args = ap.parse_args()
+    asyncio.run(main(args.items, args.concurrency))
@@ -0,0 +1,107 @@
+"""Change detection for many watchers: per-watcher polling against the
+shared change feed.
+
+``poll`` is what dashboards do without the feed: every watcher queries
+SQLite for new changes on its own timer. ``feed`` is ``/changes``: one poll
+loop per process reads the changelog and every subscriber is served from
+its in-memory buffer. A writer creates tickets at a steady rate during
+both runs. Reported: SQLite queries per second spent on change detection,
+and the delay from a write committing to each watcher seeing it.
+
+    python -m benchmarks.bench_changes --watchers 10 100 1000 --seconds 5
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import make_database, remove_database, summarize
+from mcp_server import changefeed
+from mcp_server import mcp as tools
+
+
+async def _writer(rate, stop, committed):
+    i = 0
+    while not stop.is_set():
+        result = await tools.create_ticket(None, i % 15 + 1, f"bench change {i}", "low")
+        committed[result["ticket"]["id"]] = time.perf_counter()
+        i += 1
+        await asyncio.sleep(1 / rate)
+
+
+def _seen(ev, committed, delays):
+    if ev["entity"] == "ticket" and ev["op"] == "insert" and ev["id"] in committed:
+        delays.append(time.perf_counter() - committed[ev["id"]])
+
+
+async def _poll_watcher(since, stop, committed, delays, counter):
+    cursor = since
+    while not stop.is_set():
+        rows = await tools.pool.run(tools._read_changes, cursor, changefeed.CHANGE_PAGE)
+        counter[0] += 1
+        for ev in rows:
+            cursor = ev["seq"]
+            _seen(ev, committed, delays)
+        if len(rows) < changefeed.CHANGE_PAGE:
+            await asyncio.sleep(changefeed.POLL_INTERVAL)
+
+
+async def _feed_watcher(stop, committed, delays):
+    sub = await tools.changes.subscribe(heartbeat=0.1)
+    try:
+        async for ev in sub:
+            if stop.is_set():
+                return
+            if ev is not None:
+                _seen(ev, committed, delays)
+    finally:
+        sub.close()
+
+
+async def run(mode, watchers, seconds, rate):
+    stop = asyncio.Event()
+    committed, delays, counter = {}, [], [0]
+    since = (await tools.pool.run(tools._changelog_bounds))["last"]
+    polls0, reads0 = tools.changes.polls, tools.changes.catch_up_reads
+    if mode == "poll":
+        tasks = [asyncio.create_task(_poll_watcher(since, stop, committed, delays, counter))
+                 for _ in range(watchers)]
+    else:
+        tasks = [asyncio.create_task(_feed_watcher(stop, committed, delays)) for _ in range(watchers)]
+    await asyncio.sleep(0.2)
+    writer = asyncio.create_task(_writer(rate, stop, committed))
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(writer, *tasks)
+    if mode == "feed":
+        counter[0] = tools.changes.polls - polls0 + tools.changes.catch_up_reads - reads0
+    return counter[0] / (seconds + 0.2), len(committed), summarize(delays)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--watchers", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--rate", type=float, default=50.0, help="ticket writes per second")
+    args = ap.parse_args()
+
+    db_path = make_database()
+    tools.use_database(db_path)
+    print("\n==================== CHANGE DETECTION: POLLING VS FEED ====================\n")
+    print(f"cpus={os.cpu_count()} writes/s={args.rate:.0f} poll_interval={changefeed.POLL_INTERVAL}s\n")
+    print(f"{'watchers':>8} {'mode':<5} {'queries/s':>10} {'writes':>7} {'seen':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8}")
+    try:
+        for watchers in args.watchers:
+            for mode in ("poll", "feed"):
+                qps, writes, lat = asyncio.run(run(mode, watchers, args.seconds, args.rate))
+                print(f"{watchers:>8} {mode:<5} {qps:>10.0f} {writes:>7} {lat['count']:>8} "
+                      f"{lat['p50_ms']:>8.1f} {lat['p99_ms']:>8.1f}")
+    finally:
+        tools.pool.close()
+        remove_database(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Cost of claiming the next ticket from the open-ticket work queue.
+
+``index`` is ``claim_next_ticket``: one UPDATE whose pick is the first entry
+of idx_tickets_open_queue. ``sort`` is the ordering ``run_sample_queries``
+used before, ``ORDER BY CASE priority ... END, created_at``, which matches no
+index, so every claim sorts all open tickets before updating one. Both run
+on the same pooled connection, one claim per transaction.
+
+    python -m benchmarks.bench_claim --tickets 20000 200000 --claims 500
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from benchmarks.common import make_database, populate, remove_database, summarize
+from mcp_server import mcp as tools
+
+LEGACY_ORDER = "CASE priority WHEN 'high' THEN 1 WHEN 'medium' THEN 2 WHEN 'low' THEN 3 END, created_at"
+
+
+def _sorted_claim(c: sqlite3.Connection):
+    c.execute("BEGIN IMMEDIATE")
+    row = c.execute(f"SELECT id FROM tickets WHERE status = 'open' ORDER BY {LEGACY_ORDER} LIMIT 1").fetchone()
+    if not row:
+        return {"claimed": False}
+    ticket = c.execute("UPDATE tickets SET status = 'in_progress' WHERE id = ? RETURNING *",
+                       (row[0],)).fetchone()
+    return {"claimed": True, "ticket": dict(ticket)}
+
+
+def _measure(claim, claims):
+    latencies = []
+    for _ in range(claims):
+        t0 = time.perf_counter()
+        result = tools.pool.call(claim)
+        latencies.append(time.perf_counter() - t0)
+        if not result["claimed"]:
+            break
+    return summarize(latencies)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tickets", type=int, nargs="+", default=[20000, 200000])
+    ap.add_argument("--customers", type=int, default=5000)
+    ap.add_argument("--claims", type=int, default=500, help="claims timed per mode and size")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--until", type=datetime.fromisoformat, default=None,
+                   help="newest generated timestamp (default: start of today)")
+    args = ap.parse_args()
+
+    print("\n==================== TICKET CLAIM BENCHMARK ====================\n")
+    print(f"cpus={os.cpu_count()} claims={args.claims}\n")
+    print(f"{'tickets':>8} {'open':>7} {'mode':<6} {'claims/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for tickets in args.tickets:
+        db_path = make_database()
+        populate(db_path, args.customers, tickets, args.seed, args.until)
+        tools.use_database(db_path)
+        try:
+            open_tickets = tools.pool.call(
+                lambda c: c.execute("SELECT COUNT(*) FROM tickets WHERE status = 'open'").fetchone()[0])
+            for mode, claim in (("sort", _sorted_claim), ("index", tools._claim_next_ticket)):
+                lat = _measure(claim, args.claims)
+                print(f"{tickets:>8} {open_tickets:>7} {mode:<6} {1000 / lat['mean_ms']:>9.0f} "
+                      f"{lat['p50_ms']:>8.3f} {lat['p99_ms']:>8.3f}")
+        finally:
+            tools.pool.close()
+            remove_database(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Agent tool calls in-process versus over MCP streamable HTTP through the
+pooled client session manager, against the same database.
+
+The remote side is a separate ``python -m mcp_server.mcp --transport
+streamable-http`` process, so the numbers include protocol encoding, HTTP and
+the extra hop the agent tier pays for running apart from the database tier.
+
+    python -m benchmarks.bench_mcp_client --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.common import make_database, populate, remove_database, summarize
+from mcp_server import client, mcp as tools
+
+CALLS = {
+    "get_customer": lambda cid: {"customer_id": cid},
+    "get_customer_history": lambda cid: {"customer_id": cid},
+    "get_customers": lambda cid: {"customer_ids": [cid, cid + 1, cid + 2]},
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path: str, port: int, timeout: float = 30.0) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "mcp_server.mcp", "--transport", "streamable-http",
+         "--port", str(port), "--db", db_path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                proc.kill()
+                raise RuntimeError("MCP server did not start")
+            time.sleep(0.05)
+
+
+async def _drive(backend, tool, requests, concurrency, customers, seed):
+    rng = random.Random(seed)
+    ids = [rng.randint(1, customers - 2) for _ in range(requests)]
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(cid):
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await backend.call(tool, **CALLS[tool](cid))
+            except client.ToolError:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(cid) for cid in ids))
+    elapsed = time.perf_counter() - start
+    return {"rps": len(latencies) / elapsed, "latency": summarize(latencies), "errors": errors}
+
+
+def _report(name, tool, res):
+    lat = res["latency"]
+    print(f"{name:<10} {tool:<22} {res['rps']:>9.0f} {lat['p50_ms']:>8.2f} {lat['p95_ms']:>8.2f} "
+          f"{lat['p99_ms']:>8.2f} {res['errors']:>6}")
+
+
+async def run(args, url):
+    local = client.LocalTools()
+    remote = client.MCPClientPool(url, size=args.sessions)
+    # Warm both paths (imports, prepared statements, sessions) before timing
+    for backend in (local, remote):
+        await asyncio.gather(*(backend.call("get_customer", customer_id=i + 1) for i in range(args.sessions * 2)))
+    print(f"{'backend':<10} {'tool':<22} {'calls/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for tool in CALLS:
+        for name, backend in (("in-proc", local), ("mcp-http", remote)):
+            tools.cache.clear()
+            res = await _drive(backend, tool, args.requests, args.concurrency, args.customers, args.seed)
+            _report(name, tool, res)
+    print(f"\nclient: {remote.stats()}")
+    await remote.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--customers", type=int, default=2000)
+    ap.add_argument("--tickets", type=int, default=10000)
+    ap.add_argument("--requests", type=int, default=2000, help="calls per tool and backend")
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--sessions", type=int, default=client.CLIENT_SESSIONS)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--until", type=datetime.fromisoformat, default=None,
+                   help="newest generated timestamp (default: start of today)")
+    args = ap.parse_args()
+
+    # FastMCP turns on INFO logging, which logs every HTTP request the client makes
+    for name in ("httpx", "mcp"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    db_path = make_database()
+    populate(db_path, args.customers, args.tickets, args.seed, args.until)
+    tools.use_database(db_path)
+    port = _free_port()
+    server = start_server(db_path, port)
+    print("\n==================== MCP CLIENT: IN-PROCESS VS STREAMABLE HTTP ====================\n")
+    print(f"cpus={os.cpu_count()} customers={args.customers} tickets={args.tickets} "
+          f"concurrency={args.concurrency} sessions={args.sessions}\n")
+    try:
+        asyncio.run(run(args, f"http://127.0.0.1:{port}/mcp"))
+    finally:
+        server.terminate()
+        server.wait()
+        tools.pool.close()
+        remove_database(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Concurrent get_customer calls: per-call connections on the event loop
+(the previous implementation) versus the pooled, off-loop access layer.
+
+``before`` and ``pool`` both run the query on every call; ``pool`` bypasses
+the customer cache so it measures the access layer alone. ``cached`` is the
+``get_customer`` tool itself, reported separately with its cache hit ratio.
+"""
+
+import argparse
+import asyncio
+import sqlite3
+import time
+
+from benchmarks.common import make_database, remove_database, summarize
+from mcp_server import mcp as tools
+
+
+async def legacy_get_customer(db_path, customer_id):
+    """The pre-pool tool body: new connection per call, blocking the loop."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    with conn as c:
+        row = c.execute("SELECT * FROM customers WHERE id=?", (customer_id,)).fetchone()
+        if not row:
+            return {"found": False}
+        return {"found": True, "customer": dict(row)}
+
+
+async def _measure_loop_lag(stop: asyncio.Event, lags):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - t0 - 0.001)
+
+
+async def _drive(call, requests, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with sem:
+            t0 = time.perf_counter()
+            await call(i % 15 + 1)
+            latencies.append(time.perf_counter() - t0)
+
+    lags = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_loop_lag(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return {
+        "rps": requests / elapsed,
+        "latency": summarize(latencies),
+        "max_loop_lag_ms": max(lags, default=0.0) * 1000,
+    }
+
+
+def _report(name, res, extra=""):
+    lat = res["latency"]
+    print(f"{name:<8} {res['rps']:>10.0f} req/s | p50 {lat['p50_ms']:.2f} ms | "
+          f"p99 {lat['p99_ms']:.2f} ms | max loop lag {res['max_loop_lag_ms']:.2f} ms{extra}")
+
+
+async def main(requests, concurrency, pool_size):
+    db_path = make_database()
+    tools.use_database(db_path, size=pool_size)
+
+    print("\n==================== get_customer CONCURRENCY BENCHMARK ====================\n")
+    print(f"requests={requests} concurrency={concurrency} pool_size={pool_size}\n")
+
+    before = await _drive(lambda cid: legacy_get_customer(db_path, cid), requests, concurrency)
+    pooled = await _drive(lambda cid: tools.pool.run(tools._get_customer, cid), requests, concurrency)
+    tools.cache.clear()
+    cache0 = tools.cache.stats()
+    cached = await _drive(lambda cid: tools.get_customer(None, cid), requests, concurrency)
+    cache1 = tools.cache.stats()
+    hits = cache1["hits"] + cache1["coalesced"] - cache0["hits"] - cache0["coalesced"]
+    _report("before", before)
+    _report("pool", pooled)
+    _report("cached", cached, f" | hit ratio {hits / requests:.3f}")
+    tools.pool.close()
+    remove_database(db_path)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--pool-size", type=int, default=8)
+    args = ap.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.pool_size))
@@ -0,0 +1,101 @@
+"""Cost of encoding task replies: the fast response path against FastAPI's
+default response_model validation and jsonable_encoder walk.
+
+Requests go through the ASGI app in-process (no sockets). Each measured
+customer has a fixed number of tickets, and the tool cache is warmed first,
+so after the first call the database drops out and what remains is agent
+execution plus building and encoding the reply. Reported per request:
+process CPU time and wall-clock latency.
+
+    python -m benchmarks.bench_serialization --requests 200
+"""
+
+import argparse
+import asyncio
+import logging
+import sqlite3
+import time
+
+import httpx
+
+from benchmarks.common import make_database, remove_database, summarize
+from mcp_server import mcp as tools
+from a2a_server import http_service
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ISSUE = "Intermittent sync failure after the latest update, see attached logs"
+
+
+def add_customers(path: str, sizes) -> dict:
+    """Insert one customer per entry of ``sizes`` with that many tickets; return {size: id}."""
+    ids = {}
+    with sqlite3.connect(path) as conn:
+        for n in sizes:
+            cur = conn.execute("INSERT INTO customers (name, email) VALUES (?, ?)",
+                               (f"Bench {n}", f"bench{n}@example.com"))
+            ids[n] = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO tickets (customer_id, issue, status, priority, created_at) "
+                "VALUES (?, ?, 'resolved', 'low', datetime('now', ?))",
+                [(cur.lastrowid, f"{ISSUE} #{i}", f"-{i} minutes") for i in range(n)])
+    return ids
+
+
+async def _measure(client, cid, requests):
+    body = {"input": f"Show customer id {cid} history"}
+    r = await client.post("/a2a/records/tasks", json=body)
+    r.raise_for_status()
+    size = len(r.content)
+    latencies = []
+    cpu0 = time.process_time()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        r = await client.post("/a2a/records/tasks", json=body)
+        latencies.append(time.perf_counter() - t0)
+        r.raise_for_status()
+    cpu = (time.process_time() - cpu0) / requests
+    return size, cpu, summarize(latencies)
+
+
+async def run(ids, requests):
+    transport = httpx.ASGITransport(app=http_service.app)
+    print(f"{'tickets':>8} {'reply KB':>9} {'mode':<8} {'cpu ms/req':>11} {'p50 ms':>8} {'p95 ms':>8}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for n, cid in ids.items():
+            cpu = {}
+            for fast in (False, True):
+                http_service.FAST_RESPONSES = fast
+                size, cpu[fast], lat = await _measure(client, cid, requests)
+                mode = "fast" if fast else "default"
+                print(f"{n:>8} {size / 1024:>9.1f} {mode:<8} {cpu[fast] * 1000:>11.2f} "
+                      f"{lat['p50_ms']:>8.2f} {lat['p95_ms']:>8.2f}")
+            print(f"{'':>8} {'':>9} {'speedup':<8} {cpu[False] / cpu[True]:>10.1f}x")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 5000],
+                    help="tickets per measured customer")
+    ap.add_argument("--requests", type=int, default=200, help="timed requests per size and mode")
+    args = ap.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    http_service.WARM_UP = False
+    db_path = make_database()
+    ids = add_customers(db_path, args.sizes)
+    tools.use_database(db_path)
+    print("\n==================== TASK REPLY SERIALIZATION ====================\n")
+    print(f"encoder={'orjson' if orjson is not None else 'json'} requests={args.requests}\n")
+    try:
+        asyncio.run(run(ids, args.requests))
+    finally:
+        tools.pool.close()
+        remove_database(db_path)
+
+
+if __name__ == "__main__":
+    main()
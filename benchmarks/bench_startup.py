@@ -0,0 +1,112 @@
+"""Cold-start time of the HTTP service, broken down by phase and by imported
+package.
+
+Each run is a fresh interpreter started with ``-X importtime``. It imports
+``a2a_server.http_service``, serves the first agent card, then compiles every
+agent as the startup warm-up does. Import self-times are attributed to the
+phase they happened in and summed per top-level package.
+
+    python -m benchmarks.bench_startup --runs 5 --top 12
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+PHASES = ("import", "first_card", "warm_up")
+
+# Runs in the child interpreter; phase markers go to stderr between the
+# importtime lines, timings to stdout as JSON
+CHILD = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+sys.stderr.write("phase: import\n")
+import a2a_server.http_service as service
+t1 = time.perf_counter()
+sys.stderr.write("phase: first_card\n")
+import httpx
+
+async def first_card():
+    transport = httpx.ASGITransport(app=service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+        r = await client.get("/a2a/records/.well-known/agent-card.json")
+        assert r.status_code == 200, r.status_code
+
+asyncio.run(first_card())
+t2 = time.perf_counter()
+sys.stderr.write("phase: warm_up\n")
+service.AGENTS.load_all()
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "first_card": t2 - t1, "warm_up": t3 - t2,
+                  "agents": service.AGENTS.timings, "errors": service.AGENTS.errors}))
+"""
+
+
+def _parse_importtime(stderr: str) -> Dict[str, Dict[str, float]]:
+    """Phase -> top-level package -> summed self import time in seconds."""
+    phases: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    phase = "interpreter"
+    for line in stderr.splitlines():
+        if line.startswith("phase: "):
+            phase = line[7:].strip()
+            continue
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        package = fields[2].strip().split(".")[0]
+        phases[phase][package] += int(fields[0]) / 1e6
+    return phases
+
+
+def run_once() -> Tuple[Dict[str, float], Dict[str, Dict[str, float]]]:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    return timings, _parse_importtime(proc.stderr)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--top", type=int, default=10, help="packages listed per phase")
+    args = ap.parse_args()
+
+    walls: Dict[str, List[float]] = defaultdict(list)
+    packages: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for _ in range(args.runs):
+        timings, imports = run_once()
+        for phase in PHASES:
+            walls[phase].append(timings[phase])
+        for name, seconds in timings["agents"].items():
+            walls[f"  agent {name}"].append(seconds)
+        for phase, by_package in imports.items():
+            for package, seconds in by_package.items():
+                packages[phase][package].append(seconds)
+        if timings["errors"]:
+            print(f"agent load errors: {timings['errors']}")
+
+    print("\n==================== SERVICE STARTUP ====================\n")
+    print(f"median of {args.runs} cold starts\n")
+    print(f"{'phase':<24} {'ms':>9}")
+    for phase, values in walls.items():
+        print(f"{phase:<24} {statistics.median(values) * 1000:>9.1f}")
+    ready = sum(statistics.median(walls[p]) for p in PHASES)
+    print(f"{'total (ready)':<24} {ready * 1000:>9.1f}")
+
+    for phase in PHASES:
+        by_package = {p: statistics.median(v) for p, v in packages[phase].items()}
+        print(f"\nimports during {phase}: {sum(by_package.values()) * 1000:.1f} ms")
+        for package, seconds in sorted(by_package.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {package:<30} {seconds * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""create_ticket throughput as worker processes are added: every worker
+committing its own writes (direct), every worker group-committing locally
+(batched), and all workers forwarding writes to one writer process
+(single-writer).
+
+    python -m benchmarks.bench_writers --workers 1,2,4,8 --duration 5
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+from benchmarks.common import make_database, remove_database, summarize
+
+MODES = ("direct", "batched", "single-writer")
+
+
+def _worker(db_path, mode, socket_path, concurrency, duration, start, results):
+    from mcp_server import mcp as tools
+
+    tools.use_database(db_path)
+    if mode == "batched":
+        tools.enable_write_batching()
+    elif mode == "single-writer":
+        tools.enable_remote_writes(socket_path)
+
+    async def run():
+        latencies, errors = [], {}
+        deadline = time.perf_counter() + duration
+
+        async def one(i):
+            n = i
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    await tools.create_ticket(None, n % 15 + 1, f"bench write {n}", "low")
+                    latencies.append(time.perf_counter() - t0)
+                except Exception as e:
+                    key = f"{type(e).__name__}: {e}"[:80]
+                    errors[key] = errors.get(key, 0) + 1
+                n += concurrency
+
+        await asyncio.gather(*(one(i) for i in range(concurrency)))
+        if tools.writer is not None:
+            await tools.writer.close()
+        return latencies, errors
+
+    start.wait()
+    latencies, errors = asyncio.run(run())
+    tools.pool.close()
+    results.put((latencies, errors))
+
+
+def run_mode(db_path, mode, workers, concurrency, duration):
+    ctx = mp.get_context("spawn")
+    socket_path = os.path.join(tempfile.gettempdir(), f"bench-writer-{os.getpid()}.sock")
+    writer_proc = None
+    if mode == "single-writer":
+        from mcp_server.writer_service import spawn_writer
+        writer_proc = spawn_writer(db_path, socket_path)
+    start, results = ctx.Event(), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(db_path, mode, socket_path, concurrency,
+                                               duration, start, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    time.sleep(1.0)  # let every worker finish importing before the clock starts
+    start.set()
+    latencies, errors = [], {}
+    for _ in procs:
+        lat, err = results.get()
+        latencies.extend(lat)
+        for k, v in err.items():
+            errors[k] = errors.get(k, 0) + v
+    for p in procs:
+        p.join()
+    if writer_proc is not None:
+        writer_proc.terminate()
+        writer_proc.wait()
+    stats = summarize(latencies)
+    stats["writes_per_s"] = len(latencies) / duration
+    stats["errors"] = sum(errors.values())
+    stats["error_kinds"] = errors
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", default="1,2,4,8", help="comma-separated worker counts")
+    ap.add_argument("--concurrency", type=int, default=32, help="in-flight writes per worker")
+    ap.add_argument("--duration", type=float, default=5.0, help="seconds per run")
+    ap.add_argument("--modes", default=",".join(MODES))
+    args = ap.parse_args()
+
+    print("\n==================== MULTI-WORKER WRITE THROUGHPUT ====================\n")
+    print(f"cpus={os.cpu_count()} concurrency/worker={args.concurrency} duration={args.duration}s\n")
+    print(f"{'mode':<14} {'workers':>7} {'writes/s':>10} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'errors':>7}")
+    for mode in args.modes.split(","):
+        for workers in (int(w) for w in args.workers.split(",")):
+            db_path = make_database()
+            try:
+                s = run_mode(db_path, mode, workers, args.concurrency, args.duration)
+            finally:
+                remove_database(db_path)
+            print(f"{mode:<14} {workers:>7} {s['writes_per_s']:>10.0f} {s['p50_ms']:>9.2f} "
+                  f"{s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['errors']:>7}")
+            for kind, n in s["error_kinds"].items():
+                print(f"{'':<14} {n:>7} x {kind}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+from datetime import datetime
+from typing import Dict, List
+
+from database_setup import DatabaseSetup
+
+
+def make_database(path: str = None) -> str:
+    """Create a fresh sample database and return its path.
+
+    Args:
+        path: Target file; a temporary file is used when omitted
+    """
+    if path is None:
+        fd, path = tempfile.mkstemp(prefix="bench-", suffix=".db")
+        os.close(fd)
+        os.remove(path)
+    db = DatabaseSetup(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.connect()
+        db.create_tables()
+        db.create_triggers()
+        db.insert_sample_data()
+        db.close()
+    return path
+
+
+def populate(path: str, customers: int, tickets: int, seed: int = 0,
+             until: datetime = None) -> dict:
+    """Bulk-load synthetic customers and tickets on top of the sample data.
+
+    Args:
+        path: Database created by ``make_database``
+        customers: Extra customers to insert
+        tickets: Extra tickets to insert, skewed over the new customers
+        seed: Random seed; with ``until`` fixed, datasets are reproducible
+        until: Newest timestamp generated (default: start of today)
+    """
+    db = DatabaseSetup(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.connect()
+        stats = db.generate_data(customers, tickets, seed, until=until)
+        db.close()
+    return stats
+
+
+def remove_database(path: str):
+    """Delete a database file together with its WAL/SHM side files."""
+    for suffix in ("", "-wal", "-shm"):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path + suffix)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    ordered = sorted(samples)
+    n = len(ordered)
+
+    def pct(p):
+        return ordered[min(n - 1, int(p * n))] * 1000
+
+    return {
+        "count": n,
+        "mean_ms": statistics.fmean(ordered) * 1000 if n else 0.0,
+        "p50_ms": pct(0.50) if n else 0.0,
+        "p95_ms": pct(0.95) if n else 0.0,
+        "p99_ms": pct(0.99) if n else 0.0,
+    }
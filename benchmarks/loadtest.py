@@ -0,0 +1,344 @@
+"""Load test for the A2A HTTP service and the MCP tools.
+
+Drives every /a2a/* endpoint and every MCP tool with a weighted request mix
+at a fixed concurrency against a local SQLite dataset, then reports per-op
+p50/p95/p99 latency, throughput and peak RSS as JSON. Runs fully offline:
+the app is driven in-process through ASGI unless --url points at a server.
+
+    python -m benchmarks.loadtest run --customers 10000 --tickets 50000 --out base.json
+    python -m benchmarks.loadtest run --mix records_tasks=5,create_ticket=1 --out new.json
+    python -m benchmarks.loadtest compare base.json new.json --threshold 0.10
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import make_database, populate, remove_database, summarize
+from mcp_server import mcp as tools
+
+Op = Callable[[httpx.AsyncClient, random.Random, int], Awaitable[Any]]
+
+
+def _ok(r: httpx.Response) -> httpx.Response:
+    r.raise_for_status()
+    return r
+
+
+def _get(path: str) -> Op:
+    async def op(client, rng, n):
+        _ok(await client.get(path))
+    return op
+
+
+def _post(path: str, make_input: Callable[[random.Random, int], str]) -> Op:
+    async def op(client, rng, n):
+        _ok(await client.post(path, json={"input": make_input(rng, n)}))
+    return op
+
+
+def _batch(path: str, make_input, size: int = 20) -> Op:
+    async def op(client, rng, n):
+        inputs = [make_input(rng, n) for _ in range(size)]
+        body = _ok(await client.post(path, json={"inputs": inputs})).json()
+        if body["failed"]:
+            raise RuntimeError(f"{body['failed']} batch items failed")
+    return op
+
+
+def _stream(path: str, make_input) -> Op:
+    async def op(client, rng, n):
+        async with client.stream("POST", path, json={"input": make_input(rng, n)}) as r:
+            _ok(r)
+            async for _ in r.aiter_lines():
+                pass
+    return op
+
+
+async def _assist_session(client, rng, n):
+    first = _ok(await client.post("/a2a/assist/tasks", json={"input": "I need a support ticket"})).json()
+    sid = first["session_id"]
+    _ok(await client.get(f"/a2a/assist/sessions/{sid}"))
+    follow = f"customer id {rng.randint(1, n)}, low priority, about load test follow-up"
+    _ok(await client.post("/a2a/assist/tasks", json={"input": follow, "session_id": sid}))
+
+
+def _tool(name: str, make_args: Callable[[random.Random, int], Dict[str, Any]]) -> Op:
+    async def op(client, rng, n):
+        await tools.mcp.call_tool(name, make_args(rng, n))
+    return op
+
+
+def _cid(rng, n):
+    return rng.randint(1, n)
+
+
+def _profile(rng, n):
+    return f"Show customer id {_cid(rng, n)}"
+
+
+def _history(rng, n):
+    return f"Show customer id {_cid(rng, n)} history"
+
+
+def _ticket(rng, n):
+    return (f"Create a {rng.choice(['low', 'medium', 'high'])} priority ticket for "
+            f"customer id {_cid(rng, n)} about load test issue")
+
+
+SEARCH_TERMS = ["payment failing", "login", "timeout errors", "export csv", "dark mode", "slow dashboard"]
+
+OPS: Dict[str, Op] = {
+    # A2A HTTP endpoints
+    "coordinator_card": _get("/a2a/coordinator/.well-known/agent-card.json"),
+    "records_card": _get("/a2a/records/.well-known/agent-card.json"),
+    "assist_card": _get("/a2a/assist/.well-known/agent-card.json"),
+    "metrics": _get("/metrics"),
+    "coordinator_tasks": _post("/a2a/coordinator/tasks", _history),
+    "coordinator_dispatch": _post("/a2a/coordinator/tasks:dispatch", _history),
+    "coordinator_batch": _batch("/a2a/coordinator/tasks:batch", _ticket),
+    "records_tasks": _post("/a2a/records/tasks", _profile),
+    "records_history": _post("/a2a/records/tasks", _history),
+    "records_batch": _batch("/a2a/records/tasks:batch", _history),
+    "records_search": _post("/a2a/records/tasks", lambda r, n: f"Find tickets about {r.choice(SEARCH_TERMS)}"),
+    "records_stream": _stream("/a2a/records/tasks:stream", _history),
+    "assist_tasks": _post("/a2a/assist/tasks", _ticket),
+    "assist_batch": _batch("/a2a/assist/tasks:batch", _ticket),
+    "assist_stream": _stream("/a2a/assist/tasks:stream", _ticket),
+    "assist_session": _assist_session,
+    # MCP tools, called through FastMCP (argument validation + serialization)
+    "get_customer": _tool("get_customer", lambda r, n: {"customer_id": _cid(r, n)}),
+    "list_customers": _tool("list_customers", lambda r, n: {"status": "active", "limit": 20}),
+    "list_tickets": _tool("list_tickets", lambda r, n: {"status": "open", "priority": "high"}),
+    "update_customer": _tool("update_customer", lambda r, n: {
+        "customer_id": _cid(r, n), "data": {"phone": f"+1-555-{r.randint(0, 9999999):07d}"}}),
+    "create_ticket": _tool("create_ticket", lambda r, n: {
+        "customer_id": _cid(r, n), "issue": "load test", "priority": "medium"}),
+    "get_customer_history": _tool("get_customer_history", lambda r, n: {"customer_id": _cid(r, n)}),
+    "get_customers": _tool("get_customers", lambda r, n: {
+        "customer_ids": [_cid(r, n) for _ in range(50)]}),
+    "get_customer_histories": _tool("get_customer_histories", lambda r, n: {
+        "customer_ids": [_cid(r, n) for _ in range(50)]}),
+    "search_tickets": _tool("search_tickets", lambda r, n: {
+        "query": r.choice(SEARCH_TERMS), "status": r.choice([None, "open", "resolved"])}),
+    "get_ticket_stats": _tool("get_ticket_stats", lambda r, n: {}),
+    "get_server_stats": _tool("get_server_stats", lambda r, n: {}),
+}
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, float]:
+    """``name=weight,...``; every op with weight 1 when omitted."""
+    if not spec:
+        return {name: 1.0 for name in OPS}
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPS:
+            raise SystemExit(f"unknown op {name!r}; choose from {', '.join(OPS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def run_load(client: httpx.AsyncClient, mix: Dict[str, float], n_customers: int,
+                   requests: int, duration: float, concurrency: int, seed: int) -> Dict[str, Any]:
+    names = list(mix)
+    weights = [mix[k] for k in names]
+    latencies: Dict[str, List[float]] = {k: [] for k in names}
+    errors: Dict[str, int] = {k: 0 for k in names}
+    last_error: Dict[str, str] = {}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker(wid: int):
+        nonlocal issued
+        rng = random.Random(seed * 1000 + wid)
+        while True:
+            if requests and issued >= requests:
+                return
+            if deadline and time.perf_counter() >= deadline:
+                return
+            issued += 1
+            name = rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                await OPS[name](client, rng, n_customers)
+                latencies[name].append(time.perf_counter() - t0)
+            except Exception as e:
+                errors[name] += 1
+                last_error[name] = f"{type(e).__name__}: {e}"
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    ops = {}
+    for name in names:
+        stats = summarize(latencies[name])
+        stats["errors"] = errors[name]
+        stats["rps"] = len(latencies[name]) / elapsed
+        if name in last_error:
+            stats["last_error"] = last_error[name]
+        ops[name] = stats
+    every = [x for v in latencies.values() for x in v]
+    overall = summarize(every)
+    overall["errors"] = sum(errors.values())
+    overall["rps"] = len(every) / elapsed
+    return {"elapsed_s": elapsed, "overall": overall, "ops": ops}
+
+
+async def run(args) -> Dict[str, Any]:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("mcp").setLevel(logging.WARNING)
+    owned = args.db is None
+    db_path = make_database(args.db) if owned or not os.path.exists(args.db) else args.db
+    if owned or args.customers or args.tickets:
+        populate(db_path, args.customers, args.tickets, args.seed, args.until)
+    tools.use_database(db_path)
+
+    import agents.sessions as agent_sessions
+    session_db = tempfile.mktemp(prefix="bench-sessions-", suffix=".db")
+    agent_sessions.sessions = agent_sessions.SessionStore(session_db)
+    import a2a_server.http_service as service
+    service.sessions = agent_sessions.sessions
+
+    import sqlite3
+    with sqlite3.connect(db_path) as c:
+        n_customers = c.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+        n_tickets = c.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=service.app),
+                                   base_url="http://loadtest", timeout=60)
+    mix = parse_mix(args.mix)
+    async with client:
+        if args.warmup:
+            await run_load(client, mix, n_customers, args.warmup, 0, args.concurrency, args.seed + 1)
+        result = await run_load(client, mix, n_customers, args.requests, args.duration,
+                                args.concurrency, args.seed)
+
+    tools.pool.close()
+    agent_sessions.sessions.close()
+    remove_database(session_db)
+    if owned:
+        remove_database(db_path)
+
+    result["meta"] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": args.url or "in-process",
+        "customers": n_customers,
+        "tickets": n_tickets,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "duration": args.duration,
+        "mix": mix,
+        "seed": args.seed,
+    }
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def print_report(result: Dict[str, Any]):
+    meta = result["meta"]
+    print("\n==================== A2A / MCP LOAD TEST ====================\n")
+    print(f"target={meta['target']} customers={meta['customers']} tickets={meta['tickets']} "
+          f"concurrency={meta['concurrency']}\n")
+    print(f"{'op':<24} {'count':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(result["ops"].items()) + [("TOTAL", result["overall"])]
+    for name, s in rows:
+        print(f"{name:<24} {s['count']:>7} {s['errors']:>5} {s['rps']:>9.1f} "
+              f"{s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f}")
+    print(f"\npeak RSS: {result['peak_rss_mb']:.1f} MB")
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """Regressions: p95 up or throughput down by more than ``threshold``."""
+    flagged = []
+    pairs = [("TOTAL", base["overall"], new["overall"])]
+    pairs += [(k, base["ops"][k], new["ops"][k]) for k in new["ops"] if k in base["ops"]]
+    print(f"\n{'op':<24} {'p95 base':>10} {'p95 new':>10} {'rps base':>10} {'rps new':>10}")
+    for name, b, n in pairs:
+        mark = ""
+        if b["p95_ms"] and n["p95_ms"] > b["p95_ms"] * (1 + threshold):
+            mark = "  <- p95 regression"
+        elif b["rps"] and n["rps"] < b["rps"] * (1 - threshold):
+            mark = "  <- throughput regression"
+        if n.get("errors", 0) > b.get("errors", 0):
+            mark += "  <- more errors"
+        if mark:
+            flagged.append(name)
+        print(f"{name:<24} {b['p95_ms']:>10.2f} {n['p95_ms']:>10.2f} "
+              f"{b['rps']:>10.1f} {n['rps']:>10.1f}{mark}")
+    rss_b, rss_n = base.get("peak_rss_mb", 0), new.get("peak_rss_mb", 0)
+    if rss_b and rss_n > rss_b * (1 + threshold):
+        flagged.append("peak_rss_mb")
+        print(f"\npeak RSS {rss_b:.1f} -> {rss_n:.1f} MB  <- memory regression")
+    return flagged
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="run a load test and write JSON results")
+    r.add_argument("--db", help="SQLite file to use (default: fresh temporary dataset)")
+    r.add_argument("--customers", type=int, default=1000, help="synthetic customers to add")
+    r.add_argument("--tickets", type=int, default=5000, help="synthetic tickets to add")
+    r.add_argument("--seed", type=int, default=0)
+    r.add_argument("--until", type=datetime.fromisoformat, default=None,
+                  help="newest generated timestamp (default: start of today)")
+    r.add_argument("--concurrency", type=int, default=32)
+    r.add_argument("--requests", type=int, default=5000, help="total requests (0 = use --duration)")
+    r.add_argument("--duration", type=float, default=0.0, help="seconds to run instead of --requests")
+    r.add_argument("--warmup", type=int, default=200, help="untimed requests first")
+    r.add_argument("--mix", help="op=weight,... (default: every op, equal weight)")
+    r.add_argument("--url", help="drive a running server instead of the in-process app")
+    r.add_argument("--out", help="write JSON results here")
+
+    c = sub.add_parser("compare", help="flag regressions between two result files")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.10)
+
+    args = ap.parse_args()
+    if args.cmd == "run":
+        result = asyncio.run(run(args))
+        print_report(result)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(result, f, indent=2)
+            print(f"results written to {args.out}")
+    else:
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        flagged = compare(base, new, args.threshold)
+        print(f"\n{len(flagged)} regression(s)" + (f": {', '.join(flagged)}" if flagged else ""))
+        sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import contextlib
+import io
+
+import pytest
+
+from database_setup import DatabaseSetup
+from mcp_server import mcp as tools
+from mcp_server.cache import ReadThroughCache
+from mcp_server.pool import ConnectionPool
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A sample database the MCP tools are pointed at for one test.
+
+    The tools' pool, cache and writer are swapped in for the test and put back
+    afterwards, so later tests still see the module's own state.
+    """
+    path = str(tmp_path / "support.db")
+    setup = DatabaseSetup(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup.connect()
+        setup.create_tables()
+        setup.create_triggers()
+        setup.insert_sample_data()
+        setup.close()
+    pool = ConnectionPool(path, size=tools.POOL_SIZE)
+    monkeypatch.setattr(tools, "pool", pool)
+    monkeypatch.setattr(tools, "cache", ReadThroughCache(maxsize=tools.CACHE_SIZE, ttl=tools.CACHE_TTL))
+    monkeypatch.setattr(tools, "writer", None)
+    tools.changes.reset()
+    yield path
+    pool.close()
+    tools.changes.reset()
@@ -1,7 +1,167 @@
+import argparse
+import contextlib
+import io
+import random
 import sqlite3
-from datetime import datetime
+import sys
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
 from pathlib import Path
 
+# Work-queue order of a ticket priority, most urgent first. Queries must use
+# this exact expression for SQLite to match it to idx_tickets_open_queue.
+PRIORITY_RANK = "CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1 ELSE 2 END"
+
+# Secondary indexes as (name, definition). Kept in one place so a bulk load
+# can drop them, insert, and build them once at the end.
+INDEXES = [
+    ("idx_customers_email", "customers(email)"),
+    ("idx_tickets_customer_id", "tickets(customer_id)"),
+    # Customer history is read newest first; walking this index lets it be
+    # streamed row by row instead of sorted in memory
+    ("idx_tickets_customer_created", "tickets(customer_id, created_at)"),
+    # Composite indexes backing keyset pagination; the rowid (id) is the
+    # implicit last column, so (created_at, id) ordering needs no sort
+    ("idx_tickets_status_created", "tickets(status, created_at)"),
+    ("idx_customers_status_created", "customers(status, created_at)"),
+    ("idx_tickets_status_priority_created", "tickets(status, priority, created_at)"),
+    ("idx_tickets_priority_created", "tickets(priority, created_at)"),
+    ("idx_tickets_created", "tickets(created_at)"),
+    # The open-ticket work queue: only open tickets, in claim order (rank,
+    # then oldest, then id via the rowid), so the next ticket to work is the
+    # first index entry and a claim never sorts
+    ("idx_tickets_open_queue", f"tickets({PRIORITY_RANK}, created_at) WHERE status = 'open'"),
+    # Top customers by ticket count straight off the summary table
+    ("idx_customer_ticket_counts_total", "customer_ticket_counts(total_tickets)"),
+]
+# Resolved tickets older than this many days move to tickets_archive
+ARCHIVE_AFTER_DAYS = 90
+# Tickets moved per archival transaction, so the write lock is held briefly
+ARCHIVE_BATCH = 5000
+# Columns shared by tickets and tickets_archive
+TICKET_COLUMNS = "id, customer_id, issue, status, priority, created_at"
+
+# Triggers archiving relies on to keep the summary tables unchanged
+ARCHIVE_TRIGGERS = ("ticket_archive_stats_insert", "ticket_archive_stats_delete")
+
+# Per-row triggers a bulk load drops and replaces with one rebuild afterwards.
+# The changelog ones are not replayed: a bulk load is not streamed as changes.
+BULK_LOAD_TRIGGERS = ["tickets_fts_insert", "ticket_stats_insert", "customer_stats_insert",
+                      "changelog_tickets_insert", "changelog_customers_insert"]
+
+# Tables whose row changes are captured in changelog, as entity ->
+# (table, customer id column, columns in the event's row image). A customer's
+# updated_at is left out: the event's own timestamp is the update time.
+CHANGELOG_SOURCES = {
+    "ticket": ("tickets", "customer_id", ["id", "customer_id", "issue", "status", "priority", "created_at"]),
+    "customer": ("customers", "id", ["id", "name", "email", "phone", "status", "created_at"]),
+}
+
+# Summary tables maintained by the *_stats_* triggers, with the query that
+# computes each one from scratch (used to rebuild and to check them). Ticket
+# counts cover archived tickets too, so archiving leaves them unchanged.
+STATS_TABLES = {
+    "ticket_counts": ("status, priority, n", """
+        SELECT s.status, p.priority, COUNT(t.id)
+        FROM (SELECT 'open' AS status UNION ALL SELECT 'in_progress'
+              UNION ALL SELECT 'resolved') s
+        CROSS JOIN (SELECT 'low' AS priority UNION ALL SELECT 'medium'
+                    UNION ALL SELECT 'high') p
+        LEFT JOIN (SELECT id, status, priority FROM tickets
+                   UNION ALL SELECT id, status, priority FROM tickets_archive) t
+          ON t.status = s.status AND t.priority = p.priority
+        GROUP BY s.status, p.priority
+    """),
+    "customer_ticket_counts": (
+        "customer_id, active, total_tickets, open_tickets, in_progress_tickets, resolved_tickets", """
+        SELECT c.id, c.status = 'active', COUNT(t.id),
+               COALESCE(SUM(t.status = 'open'), 0),
+               COALESCE(SUM(t.status = 'in_progress'), 0),
+               COALESCE(SUM(t.status = 'resolved'), 0)
+        FROM customers c
+        LEFT JOIN (SELECT id, customer_id, status FROM tickets
+                   UNION ALL SELECT id, customer_id, status FROM tickets_archive) t
+          ON t.customer_id = c.id
+        GROUP BY c.id
+    """),
+    "summary_counters": ("name, n", """
+        SELECT 'customers_active', COUNT(*) FROM customers WHERE status = 'active'
+        UNION ALL
+        SELECT 'customers_disabled', COUNT(*) FROM customers WHERE status = 'disabled'
+        UNION ALL
+        SELECT 'active_customers_with_open_tickets', COUNT(DISTINCT c.id)
+        FROM customers c JOIN tickets t ON t.customer_id = c.id
+        WHERE c.status = 'active' AND t.status = 'open'
+    """),
+}
+
+# Synthetic data distributions (value, weight)
+CUSTOMER_STATUSES = [("active", 85), ("disabled", 15)]
+TICKET_STATUSES = [("resolved", 60), ("in_progress", 15), ("open", 25)]
+TICKET_PRIORITIES = [("low", 50), ("medium", 35), ("high", 15)]
+# Pareto shape for tickets per customer: most customers file a few tickets,
+# a small head files most of them
+TICKET_SKEW = 1.16
+SYNTHETIC_DAYS = 730
+# Tickets older than this are mostly resolved
+RECENT_DAYS = 30
+OLD_TICKET_STATUSES = [("resolved", 92), ("in_progress", 3), ("open", 5)]
+FIRST_NAMES = ["John", "Jane", "Bob", "Alice", "Charlie", "Diana", "Edward", "Fiona",
+               "George", "Hannah", "Isaac", "Julia", "Kevin", "Laura", "Michael", "Nina"]
+LAST_NAMES = ["Doe", "Smith", "Johnson", "Williams", "Brown", "Prince", "Norton", "Green",
+              "Miller", "Lee", "Newton", "Roberts", "Chen", "Martinez", "Scott", "Garcia"]
+ISSUES = [
+    "Cannot login to account", "Password reset not working", "Payment processing failing",
+    "Dashboard loading very slowly", "Export to CSV feature broken", "Mobile app crashes on startup",
+    "Email notifications not being received", "Billing question about invoice",
+    "Feature request: dark mode", "Search returning wrong results", "API rate limiting too restrictive",
+    "Database connection timeout errors", "Profile image upload fails", "Question about pricing plans",
+]
+
+
+def _cumulative(weights):
+    """Values and cumulative probabilities of a (value, weight) list."""
+    values, w = zip(*weights)
+    total, acc, cum = sum(w), 0, []
+    for x in w[:-1]:
+        acc += x
+        cum.append(acc / total)
+    return values, cum
+
+
+def archive_triggers_missing(conn: sqlite3.Connection) -> list:
+    """Triggers archiving needs that are missing or predate the archive.
+
+    A database created before tickets_archive lacks the archive stats
+    triggers, and its changelog delete trigger would log every archived
+    ticket as deleted. ``DatabaseSetup.create_triggers`` installs both.
+    """
+    found = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger'"))
+    missing = [name for name in ARCHIVE_TRIGGERS if name not in found]
+    delete = found.get("changelog_tickets_delete")
+    if delete is not None and "tickets_archive" not in delete:
+        missing.append("changelog_tickets_delete")
+    return missing
+
+
+def archive_resolved_tickets(conn: sqlite3.Connection, days: float, limit: int) -> int:
+    """Move up to ``limit`` resolved tickets created over ``days`` ago, oldest
+    first, from tickets to tickets_archive. The caller commits.
+
+    Returns:
+        Number of tickets moved
+    """
+    # One cutoff for both statements, so they select exactly the same rows
+    cutoff = conn.execute("SELECT datetime('now', ?)", (f"-{days} days",)).fetchone()[0]
+    batch = ("SELECT {} FROM tickets WHERE status = 'resolved' AND created_at < ? "
+             "ORDER BY created_at, id LIMIT ?")
+    # Archive first: the changelog delete trigger skips rows found there
+    moved = conn.execute(f"INSERT INTO tickets_archive ({TICKET_COLUMNS}) "
+                         + batch.format(TICKET_COLUMNS), (cutoff, limit)).rowcount
+    conn.execute(f"DELETE FROM tickets WHERE id IN ({batch.format('id')})", (cutoff, limit))
+    return moved
+
 
 class DatabaseSetup:
     """SQLite database setup for customer support system."""
@@ -23,8 +183,13 @@ class DatabaseSetup:
         self.cursor = self.conn.cursor()
         print(f"Connected to database: {self.db_path}")
 
-    def create_tables(self):
-        """Create customers and tickets tables."""
+    def create_tables(self, indexes: bool = True):
+        """Create customers and tickets tables.
+
+        Args:
+            indexes: Also create the secondary indexes; bulk loads pass False
+                and call ``create_indexes`` once the rows are in
+        """
 
         # Create customers table
         self.cursor.execute("""
@@ -52,24 +217,146 @@ class DatabaseSetup:
             )
         """)
 
-        # Create indexes for better query performance
+        # Cold storage for old resolved tickets (see archive_resolved_tickets).
+        # Same columns as tickets plus when the row moved; one index, for
+        # customer history, so the hot table's indexes only cover live rows
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tickets_archive (
+                id INTEGER PRIMARY KEY,
+                customer_id INTEGER NOT NULL,
+                issue TEXT NOT NULL,
+                status TEXT NOT NULL,
+                priority TEXT NOT NULL,
+                created_at DATETIME,
+                archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (customer_id) REFERENCES customers(id) ON DELETE CASCADE
+            )
+        """)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tickets_archive_customer_created
+            ON tickets_archive(customer_id, created_at)
+        """)
+
+        # Full-text index over ticket issues. External content: the text lives
+        # only in tickets, the triggers in create_triggers keep the index in sync
+        exists = self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'tickets_fts'"
+        ).fetchone()
         self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_customers_email ON customers(email)
+            CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+                issue,
+                content='tickets',
+                content_rowid='id',
+                tokenize='porter unicode61'
+            )
         """)
+        if not exists:
+            self.rebuild_search_index()
 
+        # Ticket statistics, kept current by the *_stats_* triggers so readers
+        # never aggregate over tickets (see STATS_TABLES)
+        exists = self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'ticket_counts'"
+        ).fetchone()
         self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tickets_customer_id ON tickets(customer_id)
+            CREATE TABLE IF NOT EXISTS ticket_counts (
+                status TEXT NOT NULL,
+                priority TEXT NOT NULL,
+                n INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (status, priority)
+            ) WITHOUT ROWID
         """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS customer_ticket_counts (
+                customer_id INTEGER PRIMARY KEY,
+                active INTEGER NOT NULL,
+                total_tickets INTEGER NOT NULL DEFAULT 0,
+                open_tickets INTEGER NOT NULL DEFAULT 0,
+                in_progress_tickets INTEGER NOT NULL DEFAULT 0,
+                resolved_tickets INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS summary_counters (
+                name TEXT PRIMARY KEY,
+                n INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        if not exists:
+            self.rebuild_stats()
 
+        # Change-data-capture log, appended by the changelog_* triggers. seq
+        # never goes backwards or is reused (AUTOINCREMENT), and SQLite has a
+        # single writer, so rows become visible in seq order and a reader can
+        # resume from the last seq it saw.
         self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status)
+            CREATE TABLE IF NOT EXISTS changelog (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                entity TEXT NOT NULL CHECK(entity IN ('ticket', 'customer')),
+                entity_id INTEGER NOT NULL,
+                op TEXT NOT NULL CHECK(op IN ('insert', 'update', 'delete')),
+                customer_id INTEGER,
+                data TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
         """)
 
+        if indexes:
+            self.create_indexes()
+
         self.conn.commit()
         print("Tables created successfully!")
 
+    def create_indexes(self):
+        """Create the secondary indexes listed in ``INDEXES``."""
+        for name, definition in INDEXES:
+            self.cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+        self.conn.commit()
+
+    def drop_indexes(self):
+        """Drop the secondary indexes so bulk inserts only touch the tables."""
+        for name, _ in INDEXES:
+            self.cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        self.conn.commit()
+
+    def rebuild_search_index(self):
+        """Re-index every ticket issue in ``tickets_fts``."""
+        self.cursor.execute("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')")
+        self.conn.commit()
+
+    def rebuild_stats(self):
+        """Recompute every summary table in ``STATS_TABLES`` from scratch."""
+        for table, (columns, query) in STATS_TABLES.items():
+            self.cursor.execute(f"DELETE FROM {table}")
+            self.cursor.execute(f"INSERT INTO {table} ({columns}) {query}")
+        self.conn.commit()
+
+    def check_stats(self, repair: bool = False) -> dict:
+        """Compare the summary tables with counts computed from the live rows.
+
+        Args:
+            repair: Rebuild the summaries when they disagree
+
+        Returns:
+            Per table, the rows only in the summary ("stale") and the rows
+            only in the live counts ("expected"), plus an overall ``ok``
+        """
+        report = {}
+        for table, (columns, query) in STATS_TABLES.items():
+            stale = self.cursor.execute(
+                f"SELECT {columns} FROM {table} EXCEPT SELECT * FROM ({query}) LIMIT 20"
+            ).fetchall()
+            expected = self.cursor.execute(
+                f"SELECT * FROM ({query}) EXCEPT SELECT {columns} FROM {table} LIMIT 20"
+            ).fetchall()
+            report[table] = {"stale": stale, "expected": expected}
+        ok = all(not r["stale"] and not r["expected"] for r in report.values())
+        if repair and not ok:
+            self.rebuild_stats()
+        return {"ok": ok, "repaired": repair and not ok, "tables": report}
+
     def create_triggers(self):
-        """Create triggers for automatic timestamp updates."""
+        """Create triggers for automatic timestamp updates and search indexing."""
 
         # Trigger to update updated_at on customers table
         self.cursor.execute("""
@@ -81,6 +368,204 @@ class DatabaseSetup:
             END
         """)
 
+        # Keep the full-text index in step with tickets.issue
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS tickets_fts_insert
+            AFTER INSERT ON tickets
+            BEGIN
+                INSERT INTO tickets_fts(rowid, issue) VALUES (NEW.id, NEW.issue);
+            END
+        """)
+
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS tickets_fts_delete
+            AFTER DELETE ON tickets
+            BEGIN
+                INSERT INTO tickets_fts(tickets_fts, rowid, issue) VALUES ('delete', OLD.id, OLD.issue);
+            END
+        """)
+
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS tickets_fts_update
+            AFTER UPDATE OF issue ON tickets
+            BEGIN
+                INSERT INTO tickets_fts(tickets_fts, rowid, issue) VALUES ('delete', OLD.id, OLD.issue);
+                INSERT INTO tickets_fts(rowid, issue) VALUES (NEW.id, NEW.issue);
+            END
+        """)
+
+        # Ticket statistics (see STATS_TABLES). Each ticket change moves its
+        # counts between buckets; a customer enters or leaves the "active with
+        # open tickets" counter when its open count crosses zero.
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS ticket_stats_insert
+            AFTER INSERT ON tickets
+            BEGIN
+                UPDATE ticket_counts SET n = n + 1
+                WHERE status = NEW.status AND priority = NEW.priority;
+                UPDATE customer_ticket_counts SET
+                    total_tickets = total_tickets + 1,
+                    open_tickets = open_tickets + (NEW.status = 'open'),
+                    in_progress_tickets = in_progress_tickets + (NEW.status = 'in_progress'),
+                    resolved_tickets = resolved_tickets + (NEW.status = 'resolved')
+                WHERE customer_id = NEW.customer_id;
+                UPDATE summary_counters SET n = n + 1
+                WHERE name = 'active_customers_with_open_tickets' AND NEW.status = 'open'
+                  AND EXISTS (SELECT 1 FROM customer_ticket_counts
+                              WHERE customer_id = NEW.customer_id AND active AND open_tickets = 1);
+            END
+        """)
+
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS ticket_stats_delete
+            AFTER DELETE ON tickets
+            BEGIN
+                UPDATE ticket_counts SET n = n - 1
+                WHERE status = OLD.status AND priority = OLD.priority;
+                UPDATE customer_ticket_counts SET
+                    total_tickets = total_tickets - 1,
+                    open_tickets = open_tickets - (OLD.status = 'open'),
+                    in_progress_tickets = in_progress_tickets - (OLD.status = 'in_progress'),
+                    resolved_tickets = resolved_tickets - (OLD.status = 'resolved')
+                WHERE customer_id = OLD.customer_id;
+                UPDATE summary_counters SET n = n - 1
+                WHERE name = 'active_customers_with_open_tickets' AND OLD.status = 'open'
+                  AND EXISTS (SELECT 1 FROM customer_ticket_counts
+                              WHERE customer_id = OLD.customer_id AND active AND open_tickets = 0);
+            END
+        """)
+
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS ticket_stats_update
+            AFTER UPDATE OF status, priority, customer_id ON tickets
+            BEGIN
+                UPDATE ticket_counts SET n = n - 1
+                WHERE status = OLD.status AND priority = OLD.priority;
+                UPDATE customer_ticket_counts SET
+                    total_tickets = total_tickets - 1,
+                    open_tickets = open_tickets - (OLD.status = 'open'),
+                    in_progress_tickets = in_progress_tickets - (OLD.status = 'in_progress'),
+                    resolved_tickets = resolved_tickets - (OLD.status = 'resolved')
+                WHERE customer_id = OLD.customer_id;
+                UPDATE summary_counters SET n = n - 1
+                WHERE name = 'active_customers_with_open_tickets' AND OLD.status = 'open'
+                  AND EXISTS (SELECT 1 FROM customer_ticket_counts
+                              WHERE customer_id = OLD.customer_id AND active AND open_tickets = 0);
+                UPDATE ticket_counts SET n = n + 1
+                WHERE status = NEW.status AND priority = NEW.priority;
+                UPDATE customer_ticket_counts SET
+                    total_tickets = total_tickets + 1,
+                    open_tickets = open_tickets + (NEW.status = 'open'),
+                    in_progress_tickets = in_progress_tickets + (NEW.status = 'in_progress'),
+                    resolved_tickets = resolved_tickets + (NEW.status = 'resolved')
+                WHERE customer_id = NEW.customer_id;
+                UPDATE summary_counters SET n = n + 1
+                WHERE name = 'active_customers_with_open_tickets' AND NEW.status = 'open'
+                  AND EXISTS (SELECT 1 FROM customer_ticket_counts
+                              WHERE customer_id = NEW.customer_id AND active AND open_tickets = 1);
+            END
+        """)
+
+        # Archived tickets still count. Archiving is a delete from tickets
+        # plus an insert here, so the summaries come out unchanged.
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS ticket_archive_stats_insert
+            AFTER INSERT ON tickets_archive
+            BEGIN
+                UPDATE ticket_counts SET n = n + 1
+                WHERE status = NEW.status AND priority = NEW.priority;
+                UPDATE customer_ticket_counts SET
+                    total_tickets = total_tickets + 1,
+                    open_tickets = open_tickets + (NEW.status = 'open'),
+                    in_progress_tickets = in_progress_tickets + (NEW.status = 'in_progress'),
+                    resolved_tickets = resolved_tickets + (NEW.status = 'resolved')
+                WHERE customer_id = NEW.customer_id;
+            END
+        """)
+
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS ticket_archive_stats_delete
+            AFTER DELETE ON tickets_archive
+            BEGIN
+                UPDATE ticket_counts SET n = n - 1
+                WHERE status = OLD.status AND priority = OLD.priority;
+                UPDATE customer_ticket_counts SET
+                    total_tickets = total_tickets - 1,
+                    open_tickets = open_tickets - (OLD.status = 'open'),
+                    in_progress_tickets = in_progress_tickets - (OLD.status = 'in_progress'),
+                    resolved_tickets = resolved_tickets - (OLD.status = 'resolved')
+                WHERE customer_id = OLD.customer_id;
+            END
+        """)
+
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS customer_stats_insert
+            AFTER INSERT ON customers
+            BEGIN
+                INSERT INTO customer_ticket_counts (customer_id, active)
+                VALUES (NEW.id, NEW.status = 'active');
+                UPDATE summary_counters SET n = n + 1 WHERE name = 'customers_' || NEW.status;
+            END
+        """)
+
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS customer_stats_update
+            AFTER UPDATE OF status ON customers
+            WHEN OLD.status != NEW.status
+            BEGIN
+                UPDATE summary_counters SET n = n - 1 WHERE name = 'customers_' || OLD.status;
+                UPDATE summary_counters SET n = n + 1 WHERE name = 'customers_' || NEW.status;
+                UPDATE summary_counters SET n = n + (NEW.status = 'active') - (OLD.status = 'active')
+                WHERE name = 'active_customers_with_open_tickets'
+                  AND EXISTS (SELECT 1 FROM customer_ticket_counts
+                              WHERE customer_id = NEW.id AND open_tickets > 0);
+                UPDATE customer_ticket_counts SET active = (NEW.status = 'active')
+                WHERE customer_id = NEW.id;
+            END
+        """)
+
+        # Cascaded ticket deletes may fire before or after this; whichever runs
+        # second finds nothing left to subtract
+        self.cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS customer_stats_delete
+            AFTER DELETE ON customers
+            BEGIN
+                UPDATE summary_counters SET n = n - 1 WHERE name = 'customers_' || OLD.status;
+                UPDATE summary_counters SET n = n - 1
+                WHERE name = 'active_customers_with_open_tickets'
+                  AND EXISTS (SELECT 1 FROM customer_ticket_counts
+                              WHERE customer_id = OLD.id AND active AND open_tickets > 0);
+                DELETE FROM customer_ticket_counts WHERE customer_id = OLD.id;
+            END
+        """)
+
+        # Change data capture (see CHANGELOG_SOURCES): one changelog row per
+        # inserted, updated or deleted row, carrying the row as JSON (the old
+        # row for deletes). Customer updates only count when a data column
+        # changes, so the updated_at bump above is not logged a second time.
+        # Tickets moving to the archive are not deletions and are not logged.
+        for entity, (table, owner, columns) in CHANGELOG_SOURCES.items():
+            watched = ", ".join(c for c in columns if c not in ("id", "created_at"))
+            for op, event, ref in (("insert", "INSERT", "NEW"),
+                                   ("update", f"UPDATE OF {watched}", "NEW"),
+                                   ("delete", "DELETE", "OLD")):
+                image = ", ".join(f"'{c}', {ref}.{c}" for c in columns)
+                when = ""
+                if table == "tickets" and op == "delete":
+                    when = "WHEN NOT EXISTS (SELECT 1 FROM tickets_archive WHERE id = OLD.id)"
+                    if "changelog_tickets_delete" in archive_triggers_missing(self.conn):
+                        # Created before the archive, without the guard; IF NOT
+                        # EXISTS below would keep it
+                        self.cursor.execute("DROP TRIGGER changelog_tickets_delete")
+                self.cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS changelog_{table}_{op}
+                    AFTER {event} ON {table} {when}
+                    BEGIN
+                        INSERT INTO changelog (entity, entity_id, op, customer_id, data)
+                        VALUES ('{entity}', {ref}.id, '{op}', {ref}.{owner}, json_object({image}));
+                    END
+                """)
+
         self.conn.commit()
         print("Triggers created successfully!")
 
@@ -155,6 +640,166 @@ class DatabaseSetup:
         print(f"  - {len(customers)} customers added")
         print(f"  - {len(tickets)} tickets added")
 
+    def generate_data(self, customers: int, tickets: int, seed: int = 0,
+                      chunk_size: int = 50000, until: datetime = None) -> dict:
+        """Bulk-load synthetic customers and tickets.
+
+        Rows are generated deterministically from ``seed``: customer status,
+        ticket status and priority follow the weights above, tickets per
+        customer follow a Pareto distribution and older tickets are mostly
+        resolved. Rows are written with chunked ``executemany`` in a single
+        transaction with durability relaxed for the load. Secondary indexes
+        and per-row triggers are dropped first, and the indexes and search
+        index are built once at the end.
+
+        Args:
+            customers: Customers to add
+            tickets: Tickets to add, spread over the new customers
+            seed: Random seed; the same seed and ``until`` give the same rows
+            chunk_size: Rows generated and inserted per ``executemany`` call
+            until: Newest timestamp generated (default: start of today)
+
+        Returns:
+            Row counts, timings and throughput of the load
+        """
+        # One generator per stream. A chunk's batched choices() and its per-row
+        # draws then never interleave on one sequence, so chunk_size cannot
+        # change the rows
+        rng = {name: random.Random(f"{seed}:{name}")
+               for name in ("customer_status", "name", "skew", "owner", "priority", "ticket")}
+        until = until or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        span = SYNTHETIC_DAYS * 86400
+        start = until - timedelta(seconds=span)
+        recent = span - RECENT_DAYS * 86400
+        first_id = self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM customers").fetchone()[0] + 1
+        if tickets and not customers:
+            raise ValueError("tickets need at least one new customer")
+
+        # Formatting through a per-day string table is much cheaper than a
+        # datetime per row
+        origin = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        shift = (start - origin).total_seconds()
+        days = [(origin + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(SYNTHETIC_DAYS + 2)]
+
+        def stamp(offset):
+            d, s = divmod(int(offset + shift), 86400)
+            return f"{days[d]} {s // 3600:02d}:{s // 60 % 60:02d}:{s % 60:02d}"
+
+        def chunks(total):
+            for lo in range(0, total, chunk_size):
+                yield lo, min(chunk_size, total - lo)
+
+        # Load-time settings: no sync, big cache, no FK checks; restored below
+        self.conn.commit()
+        self.cursor.execute("PRAGMA journal_mode=MEMORY")
+        self.cursor.execute("PRAGMA synchronous=OFF")
+        self.cursor.execute("PRAGMA cache_size=-262144")
+        self.cursor.execute("PRAGMA temp_store=MEMORY")
+        self.cursor.execute("PRAGMA foreign_keys=OFF")
+        self.drop_indexes()
+        for name in BULK_LOAD_TRIGGERS:
+            self.cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+        t0 = time.perf_counter()
+        statuses, status_w = zip(*CUSTOMER_STATUSES)
+        # Customers sign up at a steady rate over the window
+        joined = [i * span / max(customers, 1) for i in range(customers)]
+        for lo, n in chunks(customers):
+            rows = []
+            names = rng["name"]
+            picks = rng["customer_status"].choices(statuses, status_w, k=n)
+            for i, status in zip(range(lo, lo + n), picks):
+                cid = first_id + i
+                first, last = names.choice(FIRST_NAMES), names.choice(LAST_NAMES)
+                created = stamp(joined[i])
+                rows.append((cid, f"{first} {last}", f"{first.lower()}.{last.lower()}{cid}@example.com",
+                             f"+1-555-{cid:07d}", status, created, created))
+            self.cursor.executemany("""
+                INSERT INTO customers (id, name, email, phone, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+        t1 = time.perf_counter()
+
+        ids = range(customers)
+        cum_weights = []
+        total = 0.0
+        for _ in ids:
+            total += rng["skew"].paretovariate(TICKET_SKEW)
+            cum_weights.append(total)
+        new_statuses, new_cum = _cumulative(TICKET_STATUSES)
+        old_statuses, old_cum = _cumulative(OLD_TICKET_STATUSES)
+        priorities, priority_w = zip(*TICKET_PRIORITIES)
+        for lo, n in chunks(tickets):
+            owners = rng["owner"].choices(ids, cum_weights=cum_weights, k=n) if tickets else []
+            prios = rng["priority"].choices(priorities, priority_w, k=n)
+            rows = []
+            draw = rng["ticket"]
+            for i, prio in zip(owners, prios):
+                # Filed some time after the customer joined
+                offset = joined[i] + draw.random() * (span - joined[i])
+                if offset < recent:
+                    status = old_statuses[bisect_right(old_cum, draw.random())]
+                else:
+                    status = new_statuses[bisect_right(new_cum, draw.random())]
+                rows.append((first_id + i, f"{draw.choice(ISSUES)} (#{draw.randrange(100000)})",
+                             status, prio, stamp(offset)))
+            self.cursor.executemany("""
+                INSERT INTO tickets (customer_id, issue, status, priority, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+        self.conn.commit()
+        t2 = time.perf_counter()
+
+        self.create_indexes()
+        self.rebuild_search_index()
+        self.rebuild_stats()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.create_triggers()
+        self.cursor.execute("ANALYZE")
+        self.conn.commit()
+        t3 = time.perf_counter()
+
+        self.cursor.execute("PRAGMA foreign_keys=ON")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+
+        load_s = t2 - t0
+        return {
+            "customers": customers,
+            "tickets": tickets,
+            "seed": seed,
+            "customers_s": t1 - t0,
+            "tickets_s": t2 - t1,
+            "index_s": t3 - t2,
+            "total_s": t3 - t0,
+            "rows_per_s": (customers + tickets) / load_s if load_s else 0.0,
+        }
+
+    def archive_tickets(self, days: float = ARCHIVE_AFTER_DAYS, batch: int = ARCHIVE_BATCH) -> int:
+        """Move every resolved ticket older than ``days`` to ``tickets_archive``.
+
+        Args:
+            days: Minimum age, by created_at, of the tickets moved
+            batch: Tickets moved per transaction
+
+        Returns:
+            Number of tickets archived
+
+        Raises:
+            RuntimeError: ``create_triggers`` has not been run since the
+                archive was added, so archiving would corrupt the statistics
+        """
+        missing = archive_triggers_missing(self.conn)
+        if missing:
+            raise RuntimeError(f"archive triggers missing: {', '.join(missing)}; run create_triggers")
+        total = 0
+        while True:
+            moved = archive_resolved_tickets(self.conn, days, batch)
+            self.conn.commit()
+            total += moved
+            if moved < batch:
+                return total
+
     def display_schema(self):
         """Display the database schema."""
 
@@ -195,17 +840,12 @@ class DatabaseSetup:
         # Query 1: Get all open tickets
         print("\n1. All Open Tickets:")
         print("-" * 60)
-        self.cursor.execute("""
+        self.cursor.execute(f"""
             SELECT t.id, c.name, t.issue, t.priority, t.created_at
             FROM tickets t
             JOIN customers c ON t.customer_id = c.id
             WHERE t.status = 'open'
-            ORDER BY
-                CASE t.priority
-                    WHEN 'high' THEN 1
-                    WHEN 'medium' THEN 2
-                    WHEN 'low' THEN 3
-                END, t.created_at
+            ORDER BY {PRIORITY_RANK}, t.created_at, t.id
         """)
         for row in self.cursor.fetchall():
             print(f"  Ticket #{row[0]} | {row[1]:<20} | {row[3].upper():<6} | {row[2]}")
@@ -351,8 +991,72 @@ class DatabaseSetup:
             print("Database connection closed.")
 
 
-def main():
-    """Main function to setup the database."""
+def generate(args):
+    """Non-interactive bulk load: schema, optional sample data, synthetic rows."""
+    db = DatabaseSetup(args.db)
+    try:
+        db.connect()
+        db.create_tables(indexes=False)
+        db.create_triggers()
+        if args.sample_data:
+            db.insert_sample_data()
+        print(f"Generating {args.customers:,} customers and {args.tickets:,} tickets (seed {args.seed})...")
+        stats = db.generate_data(args.customers, args.tickets, args.seed, args.chunk_size, args.until)
+        print(f"  customers: {stats['customers_s']:.2f}s "
+              f"({stats['customers'] / max(stats['customers_s'], 1e-9):,.0f} rows/s)")
+        print(f"  tickets:   {stats['tickets_s']:.2f}s "
+              f"({stats['tickets'] / max(stats['tickets_s'], 1e-9):,.0f} rows/s)")
+        print(f"  indexes:   {stats['index_s']:.2f}s")
+        print(f"  total:     {stats['total_s']:.2f}s ({stats['rows_per_s']:,.0f} rows/s loaded)")
+        if args.queries:
+            db.run_sample_queries()
+        print("\n✓ Database setup complete!")
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+def check_stats(args):
+    """Compare the summary tables with live counts, optionally repairing them."""
+    db = DatabaseSetup(args.db)
+    try:
+        db.connect()
+        report = db.check_stats(repair=args.repair)
+        for table, diff in report["tables"].items():
+            state = "ok" if not diff["stale"] and not diff["expected"] else "MISMATCH"
+            print(f"  {table:<24} {state}")
+            for row in diff["stale"]:
+                print(f"    summary: {row}")
+            for row in diff["expected"]:
+                print(f"    live:    {row}")
+        if report["repaired"]:
+            print("Summary tables rebuilt.")
+        if not report["ok"] and not report["repaired"]:
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+def archive_tickets(args):
+    """Move old resolved tickets to the archive table."""
+    db = DatabaseSetup(args.db)
+    try:
+        db.connect()
+        # Migrates a database from before the archive: the table, then the
+        # archive stats triggers and the guarded changelog delete trigger
+        db.create_tables()
+        db.create_triggers()
+        t0 = time.perf_counter()
+        moved = db.archive_tickets(args.days, args.batch)
+        print(f"Archived {moved} tickets in {time.perf_counter() - t0:.2f}s")
+    finally:
+        db.close()
+
+
+def interactive():
+    """Interactive setup with the small sample dataset."""
 
     # Initialize database
     db = DatabaseSetup("support.db")
@@ -403,5 +1107,51 @@ def main():
         db.close()
 
 
+def main():
+    """Main function to setup the database.
+
+    Without arguments the setup is interactive. ``generate`` bulk-loads a
+    synthetic dataset without prompting, ``check-stats`` verifies the
+    statistics summary tables and ``archive`` moves old resolved tickets to
+    the archive table, e.g.::
+
+        python database_setup.py generate --customers 1000000 --tickets 5000000 --seed 7
+        python database_setup.py check-stats --repair
+        python database_setup.py archive --days 90
+    """
+    if len(sys.argv) == 1:
+        interactive()
+        return
+
+    parser = argparse.ArgumentParser(description="Set up the customer support database.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="bulk-load synthetic customers and tickets")
+    gen.add_argument("--db", default="support.db", help="SQLite database file")
+    gen.add_argument("--customers", type=int, default=10000)
+    gen.add_argument("--tickets", type=int, default=50000)
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--chunk-size", type=int, default=50000, help="rows per executemany")
+    gen.add_argument("--until", type=datetime.fromisoformat, default=None,
+                     help="newest timestamp generated, e.g. 2026-01-01 (default: start of today)")
+    gen.add_argument("--sample-data", action="store_true", help="insert the 15 sample customers first")
+    gen.add_argument("--queries", action="store_true", help="run the sample queries afterwards")
+    check = sub.add_parser("check-stats", help="verify the ticket statistics summary tables")
+    check.add_argument("--db", default="support.db", help="SQLite database file")
+    check.add_argument("--repair", action="store_true", help="rebuild the summaries if they disagree")
+    archive = sub.add_parser("archive", help="move old resolved tickets to tickets_archive")
+    archive.add_argument("--db", default="support.db", help="SQLite database file")
+    archive.add_argument("--days", type=float, default=ARCHIVE_AFTER_DAYS,
+                         help="archive resolved tickets created more than this many days ago")
+    archive.add_argument("--batch", type=int, default=ARCHIVE_BATCH, help="tickets per transaction")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args)
+    elif args.command == "archive":
+        archive_tickets(args)
+    else:
+        check_stats(args)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+
+class LoadAbandoned(Exception):
+    """A shared load stopped before producing a value; callers load again."""
+
+
+class ReadThroughCache:
+    """In-process LRU cache with a TTL and coalesced loads.
+
+    Concurrent misses for the same key share one in-flight load. A key that is
+    invalidated while its load is still running is not repopulated by that
+    load, so a write can never be shadowed by a read that started before it.
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached keys (least recently used evicted)
+            ttl: Seconds an entry stays valid; 0 disables caching entirely
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._loads: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key`` or await ``loader()`` once for it.
+
+        The load runs in its own task, so cancelling the caller that started it
+        does not cancel it for the callers sharing it.
+        """
+        missing = object()
+        while True:
+            value = self.get(key, missing)
+            if value is not missing:
+                self.hits += 1
+                return value
+
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                loop = asyncio.get_running_loop()
+                pending = self._inflight[key] = loop.create_future()
+                task = loop.create_task(self._load(key, pending, loader))
+                self._loads.add(task)
+                task.add_done_callback(self._loads.discard)
+            try:
+                return await asyncio.shield(pending)
+            except LoadAbandoned:
+                continue  # the shared load was cancelled; start a fresh one
+
+    async def _load(self, key: Hashable, fut: asyncio.Future, loader: Callable[[], Awaitable[Any]]):
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            fut.set_exception(LoadAbandoned(f"load of {key!r} was cancelled"))
+            fut.exception()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            # Waiters re-raise it; mark retrieved for the no-waiter case.
+            fut.exception()
+            return
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+                stale = False
+            else:
+                stale = True
+        if not stale:
+            self.put(key, value)
+        fut.set_result(value)
+
+    def invalidate(self, *keys: Hashable):
+        """Drop ``keys`` and detach any load for them that is still running."""
+        for key in keys:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._inflight.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
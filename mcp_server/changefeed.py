@@ -0,0 +1,185 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+# Recent events kept in memory; subscribers further behind read the database
+CHANGE_BUFFER = 10000
+# Seconds between changelog polls while anyone is subscribed
+POLL_INTERVAL = 0.2
+# Changelog rows read per query
+CHANGE_PAGE = 500
+
+Reader = Callable[[int, int], Awaitable[List[Dict[str, Any]]]]
+Bounds = Callable[[], Awaitable[Dict[str, int]]]
+
+
+class ChangeLogGap(Exception):
+    """The requested position is not in the changelog: compacted, or never written."""
+
+    def __init__(self, since: int, first: int, last: int):
+        if since > last:
+            reason = f"seq {since} is past the newest change ({last})"
+        else:
+            reason = f"changes before seq {first} were compacted"
+        super().__init__(f"cannot resume after seq {since}: {reason}")
+        self.since = since
+        self.first = first
+        self.last = last
+
+
+class ChangeFeed:
+    """Fan-out of changelog events to any number of subscribers.
+
+    One poll loop per process reads new changelog rows, only while someone is
+    subscribed, into a ring buffer of recent events and wakes every
+    subscriber. Subscribers at or near the tail are served from the buffer
+    without touching SQLite. A subscriber resuming from further back pages
+    through the changelog on its own until it reaches the buffer.
+    """
+
+    def __init__(self, read: Reader, bounds: Bounds, buffer: int = CHANGE_BUFFER,
+                 poll_interval: float = POLL_INTERVAL, page: int = CHANGE_PAGE):
+        """Initialize the feed. Polling starts with the first subscriber.
+
+        Args:
+            read: ``await read(after, limit)`` -> events with seq > after, in seq order
+            bounds: ``await bounds()`` -> {"first": oldest seq kept, "last": newest seq}
+            buffer: Recent events kept in memory
+            poll_interval: Seconds between polls when there is nothing new
+            page: Events read per query
+        """
+        self.read = read
+        self.bounds = bounds
+        self.poll_interval = poll_interval
+        self.page = page
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=buffer)
+        self.last_seq: Optional[int] = None
+        self.subscribers = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.catch_up_reads = 0
+        self.delivered = 0
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._changed, self._task = loop, asyncio.Event(), None
+
+    def reset(self):
+        """Forget buffered events, e.g. after switching databases."""
+        self.events.clear()
+        self.last_seq = None
+
+    async def subscribe(self, since: Optional[int] = None,
+                        heartbeat: Optional[float] = None) -> "Subscription":
+        """Start following the changelog after ``since`` (default: from now on).
+
+        Raises ``ChangeLogGap`` if events after ``since`` were compacted away
+        or ``since`` is beyond the newest event.
+        """
+        self._bind()
+        bounds = await self.bounds()
+        if self.last_seq is None:
+            self.last_seq = bounds["last"]
+        if since is None:
+            since = bounds["last"]
+        elif since < bounds["first"] - 1 or since > bounds["last"]:
+            raise ChangeLogGap(since, bounds["first"], bounds["last"])
+        self.subscribers += 1
+        if self._task is None:
+            self._task = self._loop.create_task(self._poll())
+        return Subscription(self, since, heartbeat)
+
+    async def _poll(self):
+        try:
+            while self.subscribers:
+                if self.last_seq is None:
+                    self.last_seq = (await self.bounds())["last"]
+                rows = await self.read(self.last_seq, self.page)
+                self.polls += 1
+                if rows:
+                    self.events.extend(rows)
+                    self.last_seq = rows[-1]["seq"]
+                    # Waiters hold the old event; the next wait gets a fresh one
+                    changed, self._changed = self._changed, asyncio.Event()
+                    changed.set()
+                if len(rows) < self.page:
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            self._task = None
+
+    def _buffered_after(self, cursor: int) -> Optional[List[Dict[str, Any]]]:
+        """Buffered events after ``cursor``, or None if the buffer starts too late."""
+        if not self.events or self.events[0]["seq"] > cursor + 1:
+            return None
+        newer = []
+        for ev in reversed(self.events):
+            if ev["seq"] <= cursor:
+                break
+            newer.append(ev)
+        newer.reverse()
+        return newer
+
+    async def _next_batch(self, cursor: int, timeout: Optional[float]) -> List[Dict[str, Any]]:
+        if self.last_seq is None or cursor >= self.last_seq:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        batch = self._buffered_after(cursor)
+        if batch is None:
+            batch = await self.read(cursor, self.page)
+            self.catch_up_reads += 1
+            if not batch or batch[0]["seq"] > cursor + 1:
+                bounds = await self.bounds()
+                if bounds["first"] > cursor + 1:
+                    raise ChangeLogGap(cursor, bounds["first"], bounds["last"])
+        return batch
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "last_seq": self.last_seq or 0,
+            "buffered": len(self.events),
+            "polls": self.polls,
+            "catch_up_reads": self.catch_up_reads,
+            "delivered": self.delivered,
+        }
+
+
+class Subscription:
+    """One subscriber's position in a ``ChangeFeed``.
+
+    ``async for ev in subscription`` yields events in seq order, and None
+    whenever ``heartbeat`` seconds pass with nothing new. Call ``close`` when
+    done; the feed stops polling once nobody is subscribed.
+    """
+
+    def __init__(self, feed: ChangeFeed, cursor: int, heartbeat: Optional[float]):
+        self.feed = feed
+        self.cursor = cursor
+        self.heartbeat = heartbeat
+        self.closed = False
+        self._pending: Deque[Dict[str, Any]] = deque()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Optional[Dict[str, Any]]:
+        if self.closed:
+            raise StopAsyncIteration
+        if not self._pending:
+            self._pending.extend(await self.feed._next_batch(self.cursor, self.heartbeat))
+            if not self._pending:
+                return None
+        ev = self._pending.popleft()
+        self.cursor = ev["seq"]
+        self.feed.delivered += 1
+        return ev
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.feed.subscribers -= 1
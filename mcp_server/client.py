@@ -0,0 +1,267 @@
+import asyncio
+import json
+import os
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Union
+
+# Set to the MCP server's streamable-HTTP endpoint (e.g. http://db-host:8001/mcp)
+# to have the agents call tools over MCP; unset, they call them in-process
+MCP_URL_ENV = "SUPPORT_MCP_URL"
+CLIENT_SESSIONS = 4
+CALL_TIMEOUT = 10.0
+CONNECT_TIMEOUT = 5.0
+# Tools that change data; never retried after a failure that may have applied them
+WRITE_TOOLS = frozenset({"create_ticket", "update_customer", "claim_next_ticket",
+                         "release_ticket", "resolve_ticket"})
+# Batch tools -> their result field keyed by customer id. JSON turns the int
+# keys into strings; remote results get them back so both backends match.
+ID_KEYED = {"get_customers": "customers", "get_customer_histories": "histories"}
+
+
+class ToolError(Exception):
+    """A tool call failed: the tool raised, timed out, or the session broke."""
+
+
+class LocalTools:
+    """In-process tool calls: the tool coroutines awaited directly with ``ctx=None``.
+
+    The fastest path, but the agent tier then opens the database itself.
+    """
+
+    def __init__(self):
+        from mcp_server import mcp as tools
+        self.tools = tools
+        self.calls = 0
+
+    async def call(self, name: str, **arguments) -> Dict[str, Any]:
+        self.calls += 1
+        return await getattr(self.tools, name)(None, **arguments)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"mode": "local", "calls": self.calls}
+
+    async def close(self):
+        pass
+
+
+class _Session:
+    """One persistent streamable-HTTP MCP session, owned by its own task.
+
+    The transport and ``ClientSession`` are anyio context managers that must
+    be entered and exited by the same task, so a dedicated task holds them
+    open until ``close``. Any number of calls share the session concurrently;
+    MCP matches responses to requests by id.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.session = None
+        self.in_flight = 0
+        self.broken = False
+        self._ready: Optional[asyncio.Future] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def open(self, timeout: float):
+        loop = asyncio.get_running_loop()
+        self._ready = loop.create_future()
+        self._stop = asyncio.Event()
+        self._task = loop.create_task(self._run())
+        try:
+            await asyncio.wait_for(asyncio.shield(self._ready), timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _run(self):
+        import httpx
+        from mcp import ClientSession
+        from mcp.client.streamable_http import streamable_http_client
+
+        try:
+            async with httpx.AsyncClient(timeout=httpx.Timeout(CALL_TIMEOUT, read=None)) as http, \
+                    streamable_http_client(self.url, http_client=http) as (read, write, _), \
+                    ClientSession(read, write) as session:
+                await session.initialize()
+                self.session = session
+                self._ready.set_result(None)
+                await self._stop.wait()
+        except BaseException as e:
+            if not self._ready.done():
+                self._ready.set_exception(ConnectionError(f"MCP connect to {self.url} failed: {e!r}"))
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self.session = None
+            self.broken = True
+
+    def close(self):
+        self.broken = True
+        if self._stop is not None:
+            self._stop.set()
+
+
+class MCPClientPool:
+    """Agent-side pool of persistent MCP sessions to a remote tool server.
+
+    Sessions open on demand, up to ``size``, and each multiplexes concurrent
+    calls; a call goes to the open session with the fewest calls in flight.
+    A session whose transport fails is closed and reopened by the next call.
+    Read tools are retried once on a fresh session; writes are not, since the
+    first attempt may have been applied. A call that times out fails alone and
+    leaves its session open for the other calls sharing it.
+    """
+
+    def __init__(self, url: str, size: int = CLIENT_SESSIONS, timeout: float = CALL_TIMEOUT,
+                 connect_timeout: float = CONNECT_TIMEOUT):
+        """Initialize the pool. No connection is made until the first call.
+
+        Args:
+            url: Streamable-HTTP endpoint of the MCP server
+            size: Maximum sessions kept open
+            timeout: Seconds to wait for a tool result
+            connect_timeout: Seconds to wait for a session to initialize
+        """
+        self.url = url
+        self.size = size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sessions: List[_Session] = []
+        self._connecting: Optional[asyncio.Lock] = None
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.reconnects = 0
+
+    async def _session(self) -> _Session:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Sessions are bound to the loop that opened them
+            self._loop, self._sessions, self._connecting = loop, [], asyncio.Lock()
+        live = [s for s in self._sessions if not s.broken]
+        best = min(live, key=lambda s: s.in_flight, default=None)
+        if best is not None and (best.in_flight == 0 or len(live) >= self.size):
+            return best
+        async with self._connecting:
+            before = len(self._sessions)
+            self._sessions = [s for s in self._sessions if not s.broken]
+            # Broken sessions dropped here are the ones being replaced
+            self.reconnects += before - len(self._sessions)
+            if len(self._sessions) >= self.size:
+                return min(self._sessions, key=lambda s: s.in_flight)
+            session = _Session(self.url)
+            await session.open(self.connect_timeout)
+            self._sessions.append(session)
+            return session
+
+    async def call(self, name: str, **arguments) -> Dict[str, Any]:
+        """Call tool ``name`` and return its result. Raises ``ToolError`` on failure."""
+        self.calls += 1
+        attempts = 1 if name in WRITE_TOOLS else 2
+        for attempt in range(attempts):
+            try:
+                session = await self._session()
+            except (ConnectionError, asyncio.TimeoutError) as e:
+                error: Exception = e
+            else:
+                session.in_flight += 1
+                try:
+                    result = await session.session.call_tool(
+                        name, arguments, read_timeout_seconds=timedelta(seconds=self.timeout))
+                except Exception as e:
+                    if not _transport_error(e):
+                        # This call timed out or was refused; the session still
+                        # serves the other calls multiplexed on it
+                        self.errors += 1
+                        raise ToolError(f"{name} failed: {type(e).__name__}: {e}") from e
+                    # The transport failed: start over on a new session
+                    session.close()
+                    error = e
+                else:
+                    try:
+                        return _tool_result(name, result)
+                    except ToolError:
+                        self.errors += 1  # The tool itself reported an error
+                        raise
+                finally:
+                    session.in_flight -= 1
+            if attempt + 1 < attempts:
+                self.retries += 1
+        self.errors += 1
+        raise ToolError(f"{name} failed: {type(error).__name__}: {error}") from error
+
+    def stats(self) -> Dict[str, Any]:
+        live = [s for s in self._sessions if not s.broken]
+        return {
+            "mode": "remote",
+            "url": self.url,
+            "sessions": len(live),
+            "in_flight": sum(s.in_flight for s in live),
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "reconnects": self.reconnects,
+        }
+
+    async def close(self):
+        sessions, self._sessions = self._sessions, []
+        for s in sessions:
+            s.close()
+        tasks = [s._task for s in sessions if s._task is not None]
+        if tasks and self._loop is asyncio.get_running_loop():
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _transport_error(e: Exception) -> bool:
+    """Whether ``e`` means the session itself is unusable, not just one call."""
+    from mcp.shared.exceptions import McpError
+    from mcp.types import CONNECTION_CLOSED
+
+    # Per-request errors (timeouts included) arrive as McpError; anything else
+    # came out of the streams or the HTTP client underneath them
+    return not isinstance(e, McpError) or e.error.code == CONNECTION_CLOSED
+
+
+def _tool_result(name: str, result) -> Dict[str, Any]:
+    text = "".join(getattr(c, "text", "") for c in result.content)
+    if result.isError:
+        raise ToolError(text or f"{name} failed")
+    data = result.structuredContent
+    if data is None:
+        data = json.loads(text)
+    field = ID_KEYED.get(name)
+    if field is not None and isinstance(data.get(field), dict):
+        data[field] = {int(k): v for k, v in data[field].items()}
+    return data
+
+
+_tools: Optional[Union[LocalTools, MCPClientPool]] = None
+
+
+def tools() -> Union[LocalTools, MCPClientPool]:
+    """The backend agents call tools through, chosen from ``SUPPORT_MCP_URL``."""
+    global _tools
+    if _tools is None:
+        url = os.environ.get(MCP_URL_ENV)
+        _tools = MCPClientPool(url) if url else LocalTools()
+    return _tools
+
+
+def use_remote(url: str, **options) -> MCPClientPool:
+    """Send agent tool calls to the MCP server at ``url``."""
+    global _tools
+    _tools = MCPClientPool(url, **options)
+    return _tools
+
+
+def use_local() -> LocalTools:
+    """Call tools in-process (the default)."""
+    global _tools
+    _tools = LocalTools()
+    return _tools
+
+
+async def call_tool(name: str, **arguments) -> Dict[str, Any]:
+    """Call an MCP tool by name on the configured backend."""
+    return await tools().call(name, **arguments)
@@ -1,15 +1,109 @@
+import asyncio
+import base64
+import contextlib
+import json
+import logging
+import os
+import re
 import sqlite3
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Union
 from pydantic import BaseModel
 from mcp.server.fastmcp import FastMCP, Context
+from database_setup import (
+    ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH, PRIORITY_RANK, TICKET_COLUMNS, archive_resolved_tickets,
+    archive_triggers_missing
+)
+from mcp_server.cache import ReadThroughCache
+from mcp_server.changefeed import ChangeFeed
+from mcp_server.metrics import REGISTRY, instrument_tool
+from mcp_server.pool import ConnectionPool
+from mcp_server.writer import WriteBatcher
+from mcp_server.writer_service import WRITER_SOCKET_ENV, RemoteWriter
 
 DB_PATH = "support.db"
+POOL_SIZE = 8
+# Stays well under SQLITE_MAX_VARIABLE_NUMBER on every SQLite build
+BATCH_CHUNK = 500
+MAX_PAGE = 200
+CACHE_SIZE = 4096
+CACHE_TTL = 30.0
+# Seconds of changelog history kept for consumers to resume from
+CHANGELOG_RETENTION = 7 * 86400.0
 mcp = FastMCP("support-db")
+pool = ConnectionPool(DB_PATH, size=POOL_SIZE)
+# Keys: ("customer", id) and ("history", id)
+cache = ReadThroughCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL)
+# Group-commit pipeline for writes, or the link to the writer process in
+# single-writer mode; None commits every write on its own
+writer: Optional[Union[WriteBatcher, RemoteWriter]] = None
 
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+def use_database(db_path: str, **options) -> ConnectionPool:
+    """Close the current pool and point every tool at ``db_path``.
+
+    Writes the batcher has already queued are committed to the old database
+    before its pool closes; later writes go to the new one.
+    """
+    global pool
+    old, pool = pool, ConnectionPool(db_path, **{"size": POOL_SIZE, **options})
+    cache.clear()
+    changes.reset()
+    if isinstance(writer, WriteBatcher):
+        batcher = writer
+        enable_write_batching(batcher.max_batch, batcher.max_delay, batcher.max_queue)
+        _retire(batcher, old.close)
+    else:
+        old.close()
+    return pool
+
+# Batchers still flushing on the event loop after being replaced
+_retiring: Set[asyncio.Task] = set()
+
+def _retire(batcher: WriteBatcher, then: Optional[Callable[[], None]] = None):
+    task = batcher.retire(then)
+    if task is not None:
+        _retiring.add(task)
+        task.add_done_callback(_retiring.discard)
+
+def enable_write_batching(max_batch: int = 64, max_delay: float = 0.005,
+                          max_queue: int = 10000) -> WriteBatcher:
+    """Route the write tools (WRITE_OPS) through a group-commit batcher."""
+    global writer
+    old, writer = writer, WriteBatcher(pool, max_batch=max_batch, max_delay=max_delay,
+                                       max_queue=max_queue)
+    if isinstance(old, WriteBatcher):
+        _retire(old)
+    return writer
+
+def enable_remote_writes(socket_path: str) -> RemoteWriter:
+    """Single-writer mode: forward writes to the writer process on ``socket_path``.
+
+    Reads still go straight to the database. Writes made by other workers
+    invalidate this worker's cache as the writer reports them; while the
+    writer is unreachable, reads skip the cache instead of failing.
+    """
+    global writer
+    writer = RemoteWriter(socket_path, WRITE_OPS, on_remote_write=_invalidate_write,
+                          on_connect=cache.clear)
+    return writer
+
+def disable_write_batching():
+    global writer
+    old, writer = writer, None
+    if isinstance(old, WriteBatcher):
+        _retire(old)
+
+async def _cached(key, loader):
+    if isinstance(writer, RemoteWriter) and not writer.connected():
+        # Other workers' writes go unheard while disconnected, so read through
+        # the cache and reconnect in the background; reads never wait on the writer
+        writer.connect_soon()
+        return await loader()
+    return await cache.get_or_load(key, loader)
+
+async def _write(fn, *args):
+    if writer is not None:
+        return await writer.submit(fn, *args)
+    return await pool.run(fn, *args)
 
 class PatchCustomer(BaseModel):
     name: Optional[str] = None
@@ -17,73 +111,604 @@ class PatchCustomer(BaseModel):
     phone: Optional[str] = None
     status: Optional[str] = None
 
+# Columns update_customer may set. Checked in the write itself: in single-writer
+# mode the fields arrive over the writer socket, not through PatchCustomer.
+CUSTOMER_FIELDS = frozenset(PatchCustomer.model_fields)
+# Of those, the NOT NULL columns, which an explicit null may not clear
+REQUIRED_CUSTOMER_FIELDS = frozenset({"name", "status"})
+
+# ------ Queries (run on pooled connections, off the event loop) ------
+def _get_customer(c: sqlite3.Connection, customer_id: int):
+    row = c.execute("SELECT * FROM customers WHERE id=?", (customer_id,)).fetchone()
+    if not row:
+        return {"found": False}
+    return {"found": True, "customer": dict(row)}
+
+# Keyset cursors: the sort key of the last row served, base64 encoded
+def _encode_key(key: List[Any]) -> str:
+    raw = json.dumps(key, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_key(cursor: str, sort_types: tuple = (str, int, float, type(None))) -> Optional[List[Any]]:
+    """The [sort value, id] pair in ``cursor``, or None if it is not one.
+
+    The sort value must be one of ``sort_types``, the types the sort column
+    holds, so a tampered cursor never reaches SQLite as a bound parameter.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw)
+        if (not isinstance(key, list) or len(key) != 2
+                or type(key[0]) not in sort_types or type(key[1]) is not int):
+            raise ValueError(cursor)
+        return key
+    except (TypeError, ValueError):
+        return None
+
+def _encode_cursor(row: sqlite3.Row) -> str:
+    return _encode_key([row["created_at"], row["id"]])
+
+def _decode_cursor(cursor: str):
+    key = _decode_key(cursor, (str, type(None)))
+    return tuple(key) if key is not None else None
+
+def _page(c: sqlite3.Connection, table: str, where: List[str], args: List[Any],
+          after, limit: int):
+    """One page ordered newest first; costs an index seek regardless of depth."""
+    if after is not None:
+        where = where + ["(created_at, id) < (?, ?)"]
+        args = args + list(after)
+    sql = f"SELECT * FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    rows = c.execute(sql, args + [limit + 1]).fetchall()
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return [dict(r) for r in rows[:limit]], next_cursor
+
+def _list_customers(c: sqlite3.Connection, status: str, limit: int, after):
+    rows, next_cursor = _page(c, "customers", ["status=?"], [status], after, limit)
+    return {"status": status, "customers": rows, "next_cursor": next_cursor}
+
+def _list_tickets(c: sqlite3.Connection, status: Optional[str], priority: Optional[str],
+                  limit: int, after):
+    where, args = [], []
+    if status is not None:
+        where.append("status=?")
+        args.append(status)
+    if priority is not None:
+        where.append("priority=?")
+        args.append(priority)
+    rows, next_cursor = _page(c, "tickets", where, args, after, limit)
+    return {"status": status, "priority": priority, "tickets": rows, "next_cursor": next_cursor}
+
+_WORD = re.compile(r"\w+")
+
+def _match_expr(query: str) -> Optional[str]:
+    """Free text -> FTS5 query matching every word; None if there are none."""
+    words = _WORD.findall(query)
+    return " ".join(f'"{w}"' for w in words) if words else None
+
+def _search_tickets(c: sqlite3.Connection, match: str, status: Optional[str],
+                    priority: Optional[str], customer_id: Optional[int], limit: int, after):
+    """Tickets matching ``match``, best bm25 rank first, then by id."""
+    where, args = ["tickets_fts MATCH ?"], [match]
+    if status is not None:
+        where.append("t.status=?")
+        args.append(status)
+    if priority is not None:
+        where.append("t.priority=?")
+        args.append(priority)
+    if customer_id is not None:
+        where.append("t.customer_id=?")
+        args.append(customer_id)
+    if after is not None:
+        where.append("(f.rank, t.id) > (?, ?)")
+        args.extend(after)
+    rows = c.execute(
+        "SELECT t.*, f.rank AS score, highlight(tickets_fts, 0, '[', ']') AS highlight "
+        "FROM tickets_fts f JOIN tickets t ON t.id = f.rowid "
+        f"WHERE {' AND '.join(where)} ORDER BY f.rank, t.id LIMIT ?",
+        args + [limit + 1]
+    ).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = _encode_key([last["score"], last["id"]])
+    return {"tickets": [dict(r) for r in rows[:limit]], "next_cursor": next_cursor}
+
+def _get_ticket_stats(c: sqlite3.Connection, top: int):
+    """Read the trigger-maintained summary tables; no scan of tickets."""
+    by_status: Dict[str, int] = {}
+    by_priority: Dict[str, int] = {}
+    matrix: Dict[str, Dict[str, int]] = {}
+    for r in c.execute("SELECT status, priority, n FROM ticket_counts"):
+        by_status[r["status"]] = by_status.get(r["status"], 0) + r["n"]
+        by_priority[r["priority"]] = by_priority.get(r["priority"], 0) + r["n"]
+        matrix.setdefault(r["status"], {})[r["priority"]] = r["n"]
+    counters = {r["name"]: r["n"] for r in c.execute("SELECT name, n FROM summary_counters")}
+    top_customers = c.execute(
+        "SELECT c.id, c.name, c.email, s.total_tickets, s.open_tickets "
+        "FROM customer_ticket_counts s JOIN customers c ON c.id = s.customer_id "
+        "ORDER BY s.total_tickets DESC LIMIT ?", (top,)
+    ).fetchall()
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_priority": by_priority,
+        "by_status_priority": matrix,
+        "customers": {
+            "active": counters.get("customers_active", 0),
+            "disabled": counters.get("customers_disabled", 0),
+        },
+        "active_customers_with_open_tickets": counters.get("active_customers_with_open_tickets", 0),
+        "top_customers": [dict(r) for r in top_customers],
+    }
+
+def _update_customer(c: sqlite3.Connection, customer_id: int, fields: Dict[str, Any]):
+    unknown = sorted(set(fields) - CUSTOMER_FIELDS)
+    if unknown:
+        return {"updated": False, "reason": f"unknown fields: {', '.join(map(str, unknown))}"}
+    cleared = sorted(k for k in REQUIRED_CUSTOMER_FIELDS if k in fields and fields[k] is None)
+    if cleared:
+        return {"updated": False, "reason": f"required fields: {', '.join(cleared)}"}
+    if not fields:
+        return {"updated": False, "reason": "no fields"}
+    updates = []
+    vals = []
+    for k, v in fields.items():
+        updates.append(f"{k}=?")
+        vals.append(v)
+    vals.append(customer_id)
+    cur = c.execute(f"UPDATE customers SET {','.join(updates)} WHERE id=?", vals)
+    if cur.rowcount == 0:
+        return {"updated": False, "reason": "not found"}
+    row = c.execute("SELECT * FROM customers WHERE id=?", (customer_id,)).fetchone()
+    return {"updated": True, "customer": dict(row)}
+
+def _create_ticket(c: sqlite3.Connection, customer_id: int, issue: str, priority: str):
+    row = c.execute("SELECT id FROM customers WHERE id=?", (customer_id,)).fetchone()
+    if not row:
+        return {"created": False, "reason": "customer missing"}
+    cur = c.execute(
+        "INSERT INTO tickets (customer_id, issue, status, priority) VALUES (?, ?, 'open', ?)",
+        (customer_id, issue, priority)
+    )
+    tid = cur.lastrowid
+    t = c.execute("SELECT * FROM tickets WHERE id=?", (tid,)).fetchone()
+    return {"created": True, "ticket": dict(t)}
+
+# The whole claim is one statement, so the pick and the status change happen
+# under the same write lock: concurrent claimers, in this process or any
+# other, can never get the same ticket. The subquery is the first entry of
+# idx_tickets_open_queue (it must repeat that index's rank expression).
+_CLAIM_SQL = f"""
+    UPDATE tickets SET status = 'in_progress'
+    WHERE id = (SELECT id FROM tickets WHERE status = 'open'
+                ORDER BY {PRIORITY_RANK}, created_at, id LIMIT 1)
+    RETURNING *
+"""
+
+def _claim_next_ticket(c: sqlite3.Connection):
+    row = c.execute(_CLAIM_SQL).fetchone()
+    if not row:
+        return {"claimed": False, "reason": "no open tickets"}
+    return {"claimed": True, "ticket": dict(row)}
+
+def _move_ticket(c: sqlite3.Connection, ticket_id: int, status: str):
+    """in_progress -> ``status``; any other current status is refused."""
+    row = c.execute(
+        "UPDATE tickets SET status=? WHERE id=? AND status='in_progress' RETURNING *",
+        (status, ticket_id)
+    ).fetchone()
+    if row:
+        return {"updated": True, "ticket": dict(row)}
+    if c.execute("SELECT 1 FROM tickets WHERE id=?", (ticket_id,)).fetchone():
+        return {"updated": False, "reason": "not in progress"}
+    return {"updated": False, "reason": "not found"}
+
+def _release_ticket(c: sqlite3.Connection, ticket_id: int):
+    return _move_ticket(c, ticket_id, "open")
+
+def _resolve_ticket(c: sqlite3.Connection, ticket_id: int):
+    return _move_ticket(c, ticket_id, "resolved")
+
+# Changelog (filled by triggers): events in seq order, the seq range kept for
+# resuming, and retention compaction
+def _read_changes(c: sqlite3.Connection, after: int, limit: int):
+    rows = c.execute("SELECT * FROM changelog WHERE seq > ? ORDER BY seq LIMIT ?",
+                     (after, limit)).fetchall()
+    return [{
+        "event": "change",
+        "seq": r["seq"],
+        "entity": r["entity"],
+        "op": r["op"],
+        "id": r["entity_id"],
+        "customer_id": r["customer_id"],
+        "data": json.loads(r["data"]) if r["data"] is not None else None,
+        "at": r["created_at"],
+    } for r in rows]
+
+def _changelog_bounds(c: sqlite3.Connection):
+    """Oldest seq still kept and newest seq ever written (survives compaction)."""
+    first = c.execute("SELECT MIN(seq) FROM changelog").fetchone()[0]
+    row = c.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changelog'").fetchone()
+    last = row[0] if row else 0
+    return {"first": first if first is not None else last + 1, "last": last}
+
+def _compact_changelog(c: sqlite3.Connection, retention: float):
+    """Delete changelog rows older than ``retention`` seconds, oldest first.
+
+    Rows are in time order by seq, so the cut is the first row inside the
+    window; finding it walks only the rows being deleted.
+    """
+    cur = c.execute("""
+        DELETE FROM changelog WHERE seq < COALESCE(
+            (SELECT seq FROM changelog WHERE created_at >= datetime('now', ?) ORDER BY seq LIMIT 1),
+            (SELECT MAX(seq) + 1 FROM changelog))
+    """, (f"-{retention} seconds",))
+    return {"compacted": cur.rowcount}
+
+def _archive_tickets(c: sqlite3.Connection, days: float, limit: int):
+    # Without the table at all, the insert below reports "no such table"
+    if (archive_triggers_missing(c)
+            and c.execute("SELECT 1 FROM sqlite_master WHERE name = 'tickets_archive'").fetchone()):
+        # Migrate with `database_setup.py archive` first
+        return {"archived": 0, "reason": "archive triggers missing"}
+    return {"archived": archive_resolved_tickets(c, days, limit)}
+
+# Writes the writer process may apply on a worker's behalf, by name
+WRITE_OPS = {
+    "create_ticket": _create_ticket,
+    "update_customer": _update_customer,
+    "claim_next_ticket": _claim_next_ticket,
+    "release_ticket": _release_ticket,
+    "resolve_ticket": _resolve_ticket,
+    "compact_changelog": _compact_changelog,
+    "archive_tickets": _archive_tickets,
+}
+
+def _invalidate_write(op: str, args: List[Any], result: Dict[str, Any]):
+    """Drop cache entries a successful write made stale.
+
+    For customer writes args[0] is the customer id; ticket state changes name
+    the customer in the returned ticket.
+    """
+    if op == "update_customer" and result.get("updated"):
+        cache.invalidate(("customer", args[0]), ("history", args[0]))
+    elif op == "create_ticket" and result.get("created"):
+        cache.invalidate(("history", args[0]))
+    elif "ticket" in result and (result.get("claimed") or result.get("updated")):
+        cache.invalidate(("history", result["ticket"]["customer_id"]))
+    elif op == "archive_tickets" and result.get("archived"):
+        # Touches many customers' histories; not worth tracking which
+        cache.clear()
+
+def _archived_count(c: sqlite3.Connection, customer_id: int) -> int:
+    try:
+        return c.execute("SELECT COUNT(*) FROM tickets_archive WHERE customer_id=?",
+                         (customer_id,)).fetchone()[0]
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            raise
+        return 0  # Database set up before archiving
+
+def _get_customer_history(c: sqlite3.Connection, customer_id: int, include_archived: bool = False):
+    """Live tickets newest first, merged with archived ones when asked.
+
+    ``archived_tickets`` always says how many archived tickets the customer
+    has, so a caller can tell whether asking for them would add anything.
+    """
+    cust = c.execute("SELECT * FROM customers WHERE id=?", (customer_id,)).fetchone()
+    if not cust:
+        return {"found": False}
+    archived = _archived_count(c, customer_id)
+    if include_archived and archived:
+        tickets = c.execute(
+            f"SELECT {TICKET_COLUMNS} FROM tickets WHERE customer_id=? UNION ALL "
+            f"SELECT {TICKET_COLUMNS} FROM tickets_archive WHERE customer_id=? "
+            "ORDER BY created_at DESC",
+            (customer_id, customer_id)
+        ).fetchall()
+    else:
+        tickets = c.execute(
+            "SELECT * FROM tickets WHERE customer_id=? ORDER BY created_at DESC",
+            (customer_id,)
+        ).fetchall()
+    return {
+        "found": True,
+        "customer": dict(cust),
+        "tickets": [dict(t) for t in tickets],
+        "archived_tickets": archived
+    }
+
+def _chunks(ids: List[int]):
+    for i in range(0, len(ids), BATCH_CHUNK):
+        yield ids[i:i + BATCH_CHUNK]
+
+def _get_customers(c: sqlite3.Connection, ids: List[int]):
+    found = {}
+    for chunk in _chunks(ids):
+        marks = ",".join("?" * len(chunk))
+        for row in c.execute(f"SELECT * FROM customers WHERE id IN ({marks})", chunk):
+            found[row["id"]] = dict(row)
+    return {
+        "customers": found,
+        "missing": [i for i in ids if i not in found]
+    }
+
+def _get_customer_histories(c: sqlite3.Connection, ids: List[int]):
+    histories = {}
+    for chunk in _chunks(ids):
+        marks = ",".join("?" * len(chunk))
+        for row in c.execute(f"SELECT * FROM customers WHERE id IN ({marks})", chunk):
+            histories[row["id"]] = {"customer": dict(row), "tickets": []}
+        # Single pass: rows arrive grouped by customer, newest first
+        rows = c.execute(
+            f"SELECT * FROM tickets WHERE customer_id IN ({marks}) "
+            "ORDER BY customer_id, created_at DESC",
+            chunk
+        )
+        for t in rows:
+            h = histories.get(t["customer_id"])
+            if h is not None:
+                h["tickets"].append(dict(t))
+    return {
+        "histories": histories,
+        "missing": [i for i in ids if i not in histories]
+    }
+
+# ------ Change feed (the changelog table, fanned out to subscribers) ------
+# Shared by every change subscriber in this process
+changes = ChangeFeed(lambda after, limit: pool.run(_read_changes, after, limit),
+                     lambda: pool.run(_changelog_bounds))
+
+async def compact_changelog(retention: float = CHANGELOG_RETENTION):
+    """Drop changelog entries older than the retention window (a write)."""
+    try:
+        return await _write(_compact_changelog, retention)
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            raise
+        return {"compacted": 0, "reason": "changelog missing"}
+
+# ------ Archival (hot/cold split of the tickets table) ------
+async def archive_tickets(days: float = ARCHIVE_AFTER_DAYS, batch: int = ARCHIVE_BATCH):
+    """Move resolved tickets older than ``days`` to tickets_archive, one write
+    of at most ``batch`` tickets at a time, until none are left."""
+    total = 0
+    while True:
+        try:
+            result = await _write(_archive_tickets, days, batch)
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e):
+                raise
+            return {"archived": total, "reason": "archive missing"}
+        if "reason" in result:
+            return {"archived": total, "reason": result["reason"]}
+        _invalidate_write("archive_tickets", [], result)
+        total += result["archived"]
+        if result["archived"] < batch:
+            return {"archived": total}
+
+# ------ Streaming (used by the HTTP stream endpoints, not an MCP tool) ------
+async def iter_customer_tickets(customer_id: int, chunk: int = 256, archived: bool = False):
+    """Yield a customer's tickets newest first, straight off a SQLite cursor.
+
+    With ``archived`` the rows come from tickets_archive instead.
+    """
+    table = "tickets_archive" if archived else "tickets"
+    rows = pool.stream(
+        f"SELECT {TICKET_COLUMNS} FROM {table} WHERE customer_id=? ORDER BY created_at DESC",
+        (customer_id,), chunk
+    )
+    # Closing this generator closes the stream, and its connection, right away
+    async with contextlib.aclosing(rows):
+        async for row in rows:
+            yield dict(row)
+
+# ------ MCP tools ------
 @mcp.tool()
+@instrument_tool
 async def get_customer(ctx: Context, customer_id: int):
-    with get_conn() as c:
-        row = c.execute("SELECT * FROM customers WHERE id=?", (customer_id,)).fetchone()
-        if not row:
-            return {"found": False}
-        return {"found": True, "customer": dict(row)}
+    return await _cached(
+        ("customer", customer_id), lambda: pool.run(_get_customer, customer_id)
+    )
 
 @mcp.tool()
-async def list_customers(ctx: Context, status: str = "active", limit: int = 10):
-    with get_conn() as c:
-        rows = c.execute(
-            "SELECT * FROM customers WHERE status=? ORDER BY created_at DESC LIMIT ?",
-            (status, limit)
-        ).fetchall()
-        return {"status": status, "customers": [dict(r) for r in rows]}
+@instrument_tool
+async def list_customers(ctx: Context, status: str = "active", limit: int = 10,
+                         cursor: Optional[str] = None):
+    after = None
+    if cursor:
+        after = _decode_cursor(cursor)
+        if after is None:
+            return {"status": status, "customers": [], "next_cursor": None,
+                    "reason": "invalid cursor"}
+    limit = max(1, min(limit, MAX_PAGE))
+    return await pool.run(_list_customers, status, limit, after)
+
+@mcp.tool()
+@instrument_tool
+async def list_tickets(ctx: Context, status: Optional[str] = None,
+                       priority: Optional[str] = None, limit: int = 20,
+                       cursor: Optional[str] = None):
+    after = None
+    if cursor:
+        after = _decode_cursor(cursor)
+        if after is None:
+            return {"status": status, "priority": priority, "tickets": [],
+                    "next_cursor": None, "reason": "invalid cursor"}
+    limit = max(1, min(limit, MAX_PAGE))
+    return await pool.run(_list_tickets, status, priority, limit, after)
+
+@mcp.tool()
+@instrument_tool
+async def search_tickets(ctx: Context, query: str, status: Optional[str] = None,
+                         priority: Optional[str] = None, customer_id: Optional[int] = None,
+                         limit: int = 20, cursor: Optional[str] = None):
+    """Full-text search over ticket issues, best match first.
+
+    Every word of ``query`` must appear (stemmed, case-insensitive). Results
+    carry a bm25 ``score`` (lower is better) and the issue with matches in
+    brackets; pass ``next_cursor`` back as ``cursor`` for the next page.
+    """
+    empty = {"query": query, "tickets": [], "next_cursor": None}
+    match = _match_expr(query)
+    if match is None:
+        return {**empty, "reason": "empty query"}
+    after = None
+    if cursor:
+        after = _decode_key(cursor, (int, float))
+        if after is None:
+            return {**empty, "reason": "invalid cursor"}
+    limit = max(1, min(limit, MAX_PAGE))
+    try:
+        result = await pool.run(_search_tickets, match, status, priority, customer_id, limit, after)
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            raise
+        return {**empty, "reason": "search index missing"}
+    return {"query": query, **result}
 
 @mcp.tool()
+@instrument_tool
 async def update_customer(ctx: Context, customer_id: int, data: PatchCustomer):
-    updates = []
-    vals = []
-    for k, v in data.dict(exclude_none=True).items():
-        updates.append(f"{k}=?")
-        vals.append(v)
-    if not updates:
+    # Only the fields the caller sent; an explicit null clears email or phone
+    fields = data.model_dump(exclude_unset=True)
+    if not fields:
         return {"updated": False, "reason": "no fields"}
-    vals.append(customer_id)
-    with get_conn() as c:
-        cur = c.execute(f"UPDATE customers SET {','.join(updates)} WHERE id=?", vals)
-        c.commit()
-        if cur.rowcount == 0:
-            return {"updated": False, "reason": "not found"}
-        row = c.execute("SELECT * FROM customers WHERE id=?", (customer_id,)).fetchone()
-        return {"updated": True, "customer": dict(row)}
+    result = await _write(_update_customer, customer_id, fields)
+    _invalidate_write("update_customer", [customer_id], result)
+    return result
 
 @mcp.tool()
+@instrument_tool
 async def create_ticket(ctx: Context, customer_id: int, issue: str, priority: str = "medium"):
     if priority not in ("low", "medium", "high"):
         return {"created": False, "reason": "invalid priority"}
-    with get_conn() as c:
-        row = c.execute("SELECT id FROM customers WHERE id=?", (customer_id,)).fetchone()
-        if not row:
-            return {"created": False, "reason": "customer missing"}
-        cur = c.execute(
-            "INSERT INTO tickets (customer_id, issue, status, priority) VALUES (?, ?, 'open', ?)",
-            (customer_id, issue, priority)
-        )
-        c.commit()
-        tid = cur.lastrowid
-        t = c.execute("SELECT * FROM tickets WHERE id=?", (tid,)).fetchone()
-        return {"created": True, "ticket": dict(t)}
+    result = await _write(_create_ticket, customer_id, issue, priority)
+    _invalidate_write("create_ticket", [customer_id], result)
+    return result
 
 @mcp.tool()
-async def get_customer_history(ctx: Context, customer_id: int):
-    with get_conn() as c:
-        cust = c.execute("SELECT * FROM customers WHERE id=?", (customer_id,)).fetchone()
-        if not cust:
-            return {"found": False}
-        tickets = c.execute(
-            "SELECT * FROM tickets WHERE customer_id=? ORDER BY created_at DESC",
-            (customer_id,)
-        ).fetchall()
-        return {
-            "found": True,
-            "customer": dict(cust),
-            "tickets": [dict(t) for t in tickets]
-        }
+@instrument_tool
+async def claim_next_ticket(ctx: Context):
+    """Take the next open ticket to work and mark it in_progress.
+
+    Tickets are claimed highest priority first, then oldest first; each open
+    ticket goes to exactly one caller. Hand it back with ``release_ticket`` or
+    close it with ``resolve_ticket``.
+    """
+    result = await _write(_claim_next_ticket)
+    _invalidate_write("claim_next_ticket", [], result)
+    return result
+
+@mcp.tool()
+@instrument_tool
+async def release_ticket(ctx: Context, ticket_id: int):
+    """Return a claimed (in_progress) ticket to the open queue, in its old place."""
+    result = await _write(_release_ticket, ticket_id)
+    _invalidate_write("release_ticket", [ticket_id], result)
+    return result
+
+@mcp.tool()
+@instrument_tool
+async def resolve_ticket(ctx: Context, ticket_id: int):
+    """Mark a claimed (in_progress) ticket resolved."""
+    result = await _write(_resolve_ticket, ticket_id)
+    _invalidate_write("resolve_ticket", [ticket_id], result)
+    return result
+
+@mcp.tool()
+@instrument_tool
+async def get_customer_history(ctx: Context, customer_id: int, include_archived: bool = False):
+    """A customer and their live tickets, newest first.
+
+    Old resolved tickets live in the archive; ``archived_tickets`` counts
+    them, and ``include_archived`` merges them into ``tickets``.
+    """
+    if include_archived:
+        return await pool.run(_get_customer_history, customer_id, True)
+    return await _cached(
+        ("history", customer_id), lambda: pool.run(_get_customer_history, customer_id)
+    )
+
+@mcp.tool()
+@instrument_tool
+async def get_customers(ctx: Context, customer_ids: List[int]):
+    ids = list(dict.fromkeys(customer_ids))
+    if not ids:
+        return {"customers": {}, "missing": []}
+    return await pool.run(_get_customers, ids)
+
+@mcp.tool()
+@instrument_tool
+async def get_customer_histories(ctx: Context, customer_ids: List[int]):
+    ids = list(dict.fromkeys(customer_ids))
+    if not ids:
+        return {"histories": {}, "missing": []}
+    return await pool.run(_get_customer_histories, ids)
+
+@mcp.tool()
+@instrument_tool
+async def get_ticket_stats(ctx: Context, top: int = 5):
+    """Ticket counts by status and priority, customer counts and the top
+    customers by ticket count, read from summary tables in constant time."""
+    top = max(0, min(top, MAX_PAGE))
+    try:
+        return await pool.run(_get_ticket_stats, top)
+    except sqlite3.OperationalError as e:
+        if "no such table" not in str(e):
+            raise
+        return {"reason": "stats tables missing"}
+
+@mcp.tool()
+@instrument_tool
+async def get_server_stats(ctx: Context):
+    return {
+        "pool": pool.stats(),
+        "cache": cache.stats(),
+        "writer": writer.stats() if writer is not None else None,
+        "changes": changes.stats(),
+    }
+
+def _collect_server_stats():
+    """Pool, cache and writer stats as gauges, read at scrape time."""
+    stats = {"pool": pool.stats(), "cache": cache.stats(), "changes": changes.stats()}
+    if writer is not None:
+        stats["writer"] = writer.stats()
+    for component, values in stats.items():
+        for key, value in values.items():
+            if isinstance(value, (int, float)):
+                yield (f"mcp_{component}_{key}", "gauge", f"{component} {key}.", [({}, value)])
+
+REGISTRY.add_collector(_collect_server_stats)
+
+# Worker processes started in single-writer mode find the writer's socket here
+if os.environ.get(WRITER_SOCKET_ENV):
+    enable_remote_writes(os.environ[WRITER_SOCKET_ENV])
+
+def main():
+    """Serve the tools over stdio (default) or streamable HTTP for remote agents."""
+    import argparse
+    parser = argparse.ArgumentParser(description="Support database MCP server")
+    parser.add_argument("--transport", choices=("stdio", "streamable-http"), default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--log-level", default="WARNING",
+                        help="INFO logs every request, which costs real CPU per call")
+    args = parser.parse_args()
+    if args.db != DB_PATH:
+        use_database(args.db)
+    logging.getLogger().setLevel(args.log_level)
+    mcp.settings.log_level = args.log_level
+    if args.transport == "streamable-http":
+        mcp.settings.host, mcp.settings.port = args.host, args.port
+        # Tool calls are request/response: plain JSON replies skip SSE framing
+        mcp.settings.json_response = True
+    mcp.run(transport=args.transport)
 
 if __name__ == "__main__":
-    mcp.run()
+    main()
@@ -0,0 +1,335 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from mcp_server.tracing import span
+
+# Seconds. HTTP/agent/tool latencies span ~0.1 ms to seconds; SQL is finer.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# Agents under /a2a/<agent>/ that get their own in-flight series; any other
+# path segment is counted as "other", so clients cannot mint new series
+AGENT_LABELS = ("coordinator", "records", "assist")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, doc, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        # Snapshot under the lock: worker threads add series while we render
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, v in values:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(v)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set.
+
+    ``observe`` is a bisect and three additions under a lock, so it is cheap
+    enough to call on every request, node, tool call and SQL statement.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def count(self, *labels: str) -> int:
+        s = self._series.get(labels)
+        return sum(s[:-1]) if s else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        # Copy every series under the lock: worker threads add and update them
+        with self._lock:
+            series = sorted((labels, s[:-1], s[-1]) for labels, s in self._series.items())
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            base = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{base} {_number(total)}")
+            lines.append(f"{self.name}_count{base} {cumulative}")
+        return lines
+
+
+# A collector returns (name, kind, help, [(label dict, value), ...]) tuples at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]]]
+
+
+class Registry:
+    """Named metrics plus scrape-time collectors, rendered in the Prometheus
+    text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _add(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, doc, labelnames))
+
+    def gauge(self, name: str, doc: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, doc, labelnames))
+
+    def histogram(self, name: str, doc: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, doc, labelnames, buckets))
+
+    def add_collector(self, fn: Collector):
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            for name, kind, doc, samples in fn():
+                lines.append(f"# HELP {name} {doc}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_SECONDS = REGISTRY.histogram(
+    "a2a_http_request_duration_seconds", "HTTP request latency, including streamed bodies.",
+    ("method", "endpoint", "status"))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "a2a_http_requests_in_flight", "HTTP requests currently being served, per agent.", ("agent",))
+NODE_SECONDS = REGISTRY.histogram(
+    "a2a_agent_node_duration_seconds", "Agent graph node latency.", ("node",))
+NODE_IN_FLIGHT = REGISTRY.gauge(
+    "a2a_agent_nodes_in_flight", "Agent graph nodes currently running.", ("node",))
+TOOL_SECONDS = REGISTRY.histogram(
+    "mcp_tool_duration_seconds", "MCP tool latency.", ("tool",))
+SQL_SECONDS = REGISTRY.histogram(
+    "sqlite_statement_duration_seconds", "SQLite execute() time by statement type.",
+    ("statement",), SQL_BUCKETS)
+ERRORS = REGISTRY.counter(
+    "a2a_errors_total", "Failed operations by where they failed and why.", ("source", "reason"))
+ROUTES = REGISTRY.counter(
+    "a2a_routing_decisions_total", "Coordinator routing decisions.", ("route", "reason"))
+SHED = REGISTRY.counter(
+    "a2a_requests_shed_total", "Requests refused by admission control.",
+    ("agent", "priority", "reason"))
+
+
+# Reasons tool results may carry, used as the ``reason`` label as they are.
+# Anything else, or the detail after a colon, would make the label unbounded:
+# "unknown fields: a, b" counts as "unknown fields", unlisted reasons as "other".
+TOOL_REASONS = frozenset({
+    "archive missing", "archive triggers missing", "changelog missing", "customer missing",
+    "empty query", "invalid cursor", "invalid priority", "no fields", "no open tickets",
+    "not found", "not in progress", "required fields", "search index missing",
+    "stats tables missing", "unknown fields",
+})
+
+
+def reason_label(reason: str) -> str:
+    """The bounded metric label for a tool result's ``reason``."""
+    reason = reason.split(":", 1)[0]
+    return reason if reason in TOOL_REASONS else "other"
+
+
+def instrument_tool(fn):
+    """Time (and trace) an async MCP tool and count results carrying a ``reason``.
+
+    The count is labelled with ``reason_label``; the full reason stays in the result.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            with span(name, "tool"):
+                result = await fn(*args, **kwargs)
+        except Exception as e:
+            ERRORS.inc(name, type(e).__name__)
+            raise
+        finally:
+            TOOL_SECONDS.observe(time.perf_counter() - t0, name)
+        if isinstance(result, dict) and "reason" in result:
+            ERRORS.inc(name, reason_label(result["reason"]))
+        return result
+
+    return wrapper
+
+
+def instrument_node(node: str):
+    """Time (and trace) an async agent node and track how many are running.
+
+    ``functools.wraps`` keeps the node's signature visible, so LangGraph still
+    injects ``runtime``.
+    """
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            NODE_IN_FLIGHT.inc(node)
+            t0 = time.perf_counter()
+            try:
+                with span(node, "agent"):
+                    return await fn(*args, **kwargs)
+            except Exception as e:
+                ERRORS.inc(node, type(e).__name__)
+                raise
+            finally:
+                NODE_SECONDS.observe(time.perf_counter() - t0, node)
+                NODE_IN_FLIGHT.dec(node)
+
+        return wrapper
+
+    return decorate
+
+
+_statement_kinds: Dict[str, str] = {}
+
+
+def statement_kind(sql: str) -> str:
+    """Leading keyword of ``sql`` (SELECT, INSERT, ...), memoized per text."""
+    kind = _statement_kinds.get(sql)
+    if kind is None:
+        words = sql.split(None, 1)
+        kind = words[0].upper() if words else "EMPTY"
+        if len(_statement_kinds) < 4096:
+            _statement_kinds[sql] = kind
+    return kind
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by route template.
+
+    Latency is labelled with the matched route's path
+    (``/a2a/assist/sessions/{session_id}``), never the raw URL, so label
+    cardinality stays bounded. Streamed responses are timed until their last
+    chunk is sent.
+    """
+
+    def __init__(self, app, agents: Sequence[str] = AGENT_LABELS):
+        self.app = app
+        self.agents = frozenset(agents)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = "500"
+        # Routing has not happened yet, so in-flight requests are keyed by agent
+        parts = scope.get("path", "").split("/", 3)
+        agent = parts[2] if len(parts) > 2 and parts[1] == "a2a" else "other"
+        if agent not in self.agents:
+            agent = "other"
+        HTTP_IN_FLIGHT.inc(agent)
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            ERRORS.inc("http", type(e).__name__)
+            raise
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            HTTP_SECONDS.observe(time.perf_counter() - t0, scope.get("method", ""), endpoint, status)
+            HTTP_IN_FLIGHT.dec(agent)
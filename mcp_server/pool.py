@@ -0,0 +1,226 @@
+import asyncio
+import contextvars
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional
+
+from mcp_server import tracing
+from mcp_server.metrics import SQL_SECONDS, statement_kind
+
+
+def _observe(sql: str, kind: str, t0: int):
+    t1 = time.perf_counter_ns()
+    SQL_SECONDS.observe((t1 - t0) / 1e9, kind)
+    tracing.record_sql(sql, t0, t1)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection that records execute()/commit() time per statement type,
+    and a span per statement when the request is traced."""
+
+    def execute(self, sql, *args):
+        t0 = time.perf_counter_ns()
+        try:
+            return super().execute(sql, *args)
+        finally:
+            _observe(sql, statement_kind(sql), t0)
+
+    def executemany(self, sql, *args):
+        t0 = time.perf_counter_ns()
+        try:
+            return super().executemany(sql, *args)
+        finally:
+            _observe(sql, statement_kind(sql), t0)
+
+    def commit(self):
+        t0 = time.perf_counter_ns()
+        try:
+            super().commit()
+        finally:
+            _observe("COMMIT", "COMMIT", t0)
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections with an off-event-loop executor.
+
+    Every connection is opened once in WAL mode with a busy timeout and a
+    prepared-statement cache, then reused. Blocking queries are run on a thread
+    pool sized to the number of connections so the asyncio loop stays free.
+    """
+
+    def __init__(self, db_path: str, size: int = 8, busy_timeout: float = 5.0,
+                 statement_cache: int = 256, acquire_timeout: float = 5.0,
+                 max_streams: Optional[int] = None):
+        """Initialize the pool. Connections are opened lazily.
+
+        Args:
+            db_path: Path to the SQLite database file
+            size: Maximum number of open connections (and worker threads)
+            busy_timeout: Seconds to wait on a locked database before failing
+            statement_cache: Prepared statements cached per connection
+            acquire_timeout: Seconds to wait for a connection when all are in use
+            max_streams: Concurrent ``stream`` calls, each on its own connection
+                outside the pool; defaults to half of ``size``
+        """
+        self.db_path = db_path
+        self.size = size
+        self.busy_timeout = busy_timeout
+        self.statement_cache = statement_cache
+        self.acquire_timeout = acquire_timeout
+        self.max_streams = max_streams if max_streams is not None else max(1, size // 2)
+        self.streams = 0
+        self._stream_slots: Optional[asyncio.Semaphore] = None
+        self._stream_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.statement_cache,
+            factory=TimedConnection,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout * 1000)}")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Take an idle connection, opening a new one while under ``size``.
+
+        Raises ``TimeoutError`` if none is returned within ``acquire_timeout``.
+        """
+        if self._closed:
+            raise RuntimeError("connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._opened) < self.size:
+                conn = self._open()
+                self._opened.append(conn)
+                return conn
+        try:
+            return self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no pooled connection available within "
+                               f"{self.acquire_timeout}s (size={self.size})") from None
+
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool, discarding any open transaction."""
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commit on success, roll back on error."""
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        finally:
+            self.release(conn)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.size, thread_name_prefix="sqlite"
+                    )
+        return self._executor
+
+    def call(self, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(conn, *args)`` on a pooled connection in the current thread."""
+        with self.connection() as conn:
+            return fn(conn, *args)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(conn, *args)`` on the worker threads and await the result."""
+        loop = asyncio.get_running_loop()
+        if tracing.current() is not None:
+            # Carry the trace into the worker thread so SQL spans attach to it
+            ctx = contextvars.copy_context()
+            return await loop.run_in_executor(self.executor, ctx.run, self.call, fn, *args)
+        return await loop.run_in_executor(self.executor, self.call, fn, *args)
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._stream_loop is not loop:
+            self._stream_loop, self._stream_slots = loop, asyncio.Semaphore(self.max_streams)
+        return self._stream_slots
+
+    async def stream(self, sql: str, args: tuple = (), chunk: int = 256):
+        """Yield the rows of ``sql`` as they are fetched, ``chunk`` at a time.
+
+        Memory stays flat no matter how many rows the query returns. The
+        cursor lives on a connection of its own, opened outside the pool and
+        closed with the generator, so a consumer that stops reading never
+        holds a connection other queries need. At most ``max_streams`` run at
+        once; more wait up to ``acquire_timeout`` and then raise TimeoutError.
+        """
+        slots = self._slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"no stream slot available within {self.acquire_timeout}s "
+                               f"(max_streams={self.max_streams})") from None
+        self.streams += 1
+        loop = asyncio.get_running_loop()
+        conn = cur = None
+        try:
+            conn = await loop.run_in_executor(self.executor, self._open)
+            cur = await loop.run_in_executor(self.executor, conn.execute, sql, args)
+            while True:
+                rows = await loop.run_in_executor(self.executor, cur.fetchmany, chunk)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            if cur is not None:
+                cur.close()
+            if conn is not None:
+                conn.close()
+            self.streams -= 1
+            slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "open": len(self._opened),
+            "idle": self._idle.qsize(),
+            "streams": self.streams,
+            "max_streams": self.max_streams,
+        }
+
+    def close(self):
+        """Shut down the worker threads and close every connection."""
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
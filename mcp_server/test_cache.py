@@ -0,0 +1,73 @@
+import asyncio
+
+from mcp_server import mcp as tools
+from mcp_server.cache import ReadThroughCache
+
+
+class _Loader:
+    """Counts loads; each waits for ``release`` so callers can pile up."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        return {"load": self.calls}
+
+
+def test_concurrent_misses_share_one_load():
+    async def main():
+        cache, load = ReadThroughCache(), _Loader()
+        waiters = [asyncio.ensure_future(cache.get_or_load("k", load)) for _ in range(10)]
+        await asyncio.sleep(0)
+        load.release.set()
+        return cache, load, await asyncio.gather(*waiters)
+
+    cache, load, values = asyncio.run(main())
+    assert load.calls == 1
+    assert values == [{"load": 1}] * 10
+    assert (cache.misses, cache.coalesced) == (1, 9)
+
+
+def test_cancelling_the_first_caller_keeps_the_load():
+    async def main():
+        cache, load = ReadThroughCache(), _Loader()
+        first = asyncio.ensure_future(cache.get_or_load("k", load))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_load("k", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        load.release.set()
+        return load, await second
+
+    load, value = asyncio.run(main())
+    assert load.calls == 1 and value == {"load": 1}
+
+
+def test_invalidation_during_a_load_is_not_overwritten():
+    async def main():
+        cache, load = ReadThroughCache(), _Loader()
+        reader = asyncio.ensure_future(cache.get_or_load("k", load))
+        await asyncio.sleep(0)
+        cache.invalidate("k")  # A write lands while the read is in flight
+        load.release.set()
+        stale = await reader
+        return stale, await cache.get_or_load("k", load)
+
+    stale, fresh = asyncio.run(main())
+    assert stale == {"load": 1}
+    assert fresh == {"load": 2}
+
+
+def test_writes_invalidate_the_customer(db):
+    async def main():
+        before = await tools.get_customer(None, 1)
+        await tools.update_customer(None, 1, tools.PatchCustomer(name="Renamed"))
+        return before, await tools.get_customer(None, 1)
+
+    before, after = asyncio.run(main())
+    assert before["customer"]["name"] != "Renamed"
+    assert after["customer"]["name"] == "Renamed"
+    assert tools.cache.invalidations >= 1
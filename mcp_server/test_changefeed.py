@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from mcp_server.changefeed import ChangeFeed, ChangeLogGap
+
+
+class _Log:
+    """An in-memory changelog holding seqs 1..n until compacted."""
+
+    def __init__(self, n: int):
+        self.rows = [{"seq": i} for i in range(1, n + 1)]
+
+    async def read(self, after, limit):
+        return [r for r in self.rows if r["seq"] > after][:limit]
+
+    async def bounds(self):
+        return {"first": self.rows[0]["seq"], "last": self.rows[-1]["seq"]}
+
+    def compact(self, upto):
+        self.rows = [r for r in self.rows if r["seq"] > upto]
+
+
+def _feed(log, **options):
+    return ChangeFeed(log.read, log.bounds, poll_interval=0.001, **options)
+
+
+async def _take(subscription, n):
+    events = []
+    async for ev in subscription:
+        events.append(ev["seq"])
+        if len(events) == n:
+            break
+    return events
+
+
+def test_subscribe_outside_the_log_is_a_gap():
+    async def main():
+        log = _Log(20)
+        log.compact(5)
+        feed = _feed(log)
+        for since in (4, 21):
+            with pytest.raises(ChangeLogGap) as gap:
+                await feed.subscribe(since)
+            assert (gap.value.first, gap.value.last) == (6, 20)
+        sub = await feed.subscribe(5)  # Just before the oldest kept change
+        try:
+            return await _take(sub, 3)
+        finally:
+            sub.close()
+
+    assert asyncio.run(main()) == [6, 7, 8]
+
+
+def test_compaction_behind_a_slow_reader_is_a_gap():
+    async def main():
+        log = _Log(20)
+        feed = _feed(log, buffer=5, page=3)
+        sub = await feed.subscribe(0)
+        try:
+            first = await _take(sub, 3)
+            log.compact(10)
+            with pytest.raises(ChangeLogGap, match="before seq 11 were compacted"):
+                await _take(sub, 1)
+            return first
+        finally:
+            sub.close()
+
+    assert asyncio.run(main()) == [1, 2, 3]
+
+
+def test_tail_subscribers_get_new_changes():
+    async def main():
+        log = _Log(3)
+        feed = _feed(log)
+        sub = await feed.subscribe()
+        try:
+            log.rows.append({"seq": 4})
+            return await asyncio.wait_for(_take(sub, 1), 1)
+        finally:
+            sub.close()
+
+    assert asyncio.run(main()) == [4]
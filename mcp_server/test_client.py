@@ -0,0 +1,49 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from mcp_server import client
+
+
+def _reply(data, error=False):
+    text = data if error else json.dumps(data)
+    return SimpleNamespace(content=[SimpleNamespace(text=text)], isError=error,
+                           structuredContent=None if error else json.loads(text))
+
+
+class _FakeSession:
+    def __init__(self, reply):
+        self.session = SimpleNamespace(call_tool=self.call_tool)
+        self.reply = reply
+        self.in_flight = 0
+        self.broken = False
+
+    async def call_tool(self, name, arguments, read_timeout_seconds=None):
+        return self.reply
+
+
+def _pool(reply):
+    pool = client.MCPClientPool("http://unused/mcp")
+    session = _FakeSession(reply)
+
+    async def get_session():
+        return session
+
+    pool._session = get_session
+    return pool
+
+
+def test_remote_batch_results_match_local(db):
+    local = asyncio.run(client.LocalTools().call("get_customers", customer_ids=[1, 2, 10**6]))
+    remote = asyncio.run(_pool(_reply(local)).call("get_customers", customer_ids=[1, 2, 10**6]))
+    assert remote == local
+    assert list(remote["customers"]) == [1, 2]
+
+
+def test_tool_error_replies_are_counted():
+    pool = _pool(_reply("no such customer", error=True))
+    with pytest.raises(client.ToolError, match="no such customer"):
+        asyncio.run(pool.call("get_customer", customer_id=1))
+    assert pool.stats()["errors"] == 1
@@ -0,0 +1,47 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from mcp_server import mcp as tools
+
+
+def _cursor(key) -> str:
+    raw = json.dumps(key).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+TAMPERED = [
+    _cursor([{"a": 1}, 5]),
+    _cursor([[1, 2], 5]),
+    _cursor(["2024-01-01 00:00:00", "5"]),
+    _cursor(["2024-01-01 00:00:00", True]),
+    _cursor(["2024-01-01 00:00:00"]),
+    _cursor({"created_at": "x", "id": 1}),
+    "not base64!",
+]
+
+
+@pytest.mark.parametrize("cursor", TAMPERED)
+def test_tampered_cursor_is_rejected(db, cursor):
+    customers = asyncio.run(tools.list_customers(None, cursor=cursor))
+    tickets = asyncio.run(tools.list_tickets(None, cursor=cursor))
+    found = asyncio.run(tools.search_tickets(None, "login", cursor=cursor))
+    for result in (customers, tickets, found):
+        assert result["reason"] == "invalid cursor"
+        assert result["next_cursor"] is None
+
+
+def test_search_cursor_needs_a_numeric_score(db):
+    found = asyncio.run(tools.search_tickets(None, "login", cursor=_cursor(["1.5", 3])))
+    assert found["reason"] == "invalid cursor"
+
+
+def test_cursor_round_trip(db):
+    first = asyncio.run(tools.list_tickets(None, limit=2))
+    assert first["next_cursor"]
+    second = asyncio.run(tools.list_tickets(None, limit=2, cursor=first["next_cursor"]))
+    assert "reason" not in second
+    seen = {t["id"] for t in first["tickets"]}
+    assert seen.isdisjoint(t["id"] for t in second["tickets"])
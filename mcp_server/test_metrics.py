@@ -0,0 +1,32 @@
+import asyncio
+
+from mcp_server import mcp as tools
+from mcp_server.metrics import ERRORS, instrument_tool, reason_label
+
+
+def test_reason_labels_are_bounded():
+    assert reason_label("customer missing") == "customer missing"
+    assert reason_label("unknown fields: id=2, email") == "unknown fields"
+    assert reason_label("anything a caller typed") == "other"
+
+
+def test_tool_reason_detail_stays_out_of_the_label():
+    @instrument_tool
+    async def patch_thing():
+        return {"updated": False, "reason": "unknown fields: x' OR 1"}
+
+    before = ERRORS.value("patch_thing", "unknown fields")
+    assert asyncio.run(patch_thing())["reason"] == "unknown fields: x' OR 1"
+    assert ERRORS.value("patch_thing", "unknown fields") == before + 1
+    assert ERRORS.value("patch_thing", "unknown fields: x' OR 1") == 0
+
+
+def test_update_customer_applies_only_sent_fields(db):
+    patch = tools.PatchCustomer.model_validate({"email": None})
+    cleared = asyncio.run(tools.update_customer(None, 1, patch))
+    assert cleared["updated"] and cleared["customer"]["email"] is None
+    assert cleared["customer"]["name"]
+
+    patch = tools.PatchCustomer.model_validate({"name": None})
+    refused = asyncio.run(tools.update_customer(None, 1, patch))
+    assert refused == {"updated": False, "reason": "required fields: name"}
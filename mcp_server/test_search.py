@@ -0,0 +1,35 @@
+import asyncio
+import sqlite3
+
+from mcp_server import mcp as tools
+
+
+def _search(query, **filters):
+    result = asyncio.run(tools.search_tickets(None, query, **filters))
+    return [t["id"] for t in result["tickets"]]
+
+
+def test_index_follows_ticket_writes(db):
+    created = asyncio.run(tools.create_ticket(None, 1, "Zebracorn export keeps failing"))
+    ticket_id = created["ticket"]["id"]
+    assert _search("zebracorn") == [ticket_id]
+    assert _search("zebracorn", customer_id=2) == []
+
+    with sqlite3.connect(db) as c:
+        c.execute("UPDATE tickets SET issue='Quokka export keeps failing' WHERE id=?", (ticket_id,))
+    assert _search("zebracorn") == []
+    assert _search("quokkas") == [ticket_id]  # Stemmed
+
+    with sqlite3.connect(db) as c:
+        c.execute("DELETE FROM tickets WHERE id=?", (ticket_id,))
+    assert _search("quokka") == []
+
+
+def test_filters_see_the_updated_ticket(db):
+    created = asyncio.run(tools.create_ticket(None, 1, "Zebracorn login loop"))
+    ticket_id = created["ticket"]["id"]
+    with sqlite3.connect(db) as c:
+        c.execute("UPDATE tickets SET status='resolved' WHERE id=?", (ticket_id,))
+        (rows,) = c.execute("SELECT count(*) FROM tickets_fts WHERE tickets_fts MATCH 'zebracorn'").fetchone()
+    assert rows == 1
+    assert _search("zebracorn", status="resolved") == [ticket_id]
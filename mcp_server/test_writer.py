@@ -0,0 +1,56 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from mcp_server import mcp as tools
+from mcp_server.writer import WriteBatcher
+
+
+def _note(c, n):
+    c.execute("INSERT INTO notes (n) VALUES (?)", (n,))
+    return n
+
+
+def _half_note(c, n):
+    c.execute("INSERT INTO notes (n) VALUES (?)", (n,))
+    raise ValueError(f"note {n} refused")
+
+
+def _notes(path):
+    with sqlite3.connect(path) as c:
+        return [n for (n,) in c.execute("SELECT n FROM notes ORDER BY n")]
+
+
+def test_failed_write_rolls_back_alone(db):
+    with sqlite3.connect(db) as c:
+        c.execute("CREATE TABLE notes (n INTEGER)")
+
+    async def main():
+        batcher = WriteBatcher(tools.pool, max_delay=0.05)
+        calls = [batcher.submit(_note, 1), batcher.submit(_half_note, 2),
+                 batcher.submit(_note, 3)]
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        await batcher.close()
+        return batcher, results
+
+    batcher, results = asyncio.run(main())
+    assert batcher.batches == 1 and batcher.errors == 1
+    assert results[0] == 1 and results[2] == 3
+    with pytest.raises(ValueError, match="note 2 refused"):
+        raise results[1]
+    assert _notes(db) == [1, 3]
+
+
+def test_each_caller_gets_its_own_error(db):
+    async def main():
+        batcher = WriteBatcher(tools.pool, max_delay=0.05)
+        # No notes table: both writes fail in their savepoints, each caller sees why
+        results = await asyncio.gather(batcher.submit(_note, 1), batcher.submit(_note, 2),
+                                       return_exceptions=True)
+        await batcher.close()
+        return batcher, results
+
+    batcher, results = asyncio.run(main())
+    assert batcher.batches == 1 and batcher.errors == 2
+    assert all(isinstance(r, sqlite3.OperationalError) for r in results)
@@ -0,0 +1,82 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from mcp_server import mcp as tools
+from mcp_server.pool import ConnectionPool
+from mcp_server.writer_service import WriterServer
+
+
+@pytest.fixture
+def remote(db, tmp_path):
+    """Run each test's coroutine with the tools writing through a WriterServer."""
+    socket_path = str(tmp_path / "w.sock")
+
+    def run(coro_fn):
+        async def main():
+            pool = ConnectionPool(db, size=2)
+            server = WriterServer(pool, tools.WRITE_OPS, socket_path)
+            await server.start()
+            writer = tools.enable_remote_writes(socket_path)
+            try:
+                return await coro_fn(writer)
+            finally:
+                await writer.close()
+                await server.close()
+                pool.close()
+        return asyncio.run(main())
+    return run
+
+
+def test_update_customer_rejects_unknown_columns(remote):
+    async def go(writer):
+        bad = await writer.submit(tools._update_customer, 1, {"name": "x", "id=2, email": "y"})
+        good = await tools.update_customer(None, 1, tools.PatchCustomer(name="Ada"))
+        return bad, good
+
+    bad, good = remote(go)
+    assert bad == {"updated": False, "reason": "unknown fields: id=2, email"}
+    assert good["updated"] and good["customer"]["name"] == "Ada"
+
+
+def _drop(path, table):
+    with sqlite3.connect(path) as c:
+        c.execute(f"DROP TABLE {table}")
+
+
+def test_compact_changelog_without_the_table(db, remote):
+    _drop(db, "changelog")
+    result = remote(lambda writer: tools.compact_changelog())
+    assert result == {"compacted": 0, "reason": "changelog missing"}
+
+
+def test_archive_tickets_without_the_table(db, remote):
+    _drop(db, "tickets_archive")
+    result = remote(lambda writer: tools.archive_tickets(days=0))
+    assert result == {"archived": 0, "reason": "archive missing"}
+
+
+def test_cached_reads_do_not_need_the_writer(db, tmp_path):
+    async def main():
+        writer = tools.enable_remote_writes(str(tmp_path / "missing.sock"))
+        first = await tools.get_customer(None, 1)
+        await asyncio.sleep(0.01)  # Let the background connect fail
+        second = await tools.get_customer(None, 1)
+        return first, second, writer.stats()
+
+    first, second, stats = asyncio.run(main())
+    assert first["found"] and second == first
+    assert stats["connect_errors"] == 1
+    assert tools.cache.get(("customer", 1)) is None  # Never trusted while disconnected
+
+
+def test_cached_reads_use_the_cache_once_connected(remote):
+    async def go(writer):
+        await tools.get_customer(None, 1)
+        await asyncio.sleep(0.01)
+        await tools.get_customer(None, 1)
+        return writer.connected()
+
+    assert remote(go)
+    assert tools.cache.get(("customer", 1))["found"]
@@ -0,0 +1,230 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+# Fraction of requests traced without asking; the X-Trace header forces it
+TRACE_SAMPLE_RATE = 0.0
+TRACE_HEADER = b"x-trace"
+TRACE_ID_HEADER = b"x-trace-id"
+# Recent traces kept in memory, and spans kept per trace
+TRACE_BUFFER = 256
+MAX_SPANS = 20000
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_parent: ContextVar[int] = ContextVar("trace_parent", default=0)
+
+
+def _track() -> tuple:
+    """(id, name) of the asyncio task, or the thread when off the loop, a span
+    runs on. Only the name is kept so traces never pin finished tasks."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        return id(task), task.get_name()
+    thread = threading.current_thread()
+    return thread.ident, thread.name
+
+
+class Trace:
+    """Spans recorded for one request.
+
+    Spans are stored flat as (id, parent, name, category, track, start_ns,
+    end_ns, args); the tree is kept through the parent ids. Appends are single
+    list operations, so SQL worker threads can record into the same trace.
+    """
+
+    def __init__(self, name: str, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.wall_start = time.time()
+        self.t0 = time.perf_counter_ns()
+        self.t1: Optional[int] = None
+        self.spans: List[tuple] = []
+        self.dropped = 0
+        self._ids = itertools.count(1)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def record(self, span_id: int, parent: int, name: str, cat: str, track: tuple,
+               start_ns: int, end_ns: int, args: Optional[Dict[str, Any]] = None):
+        if len(self.spans) >= MAX_SPANS:
+            self.dropped += 1
+            return
+        self.spans.append((span_id, parent, name, cat, track, start_ns, end_ns, args))
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.t1 if self.t1 is not None else time.perf_counter_ns()
+        return (end - self.t0) / 1e6
+
+    def summary(self) -> Dict[str, Any]:
+        return {"trace_id": self.trace_id, "name": self.name, "start": self.wall_start,
+                "duration_ms": self.duration_ms, "spans": len(self.spans),
+                "dropped_spans": self.dropped}
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Chrome/Perfetto trace JSON: one complete ("X") event per span.
+
+        Every asyncio task and worker thread gets its own track, so spans on
+        a track always nest even when a request fans out concurrently.
+        """
+        tracks: Dict[int, int] = {}
+        events: List[Dict[str, Any]] = []
+        for span_id, parent, name, cat, (key, label), start, end, args in self.spans:
+            tid = tracks.get(key)
+            if tid is None:
+                tid = tracks[key] = len(tracks) + 1
+                events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid,
+                               "args": {"name": label}})
+            events.append({
+                "name": name, "cat": cat, "ph": "X", "pid": 1, "tid": tid,
+                "ts": (start - self.t0) / 1000, "dur": (end - start) / 1000,
+                "args": {"span_id": span_id, "parent_id": parent, **(args or {})},
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {**self.summary(), "tracks": len(tracks)},
+        }
+
+
+class TraceBuffer:
+    """The most recent ``maxlen`` finished traces, by id."""
+
+    def __init__(self, maxlen: int = TRACE_BUFFER):
+        self.maxlen = maxlen
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace):
+        with self._lock:
+            self._traces[trace.trace_id] = trace
+            while len(self._traces) > self.maxlen:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        return self._traces.get(trace_id)
+
+    def recent(self, limit: int = 50) -> List[Trace]:
+        with self._lock:
+            return list(reversed(self._traces.values()))[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+TRACES = TraceBuffer()
+
+
+def current() -> Optional[Trace]:
+    """The trace being recorded in this context, if any."""
+    return _trace.get()
+
+
+class span:
+    """Record a span when the current context is traced; otherwise a no-op.
+
+    Usable as ``with span("name", key=value):``. Untraced, it still costs
+    building the span and a context variable lookup (about 1 us), so per-item
+    hot paths should check ``current()`` first.
+    """
+
+    __slots__ = ("name", "cat", "args", "trace", "span_id", "parent", "token", "start")
+
+    def __init__(self, name: str, cat: str = "app", **args):
+        self.name = name
+        self.cat = cat
+        self.args = args or None
+        self.trace = None
+
+    def __enter__(self):
+        trace = self.trace = _trace.get()
+        if trace is not None:
+            self.span_id = trace.next_id()
+            self.parent = _parent.get()
+            self.token = _parent.set(self.span_id)
+            self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        trace = self.trace
+        if trace is not None:
+            end = time.perf_counter_ns()
+            _parent.reset(self.token)
+            if exc_type is not None:
+                self.args = {**(self.args or {}), "error": exc_type.__name__}
+            trace.record(self.span_id, self.parent, self.name, self.cat, _track(),
+                         self.start, end, self.args)
+        return False
+
+
+def record_sql(sql: str, start_ns: int, end_ns: int):
+    """Record a finished SQL statement as a leaf span of the current trace."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.record(trace.next_id(), _parent.get(), sql.split(None, 1)[0].upper(), "sql",
+                     _track(), start_ns, end_ns, {"sql": sql if len(sql) <= 500 else sql[:500] + "..."})
+
+
+class TracingMiddleware:
+    """ASGI middleware that traces a request when asked or sampled.
+
+    A request is traced when it sends ``X-Trace: 1`` or falls within
+    ``TRACE_SAMPLE_RATE``. The trace id is returned in ``X-Trace-Id`` and the
+    finished trace is kept in ``TRACES`` for the /traces endpoints. Time before
+    the first child span is FastAPI routing, body parsing and validation; time
+    after the last is response serialization.
+    """
+
+    def __init__(self, app, buffer: TraceBuffer = TRACES):
+        self.app = app
+        self.buffer = buffer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        wanted = dict(scope.get("headers") or ()).get(TRACE_HEADER)
+        if wanted is not None:
+            traced = wanted not in (b"0", b"false")
+        else:
+            traced = TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+        if not traced:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(f"{scope.get('method', '')} {scope.get('path', '')}")
+        token = _trace.set(trace)
+        root = trace.next_id()
+        parent_token = _parent.set(root)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers") or [])
+                headers.append((TRACE_ID_HEADER, trace.trace_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            trace.t1 = time.perf_counter_ns()
+            route = scope.get("route")
+            trace.record(root, 0, trace.name, "http", _track(), trace.t0, trace.t1,
+                         {"status": status, "route": getattr(route, "path", None)})
+            _parent.reset(parent_token)
+            _trace.reset(token)
+            self.buffer.add(trace)
@@ -0,0 +1,181 @@
+import asyncio
+import sqlite3
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from mcp_server.pool import ConnectionPool
+
+# (write function, args, future for the caller)
+_Op = Tuple[Callable[..., Any], tuple, asyncio.Future]
+
+
+class WriteBatcher:
+    """Group-commit pipeline for MCP write tools.
+
+    Writes submitted concurrently are gathered for up to ``max_delay`` seconds
+    (or until ``max_batch`` are queued) and applied in a single transaction,
+    so one fsync covers the whole batch. Each write runs inside its own
+    savepoint: a failing write is rolled back alone and its caller receives
+    the exception, while the rest of the batch still commits.
+    """
+
+    def __init__(self, pool: ConnectionPool, max_batch: int = 64,
+                 max_delay: float = 0.005, max_queue: int = 10000):
+        """Initialize the batcher. The flush task starts on first submit.
+
+        Args:
+            pool: Connection pool the batches are committed through
+            max_batch: Maximum writes committed in one transaction
+            max_delay: Seconds to wait for more writes after the first arrives
+            max_queue: Queued writes before submitters are made to wait
+        """
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches = 0
+        self.writes = 0
+        self.errors = 0
+        self.largest_batch = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def _bind(self) -> bool:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return True
+        if self._loop is not None and not self._loop.is_closed():
+            # Bound to another live loop; callers here bypass batching.
+            return False
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = loop.create_task(self._flush_forever())
+        return True
+
+    async def submit(self, fn: Callable[..., Any], *args) -> Any:
+        """Queue ``fn(conn, *args)`` for the next batch and await its result."""
+        if not self._bind():
+            return await self.pool.run(fn, *args)
+        fut = self._loop.create_future()
+        await self._queue.put((fn, args, fut))
+        return await fut
+
+    async def _flush_forever(self):
+        queue = self._queue
+        closing = False
+        while not closing:
+            first = await queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    op = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        op = await asyncio.wait_for(queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if op is None:
+                    closing = True
+                    break
+                batch.append(op)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[_Op]):
+        t0 = time.perf_counter()
+        try:
+            outcomes = await self.pool.run(self._apply, [(fn, args) for fn, args, _ in batch])
+        except Exception as e:
+            # The commit itself failed: nothing in the batch was written.
+            outcomes = [(False, e)] * len(batch)
+        elapsed = time.perf_counter() - t0
+
+        self.batches += 1
+        self.writes += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        self.flush_seconds += elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        for (_, _, fut), (ok, value) in zip(batch, outcomes):
+            if fut.done():
+                continue
+            if ok:
+                fut.set_result(value)
+            else:
+                self.errors += 1
+                fut.set_exception(value)
+
+    @staticmethod
+    def _apply(conn: sqlite3.Connection, ops) -> List[Tuple[bool, Any]]:
+        outcomes = []
+        conn.execute("BEGIN IMMEDIATE")
+        for fn, args in ops:
+            conn.execute("SAVEPOINT write_op")
+            try:
+                outcomes.append((True, fn(conn, *args)))
+                conn.execute("RELEASE write_op")
+            except Exception as e:
+                conn.execute("ROLLBACK TO write_op")
+                conn.execute("RELEASE write_op")
+                outcomes.append((False, e))
+        conn.commit()
+        return outcomes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000,
+            "max_queue": self.max_queue,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "writes": self.writes,
+            "errors": self.errors,
+            "largest_batch": self.largest_batch,
+            "mean_batch_size": self.writes / self.batches if self.batches else 0.0,
+            "mean_flush_ms": self.flush_seconds / self.batches * 1000 if self.batches else 0.0,
+            "max_flush_ms": self.max_flush_seconds * 1000,
+        }
+
+    async def close(self):
+        """Flush every write queued so far, then stop the flush task."""
+        if self._task is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.put(None)
+            await self._task
+        self._task = self._queue = self._loop = None
+
+    def retire(self, then: Optional[Callable[[], None]] = None) -> Optional[asyncio.Task]:
+        """``close`` from synchronous code, then call ``then`` (e.g. closing the pool).
+
+        On the batcher's own running loop this cannot block: the close is
+        scheduled and its task returned. Anywhere else it finishes first.
+        """
+        async def close_then():
+            await self.close()
+            if then is not None:
+                then()
+
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            # Never started, or its loop is gone and the queue with it
+            self._task = self._queue = self._loop = None
+            if then is not None:
+                then()
+            return None
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return loop.create_task(close_then())
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(close_then(), loop).result()
+        else:
+            loop.run_until_complete(close_then())
+        return None
@@ -0,0 +1,338 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sqlite3
+import struct
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, Optional, Set
+
+from mcp_server.pool import ConnectionPool
+from mcp_server.writer import WriteBatcher
+
+WRITER_SOCKET = "support-writer.sock"
+# Workers read this to forward their writes to the writer process
+WRITER_SOCKET_ENV = "SUPPORT_WRITER_SOCKET"
+REQUEST_TIMEOUT = 10.0
+# Seconds between background reconnect attempts started by readers
+RECONNECT_INTERVAL = 1.0
+
+_HEADER = struct.Struct(">I")
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return json.loads(await reader.readexactly(size))
+
+
+def _write_frame(writer: asyncio.StreamWriter, message: Dict[str, Any]):
+    body = json.dumps(message, separators=(",", ":"), default=str).encode()
+    writer.write(_HEADER.pack(len(body)) + body)
+
+
+class RemoteWriteError(Exception):
+    """A write failed inside the writer process."""
+
+
+class RemoteOperationalError(RemoteWriteError, sqlite3.OperationalError):
+    """SQLite raised ``OperationalError`` in the writer process.
+
+    Also a ``sqlite3.OperationalError``, so callers that handle one (e.g. a
+    missing table) behave the same in single-writer mode.
+    """
+
+
+class WriterServer:
+    """The single writer: applies every worker's writes through one batcher.
+
+    Listens on a Unix socket for length-prefixed JSON requests
+    ``{"id", "op", "args"}`` naming one of ``ops``. All connections feed the
+    same ``WriteBatcher``, so writes from every worker are serialized and
+    group-committed by one process and never contend for the SQLite write
+    lock. Each successful write is also broadcast to the other connections so
+    they can invalidate their caches.
+    """
+
+    def __init__(self, pool: ConnectionPool, ops: Dict[str, Callable[..., Any]],
+                 socket_path: str = WRITER_SOCKET, **batch_options):
+        """Initialize the server.
+
+        Args:
+            pool: Pool the writer commits through
+            ops: Write name -> ``fn(conn, *args)``, as sent by ``RemoteWriter``
+            socket_path: Unix socket to listen on
+            **batch_options: ``max_batch``/``max_delay``/``max_queue`` for the batcher
+        """
+        self.ops = ops
+        self.socket_path = socket_path
+        self.batcher = WriteBatcher(pool, **batch_options)
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.socket_path)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.add(writer)
+        tasks = set()
+        try:
+            while True:
+                try:
+                    request = await _read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                task = asyncio.create_task(self._handle(request, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _handle(self, request: Dict[str, Any], writer: asyncio.StreamWriter):
+        op = request.get("op")
+        fn = self.ops.get(op)
+        if fn is None:
+            reply = {"id": request.get("id"), "ok": False, "error": f"unknown write {op!r}"}
+        else:
+            try:
+                result = await self.batcher.submit(fn, *request.get("args", ()))
+                reply = {"id": request.get("id"), "ok": True, "result": result}
+            except Exception as e:
+                reply = {"id": request.get("id"), "ok": False, "error": f"{type(e).__name__}: {e}",
+                         "type": type(e).__name__}
+        if writer.is_closing():
+            return
+        _write_frame(writer, reply)
+        if reply["ok"]:
+            event = {"event": "write", "op": op, "args": request.get("args", ()),
+                     "result": reply["result"]}
+            for other in self._clients:
+                if other is not writer and not other.is_closing():
+                    _write_frame(other, event)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"clients": len(self._clients), **self.batcher.stats()}
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class RemoteWriter:
+    """Worker-side stand-in for ``WriteBatcher`` that forwards writes to the
+    writer process.
+
+    One persistent Unix-socket connection per event loop carries every write,
+    matched to replies by request id. A dropped connection fails the writes in
+    flight and is reopened on the next ``connect``/``submit``.
+    """
+
+    def __init__(self, socket_path: str, ops: Dict[str, Callable[..., Any]],
+                 on_remote_write: Optional[Callable[[str, list, Any], None]] = None,
+                 on_connect: Optional[Callable[[], None]] = None,
+                 timeout: float = REQUEST_TIMEOUT):
+        """Initialize the client. The connection opens on first submit.
+
+        Args:
+            socket_path: The writer process's Unix socket
+            ops: Write name -> function; functions passed to ``submit`` are sent by name
+            on_remote_write: Called with (op, args, result) for writes made by other workers
+            on_connect: Called after every (re)connect; writes made while
+                disconnected were never reported, so caches should be dropped
+            timeout: Seconds to wait for a reply
+        """
+        self.socket_path = socket_path
+        self.names = {fn: name for name, fn in ops.items()}
+        self.on_remote_write = on_remote_write
+        self.on_connect = on_connect
+        self.timeout = timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connecting: Optional[asyncio.Lock] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+        self.writes = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.connect_errors = 0
+        self.remote_events = 0
+
+    def connected(self) -> bool:
+        """Whether the connection for the running loop is open.
+
+        A worker only hears about other workers' writes while it is.
+        """
+        return (self._loop is asyncio.get_running_loop() and self._writer is not None
+                and not self._writer.is_closing())
+
+    def connect_soon(self):
+        """Start ``connect`` in the background, at most once per ``RECONNECT_INTERVAL``.
+
+        For readers, which must neither wait for the writer nor fail with it.
+        """
+        now = time.monotonic()
+        if now < self._retry_at or (self._connect_task is not None and not self._connect_task.done()):
+            return
+        self._retry_at = now + RECONNECT_INTERVAL
+        self._connect_task = asyncio.get_running_loop().create_task(self._connect_quietly())
+
+    async def _connect_quietly(self):
+        try:
+            await self.connect()
+        except OSError:
+            self.connect_errors += 1
+
+    async def connect(self):
+        """Open the connection for the running loop unless it is already open."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._writer is not None and not self._writer.is_closing():
+            return
+        if self._loop is not loop:
+            self._loop, self._writer, self._connecting = loop, None, asyncio.Lock()
+        async with self._connecting:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            if self._writer is not None:
+                self.reconnects += 1
+            self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+            self._reader_task = loop.create_task(self._read_replies(self._reader, self._writer))
+            if self.on_connect is not None:
+                self.on_connect()
+
+    async def _read_replies(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        error = ConnectionError("writer connection closed")
+        try:
+            while True:
+                message = await _read_frame(reader)
+                if "event" in message:
+                    self.remote_events += 1
+                    if self.on_remote_write is not None:
+                        self.on_remote_write(message["op"], message["args"], message["result"])
+                    continue
+                fut = self._pending.pop(message["id"], None)
+                if fut is None or fut.done():
+                    continue
+                if message["ok"]:
+                    fut.set_result(message["result"])
+                else:
+                    error_type = (RemoteOperationalError if message.get("type") == "OperationalError"
+                                  else RemoteWriteError)
+                    fut.set_exception(error_type(message["error"]))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            error = ConnectionError(f"writer connection lost: {e}")
+        finally:
+            writer.close()
+        if self._writer is not writer:
+            return  # Already replaced; its requests belong to the new connection
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(error)
+        self._pending.clear()
+
+    async def submit(self, fn: Callable[..., Any], *args) -> Any:
+        """Send ``fn`` (by name) and its arguments to the writer; await the result."""
+        name = self.names.get(fn)
+        if name is None:
+            raise ValueError(f"{getattr(fn, '__name__', fn)!r} is not a registered write")
+        await self.connect()
+        rid = next(self._ids)
+        fut = self._loop.create_future()
+        self._pending[rid] = fut
+        _write_frame(self._writer, {"id": rid, "op": name, "args": list(args)})
+        try:
+            result = await asyncio.wait_for(fut, self.timeout)
+        except Exception:
+            self.errors += 1
+            self._pending.pop(rid, None)
+            raise
+        self.writes += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "remote",
+            "socket": self.socket_path,
+            "in_flight": len(self._pending),
+            "writes": self.writes,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+            "connect_errors": self.connect_errors,
+            "remote_events": self.remote_events,
+        }
+
+    async def close(self):
+        if self._writer is not None and self._loop is asyncio.get_running_loop():
+            self._writer.close()
+        self._writer = None
+
+
+def spawn_writer(db_path: str, socket_path: str = WRITER_SOCKET,
+                 timeout: float = 10.0, **batch_options) -> subprocess.Popen:
+    """Start the writer process and wait until it accepts connections.
+
+    Args:
+        db_path: Database the writer commits to
+        socket_path: Unix socket it listens on
+        timeout: Seconds to wait for the socket to appear
+        **batch_options: ``max_batch``/``max_delay`` forwarded to the writer
+    """
+    cmd = [sys.executable, "-m", "mcp_server.writer_service", "--db", db_path, "--socket", socket_path]
+    for key, value in batch_options.items():
+        cmd += [f"--{key.replace('_', '-')}", str(value)]
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    proc = subprocess.Popen(cmd)
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket_path):
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            raise RuntimeError(f"writer process did not start on {socket_path}")
+        time.sleep(0.02)
+    return proc
+
+
+def main():
+    """Run the writer process for a multi-worker deployment."""
+    from mcp_server import mcp as tools
+
+    parser = argparse.ArgumentParser(description="Single SQLite writer for multi-worker deployments.")
+    parser.add_argument("--db", default=tools.DB_PATH)
+    parser.add_argument("--socket", default=WRITER_SOCKET)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay", type=float, default=0.002, help="seconds")
+    args = parser.parse_args()
+
+    pool = ConnectionPool(args.db, size=2)
+    server = WriterServer(pool, tools.WRITE_OPS, args.socket,
+                          max_batch=args.max_batch, max_delay=args.max_delay)
+    print(f"Writer for {args.db} listening on {args.socket}", flush=True)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
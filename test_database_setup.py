@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import sqlite3
+from datetime import datetime
+
+import database_setup
+from database_setup import DatabaseSetup
+from mcp_server import mcp as tools
+
+GUARD = "WHEN NOT EXISTS (SELECT 1 FROM tickets_archive WHERE id = OLD.id)"
+
+
+def _open(path) -> DatabaseSetup:
+    db = DatabaseSetup(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.connect()
+    return db
+
+
+def _before_archive(path, table: bool = False):
+    """Turn ``path`` back into a database from before tickets_archive existed."""
+    with sqlite3.connect(path) as c:
+        delete = c.execute("SELECT sql FROM sqlite_master WHERE name = 'changelog_tickets_delete'").fetchone()[0]
+        c.execute("DROP TRIGGER changelog_tickets_delete")
+        c.execute(delete.replace(GUARD, ""))
+        if table:
+            c.execute("DROP TRIGGER ticket_archive_stats_insert")
+            c.execute("DROP TRIGGER ticket_archive_stats_delete")
+        else:
+            c.execute("DROP TABLE tickets_archive")
+        # Old enough for the default cutoff
+        c.execute("UPDATE tickets SET created_at = '2020-01-01 00:00:00' WHERE status = 'resolved'")
+
+
+def test_archive_cli_migrates_an_old_database(db):
+    _before_archive(db)
+    with contextlib.redirect_stdout(io.StringIO()):
+        database_setup.archive_tickets(argparse.Namespace(db=db, days=90, batch=2))
+    setup = _open(db)
+    try:
+        archived = setup.cursor.execute("SELECT COUNT(*) FROM tickets_archive").fetchone()[0]
+        deletes = setup.cursor.execute(
+            "SELECT COUNT(*) FROM changelog WHERE entity = 'ticket' AND op = 'delete'").fetchone()[0]
+        assert archived > 0
+        assert deletes == 0
+        assert setup.check_stats()["ok"]
+    finally:
+        setup.close()
+
+
+def test_archive_tool_refuses_without_the_triggers(db):
+    _before_archive(db, table=True)
+    result = asyncio.run(tools.archive_tickets())
+    assert result == {"archived": 0, "reason": "archive triggers missing"}
+    setup = _open(db)
+    try:
+        assert setup.cursor.execute("SELECT COUNT(*) FROM tickets_archive").fetchone()[0] == 0
+        assert setup.check_stats()["ok"]
+    finally:
+        setup.close()
+
+
+def _generated(path, chunk_size):
+    setup = DatabaseSetup(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        setup.connect()
+        setup.create_tables(indexes=False)
+        setup.create_triggers()
+        setup.generate_data(300, 1500, seed=7, chunk_size=chunk_size, until=datetime(2026, 1, 1))
+        rows = (setup.cursor.execute("SELECT * FROM customers ORDER BY id").fetchall(),
+                setup.cursor.execute("SELECT * FROM tickets ORDER BY id").fetchall())
+        setup.close()
+    return rows
+
+
+def test_generated_rows_do_not_depend_on_chunk_size(tmp_path):
+    small = _generated(str(tmp_path / "a.db"), chunk_size=100)
+    large = _generated(str(tmp_path / "b.db"), chunk_size=1000)
+    assert small == large
+    assert len(small[0]) == 300 and len(small[1]) == 1500
+
+
+def _stats_ok(path) -> bool:
+    db = _open(path)
+    try:
+        return db.check_stats()["ok"]
+    finally:
+        db.close()
+
+
+def test_stats_follow_every_kind_of_write(db):
+    created = asyncio.run(tools.create_ticket(None, 1, "Export stuck", "high"))
+    ticket_id = created["ticket"]["id"]
+    assert _stats_ok(db)
+
+    with sqlite3.connect(db) as c:
+        c.execute("UPDATE tickets SET priority = 'low', status = 'in_progress' WHERE id = ?", (ticket_id,))
+        c.execute("UPDATE tickets SET customer_id = 2 WHERE id = ?", (ticket_id,))
+        c.execute("UPDATE customers SET status = 'disabled' WHERE id = 2")
+        c.execute("INSERT INTO customers (name, status) VALUES ('New Co', 'active')")
+    assert _stats_ok(db)
+
+    with sqlite3.connect(db) as c:
+        c.execute("DELETE FROM tickets WHERE id = ?", (ticket_id,))
+    assert _stats_ok(db)
+
+    with sqlite3.connect(db) as c:
+        c.execute("UPDATE tickets SET created_at = '2020-01-01 00:00:00' WHERE status = 'resolved'")
+    result = asyncio.run(tools.archive_tickets(days=90))
+    assert result["archived"] > 0
+    assert _stats_ok(db)
+    stats = asyncio.run(tools.get_ticket_stats(None))
+    with sqlite3.connect(db) as c:
+        (live,) = c.execute("SELECT (SELECT count(*) FROM tickets) + (SELECT count(*) FROM tickets_archive)").fetchone()
+    assert sum(stats["by_status"].values()) == live